@@ -1,7 +1,8 @@
 # TeamForgeAI/agent_creation.py
 from autogen.agentchat import ConversableAgent
-from autogen.agentchat.contrib.capabilities.teachability import Teachability
 from ollama_llm import OllamaLLM
+from vector_store import VectorMemory
+from team_memory import get_team_memory
 import os
 
 def create_autogen_agent(agent_data: dict):
@@ -21,13 +22,24 @@ def create_autogen_agent(agent_data: dict):
 
     # Create the agent instance first
     agent = OllamaConversableAgent(**agent_kwargs)
+    agent.moa_role = agent_data.get("moa_role", "proposer")  # Used to keep proposers ahead of aggregators when scheduling speakers
 
     # Initialize Teachability after creating the agent
     if agent_data.get("enable_memory", False):
-        db_path = agent_data.get("db_path", os.path.join("./db", f"{agent_data['config']['name']}_memory"))
+        if agent_data.get("memory_backend", "teachability") == "team":
+            # The team's shared retrieval memory, one index for all of its agents
+            agent.teachability = get_team_memory()
+            return agent
+
+        db_path = agent_data.get("db_path") or os.path.join("./db", f"{agent_data['config']['name']}_memory")
         # Create the database directory if it doesn't exist
         os.makedirs(db_path, exist_ok=True)
 
+        if agent_data.get("memory_backend", "teachability") == "numpy":
+            # Built-in NumPy vector memory, no external DB required
+            agent.teachability = VectorMemory(db_path, ollama_url=agent_data["ollama_url"])
+            return agent
+
         # Configure Teachability to use Ollama
         llm_config = {
             "config_list": [
@@ -39,6 +51,8 @@ def create_autogen_agent(agent_data: dict):
             ],
             "timeout": 120
         }
+        # Teachability pulls in ChromaDB, so it is only imported for agents that use it
+        from autogen.agentchat.contrib.capabilities.teachability import Teachability
         teachability = Teachability(path_to_db_dir=db_path, llm_config=llm_config)
         # Add teachability to the agent
         teachability.add_to_agent(agent) # Pass the agent instance
@@ -68,12 +82,18 @@ class OllamaConversableAgent(ConversableAgent):
     def add_message(self, role, content):
         """Adds a message to the conversation history."""
         self.messages.append({'role': role, 'content': content})
+        if isinstance(self.teachability, VectorMemory) or hasattr(self.teachability, "sync_discussion"):
+            self.teachability.add(content, role=role)  # Persist to the agent's vector or team memory
 
     def _construct_prompt(self, messages, sender):
         """Constructs the prompt for the LLM, considering sender role."""
         # Implement prompt formatting logic here based on Ollama's requirements.
         # For example:
         prompt = ""
+        if hasattr(self.teachability, "get_memories") and messages:
+            memories = self.teachability.get_memories(k=5, query=messages[-1]['content'])
+            if memories:
+                prompt += "Relevant memories:\n" + "\n".join(f"- {memory['content']}" for memory in memories) + "\n\n"
         for message in messages:
             if message['role'] == "User":
                 prompt += f"User: {message['content']}\n"
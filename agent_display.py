@@ -3,7 +3,7 @@ import os
 import streamlit as st
 from file_utils import load_agents_from_json, save_agent_to_json, load_skills
 from agent_interactions import process_agent_interaction
-from ui.utils import extract_keywords
+from keywords import build_query
 from agent_edit import (
     open_edit_agent, delete_agent, remove_agent_from_ui, handle_agent_editing,
     sanitize_agent_name, assign_skills, select_model
@@ -44,8 +44,7 @@ def agent_button_callback(agent_index: int):
                 agents_data = st.session_state.get("agents_data", [])  # Get agents_data from session state
 
                 if selected_skill[0] == "web_search":
-                    keywords = extract_keywords(rephrased_request) + extract_keywords(discussion_history)
-                    query = " ".join(keywords)
+                    query = build_query(rephrased_request, discussion_history)  # Ranked keyphrases, the request's first
                 elif selected_skill[0] == "generate_sd_images":
                     query = discussion_history
                 elif selected_skill[0] == "plot_diagram":
@@ -15,7 +15,9 @@ from file_utils import (
 )
 from ui.discussion import update_discussion_and_whiteboard
 from agent_interactions import process_agent_interaction, generate_and_display_images
-from ui.utils import extract_keywords
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
 
 # --- Function to sanitize agent names ---
 
@@ -47,7 +49,7 @@ def assign_skills(role: str) -> list:
 def select_model(skills: list) -> str:
     """Select the appropriate model for the new agent based on assigned skills."""
     available_models = get_ollama_models("http://localhost:11434")
-    print(f"Available models: {available_models}")  # Debugging line
+    logger.debug("Available models: %s", available_models)
 
     if not available_models:
         return "default_model"  # Fallback model if no models are available
@@ -74,7 +76,7 @@ def handle_agent_editing(teams: list, agents_base_dir: str) -> None:
     if show_edit and (
         edit_index is None or edit_index >= len(st.session_state.agents_data)
     ):
-        print("Stale edit_agent_index detected. Resetting session state.")
+        logger.info("Stale edit_agent_index detected. Resetting session state.")
         st.session_state["show_edit"] = False
         if "edit_agent_index" in st.session_state:
             del st.session_state["edit_agent_index"]
@@ -172,6 +174,15 @@ def edit_agent_properties(agent: dict, teams: list, agents_base_dir: str) -> Non
         value=agent.get("enable_memory", False),
         key=f"enable_memory_{edit_index}",
     )
+    memory_backends = ["teachability", "numpy", "team"]
+    memory_backend_labels = {"teachability": "Chroma (Teachability)", "numpy": "NumPy (built-in)", "team": "Shared team memory"}
+    agent["memory_backend"] = st.selectbox(
+        "Memory Backend",
+        memory_backends,
+        index=memory_backends.index(agent.get("memory_backend", "teachability")),
+        format_func=memory_backend_labels.get,
+        key=f"memory_backend_{edit_index}",
+    )
     agent["enable_moa"] = st.checkbox(
         "Enable MoA",
         value=agent.get("enable_moa", False),
@@ -182,12 +193,10 @@ def edit_agent_properties(agent: dict, teams: list, agents_base_dir: str) -> Non
         new_description = regenerate_agent_description(agent)
         if new_description:
             agent["new_description"] = new_description
-            print(
-                f"Description regenerated for {agent['config']['name']}: {new_description}"
-            )
+            logger.debug("Description regenerated for %s: %s", agent["config"]["name"], preview(new_description))
             st.session_state["trigger_rerun"] = True
         else:
-            print(f"Failed to regenerate description for {agent['config']['name']}")
+            logger.warning("Failed to regenerate description for %s", agent["config"]["name"])
 
     if f"save_clicked_{edit_index}" not in st.session_state:
         st.session_state[f"save_clicked_{edit_index}"] = False
@@ -249,8 +258,6 @@ def edit_agent_properties(agent: dict, teams: list, agents_base_dir: str) -> Non
 
 def regenerate_agent_description(agent: dict) -> str:
     """Regenerates the description for an agent using the LLM."""
-    print("Regenerating agent description...")
-    print("Session state:", st.session_state)
     agent_name = agent["config"]["name"]
     agent_description = agent["description"]
     user_request = st.session_state.get("user_request", "")
@@ -295,8 +302,7 @@ def regenerate_agent_description(agent: dict) -> str:
         No preamble, no narrative, no superfluous commentary whatsoever. Just the agent description, unlabeled, no title, please.
     """
 
-    print(f"regenerate_agent_description called with agent_name: {agent_name}")
-    print(f"regenerate_agent_description called with prompt: {prompt}")
+    logger.debug("Regenerating the description of %s with prompt: %s", agent_name, preview(prompt))
 
     response_generator = send_request_to_ollama_api(agent_name, prompt, agent_data=agent)  # Pass agent_data
 
@@ -306,7 +312,7 @@ def regenerate_agent_description(agent: dict) -> str:
             response_text = response_chunk.get("response", "")
             full_response += response_text
     except Exception as error:
-        print(f"Error processing response generator: {error}")
+        logger.error("Error processing response generator: %s", error)
         return None
 
     if full_response:
@@ -353,9 +359,9 @@ def delete_agent(index: int) -> None:
         # Delete the agent file
         if os.path.exists(json_file):
             os.remove(json_file)
-            print(f"JSON file deleted: {json_file}")
+            logger.info("JSON file deleted: %s", json_file)
         else:
-            print(f"JSON file not found: {json_file}")
+            logger.warning("JSON file not found: %s", json_file)
 
         st.session_state["trigger_rerun"] = True  # Trigger a re-run
 
@@ -12,17 +12,24 @@ from skills.generate_sd_images import generate_sd_images
 from skills.update_project_status import update_checklists # Updated import
 from skills.summarize_project_status import summarize_project_status
 from ui.discussion import update_discussion_and_whiteboard  # Corrected import
-from ui.utils import extract_keywords  # Import extract_keywords
+from keywords import build_query
 from ollama_llm import OllamaLLM # Import OllamaLLM from ollama_llm.py
 from skills.web_search import web_search # Import web_search directly
 from agent_creation import create_autogen_agent # Import create_autogen_agent
+from team_memory import discussion_context, remember_document
+from model_residency import preload_model
+from tracing import span
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
 
 def process_agent_interaction(agent_index: int) -> None:
-    """Handles the interaction with a selected agent."""
-    print("Processing agent interaction...")
-    print(
-        "Session state:", st.session_state
-    )  # Log the session state when this function is called
+    """Handles the interaction with a selected agent, traced as one "agent.turn" span with a child per stage."""
+    with span("agent.turn", {"agent.index": agent_index}):
+        _process_agent_interaction(agent_index)
+
+def _process_agent_interaction(agent_index: int) -> None:
+    logger.debug("Processing agent interaction %d", agent_index)
 
     # --- Use st.session_state.agents_data to access the agents ---
     if "agents_data" not in st.session_state:
@@ -30,8 +37,10 @@ def process_agent_interaction(agent_index: int) -> None:
 
     agent_data = st.session_state.agents_data[agent_index] # Get the agent data
     # Create an instance of OllamaConversableAgent from the agent_instance dictionary
-    agent_instance = create_autogen_agent(agent_data)
-    available_skills = load_skills()  # Load available skills
+    with span("agent.build", {"agent.name": agent_data["config"]["name"]}):
+        agent_instance = create_autogen_agent(agent_data)
+    with span("skills.load"):
+        available_skills = load_skills()  # Load available skills
     selected_skill = agent_data.get("skill", [])  # Get the agent's selected skill from agent_data, default to an empty list
 
     # --- Check if the image generation skill should be triggered ---
@@ -50,25 +59,36 @@ def process_agent_interaction(agent_index: int) -> None:
     rephrased_request = st.session_state.get("rephrased_request", "")
 
     reference_url = st.session_state.get("reference_url", "")
-    url_content = fetch_web_content(reference_url) if reference_url else ""
+    url_content = ""
+    if reference_url:
+        with span("url.fetch", {"url": reference_url}):
+            url_content = fetch_web_content(reference_url)
+
+    with span("prompt.assemble") as prompt_span:
+        # --- Retrieve the relevant part of the discussion from the team's shared memory ---
+        discussion_so_far = discussion_context(
+            st.session_state.discussion_history,
+            query=" ".join(part for part in (rephrased_request, user_input, description) if part),
+        )
 
-    # --- Construct the request based on the selected skill ---
-    request = f"""Act as the {agent_name} who {description}.
+        # --- Construct the request based on the selected skill ---
+        request = f"""Act as the {agent_name} who {description}.
         Original request was: {user_request}. 
         You are helping a team work on satisfying {rephrased_request}. 
         Additional input: {user_input}. 
         Reference URL content: {url_content}.
-        The discussion so far has been {st.session_state.discussion_history[-50000:]}."""
+        The discussion so far has been {discussion_so_far}."""
+        prompt_span.set_attribute("prompt.chars", len(request))
 
     # --- Prepare the query based on the skill ---
     if selected_skill:  # If a skill is selected for the agent
         if selected_skill[0] == "web_search":
-            keywords = extract_keywords(rephrased_request) + extract_keywords(
-                st.session_state.get("user_request", "") # Use the original user request instead of the formatted discussion history
-             )
-            query = " ".join(keywords)
+            query = build_query(
+                rephrased_request, st.session_state.get("user_request", "")  # The original request, not the formatted discussion history
+            )
             # Call the web_search function directly
-            skill_result = web_search(query, st.session_state.discussion_history, st.session_state.agents_data, agent_instance.teachability) # Use agent_instance.teachability
+            with span("skill.run", {"skill": "web_search"}):
+                skill_result = web_search(query, st.session_state.discussion_history, st.session_state.agents_data, agent_instance.teachability) # Use agent_instance.teachability
             response_text = f"Skill '{selected_skill[0]}' result: {skill_result}"
             update_discussion_and_whiteboard(agent_name, response_text, user_input)
             return
@@ -84,12 +104,13 @@ def process_agent_interaction(agent_index: int) -> None:
     # --- If a skill other than generate_sd_images is selected, execute it ---
     if selected_skill and selected_skill[0] != "generate_sd_images":
         skill_function = available_skills[selected_skill[0]]
-        if selected_skill[0] in ["web_search", "fetch_web_content"]:
-            skill_result = skill_function(query=query, discussion_history=st.session_state.discussion_history, teachability=agent_instance.teachability) # Pass teachability to skill_function
-        elif selected_skill[0] == "plot_diagram":
-            skill_result = skill_function(query=query, discussion_history=st.session_state.discussion_history) # Pass the query to the skill function
-        else:
-            skill_result = skill_function(query=query, agents_data=st.session_state.agents_data, discussion_history=st.session_state.discussion_history) # Pass the query to the skill function
+        with span("skill.run", {"skill": selected_skill[0]}):
+            if selected_skill[0] in ["web_search", "fetch_web_content"]:
+                skill_result = skill_function(query=query, discussion_history=st.session_state.discussion_history, teachability=agent_instance.teachability) # Pass teachability to skill_function
+            elif selected_skill[0] == "plot_diagram":
+                skill_result = skill_function(query=query, discussion_history=st.session_state.discussion_history) # Pass the query to the skill function
+            else:
+                skill_result = skill_function(query=query, agents_data=st.session_state.agents_data, discussion_history=st.session_state.discussion_history) # Pass the query to the skill function
 
         # --- Handle plot_diagram skill result ---
         if selected_skill[0] == "plot_diagram":
@@ -123,7 +144,8 @@ def process_agent_interaction(agent_index: int) -> None:
 
     # --- If no skill is selected, get the agent's response from the LLM ---
     if agent_data.get("enable_moa", False): # Access from agent_data
-        full_response = execute_moa_workflow(request, st.session_state.agents_data, agent_data, agent_instance) # Pass agent_data and agent_instance
+        with span("moa.workflow"):  # Each layer's generations are llm.generate children
+            full_response = execute_moa_workflow(request, st.session_state.agents_data, agent_data, agent_instance) # Pass agent_data and agent_instance
     else:
         # Check if memory is enabled
         if agent_data.get("enable_memory", False):
@@ -132,17 +154,19 @@ def process_agent_interaction(agent_index: int) -> None:
 
         response_generator = send_request_to_ollama_api(agent_name, request, agent_data=agent_data) # Pass agent_data
         full_response = ""
-        for response_chunk in response_generator:
-            if 'done' in response_chunk and response_chunk['done']: # Check if the response is complete
-                response_text = response_chunk.get("response", "")
-                full_response += response_text
+        with span("llm.generate", {"llm.model": agent_data.get("model") or st.session_state.get("model", "")}) as llm_span:
+            for response_chunk in response_generator:
+                llm_span.observe_chunk(response_chunk)  # TTFT and Ollama's timing fields
+                if 'done' in response_chunk and response_chunk['done']: # Check if the response is complete
+                    response_text = response_chunk.get("response", "")
+                    full_response += response_text
 
-                # --- Enforce image request format before updating discussion history ---
-                full_response = enforce_image_request_format(full_response)
+                    # --- Enforce image request format before updating discussion history ---
+                    full_response = enforce_image_request_format(full_response)
 
-                break # Exit the loop since the response is complete
-            response_text = response_chunk.get("response", "")
-            full_response += response_text
+                    break # Exit the loop since the response is complete
+                response_text = response_chunk.get("response", "")
+                full_response += response_text
 
     # Update discussion history AFTER the response is complete
     update_discussion_and_whiteboard(f"{agent_emoji} {agent_name}", full_response, user_input) # Add emoji to agent name
@@ -155,7 +179,8 @@ def process_agent_interaction(agent_index: int) -> None:
 
     # --- Update checklists after agent interaction ---   
     if "current_project" in st.session_state:
-        update_checklists(st.session_state.discussion_history, st.session_state.current_project)
+        with span("checklist.update"):
+            update_checklists(st.session_state.discussion_history, st.session_state.current_project)
         st.session_state.current_project = st.session_state.current_project # Update session state
         # --- Set the flag to trigger a rerun ---
         st.session_state["trigger_rerun"] = True
@@ -179,11 +204,11 @@ def generate_and_display_images(discussion_history: str) -> None:
                         image_bytes = file.read()
                         st.image(image_bytes, caption=f"Generated Image: {image_path}")
             else:
-                print(f"generate_sd_images did not return any images")
+                logger.info("generate_sd_images did not return any images")
                 break # Exit the loop if no images were generated
 
         except Exception as error:
-            print(f"Error executing generated code: {error}")
+            logger.error("Error generating images: %s", error)
             st.error(f"Error generating image: {error}")
             break # Exit the loop if there was an error
 
@@ -204,60 +229,68 @@ def enforce_image_request_format(text: str) -> str:
 
 def execute_moa_workflow(request: str, agents_data: list, current_agent: dict, agent_instance) -> str:
     """Executes the Mixture-of-Agents workflow."""
-    # Get the full discussion history
-    discussion_history = st.session_state.get("discussion_history", "")
-
+    # The request already carries the relevant discussion context retrieved from the team memory
     # Separate proposers and aggregators
     proposers = [agent for agent in agents_data if agent.get("moa_role") == "proposer"]
     aggregators = [agent for agent in agents_data if agent.get("moa_role") == "aggregator"]
 
     # Layer 1: Proposers generate initial responses
+    # Agents speak in this order; each one's model is preloaded while the previous one generates
+    speaking_order = proposers + aggregators * 2 + [current_agent]
     layer_1_outputs = []
-    for proposer in proposers:
+    for position, proposer in enumerate(proposers):
         proposer_emoji = proposer.get("emoji", "") # Get the proposer's emoji
-        print(f"🟢 Proposer: {proposer_emoji} {proposer['config']['name']}") # Log the proposer's name with emoji
+        logger.info("🟢 Proposer: %s %s", proposer_emoji, proposer["config"]["name"])
         # Create an instance of OllamaConversableAgent from the agent_instance dictionary
         proposer_instance = create_autogen_agent(proposer)
 
-        # Include discussion history and user request in the prompt
-        proposer_prompt = f"""{discussion_history}\n{request}"""
+        proposer_prompt = request
 
         # Check if memory is enabled for the proposer
         if proposer.get("enable_memory", False):
             # Store the user input in the agent's memory using add_message
             proposer_instance.add_message("User", request)  # Call add_message on the agent instance
 
+        preload_next_speaker(speaking_order, position)
         response = proposer_instance.ollama_llm.generate_text(proposer_prompt)
         layer_1_outputs.append(response)
-        print(f"    Proposed Response: {response}") # Log the proposed response
+        logger.debug("Proposed response: %s", preview(response))
 
     # Subsequent layers: Aggregators refine responses
     current_responses = layer_1_outputs
     for i in range(2, 4):  # Adjust the number of layers as needed
         new_responses = []
-        for aggregator in aggregators:
+        for position, aggregator in enumerate(aggregators, start=len(proposers) + (i - 2) * len(aggregators)):
             aggregator_emoji = aggregator.get("emoji", "") # Get the aggregator's emoji
-            print(f"🟠 Aggregator (Layer {i}): {aggregator_emoji} {aggregator['config']['name']}") # Log the aggregator's name and layer with emoji
+            logger.info("🟠 Aggregator (Layer %d): %s %s", i, aggregator_emoji, aggregator["config"]["name"])
             # Create an instance of OllamaConversableAgent from the agent_instance dictionary
             aggregator_instance = create_autogen_agent(aggregator)
 
             # Include discussion history and user request in the prompt
-            aggregator_prompt = f"""{discussion_history}\n{request}\n\nResponses from models:\n{chr(10).join([f'{j+1}. {response}' for j, response in enumerate(current_responses)])}"""
+            aggregator_prompt = f"""{request}\n\nResponses from models:\n{chr(10).join([f'{j+1}. {response}' for j, response in enumerate(current_responses)])}"""
 
             # Check if memory is enabled for the aggregator
             if aggregator.get("enable_memory", False):
                 # Store the user input in the agent's memory using add_message
                 aggregator_instance.add_message("User", aggregator_prompt)  # Call add_message on the agent instance
 
+            preload_next_speaker(speaking_order, position)
             response = aggregator_instance.ollama_llm.generate_text(aggregator_prompt)
             new_responses.append(response)
-            print(f"    Aggregated Response (Layer {i}): {response}") # Log the aggregated response
+            logger.debug("Aggregated response (Layer %d): %s", i, preview(response))
         current_responses = new_responses
 
     # Final output: Use the current agent as the final aggregator
     agent_emoji = current_agent.get("emoji", "") # Get the agent's emoji
-    print(f"🔴 Final Aggregator: {agent_emoji} {current_agent['config']['name']}") # Log the final aggregator's name with emoji
-    aggregate_prompt = f"""{discussion_history}\n{request}\n\nResponses from models:\n{chr(10).join([f'{j+1}. {response}' for j, response in enumerate(current_responses)])}"""
+    logger.info("🔴 Final Aggregator: %s %s", agent_emoji, current_agent["config"]["name"])
+    aggregate_prompt = f"""{request}\n\nResponses from models:\n{chr(10).join([f'{j+1}. {response}' for j, response in enumerate(current_responses)])}"""
     moa_response = agent_instance.ollama_llm.generate_text(aggregate_prompt)
-    print(f"    Final MoA Response: {moa_response}") # Log the final MoA response
+    logger.debug("Final MoA response: %s", preview(moa_response))
     return moa_response
+
+def preload_next_speaker(speaking_order: list, position: int) -> None:
+    """Preloads the model of the agent that speaks after position, if it uses a different model."""
+    if position + 1 < len(speaking_order):
+        current, following = speaking_order[position], speaking_order[position + 1]
+        if following.get("model") != current.get("model"):
+            preload_model(following.get("model"), following.get("ollama_url"))
@@ -10,22 +10,12 @@ import requests
 import streamlit as st
 
 from file_utils import create_agent_data, sanitize_text, load_skills
-import nltk
-# Make sure to install nltk: pip install nltk
-nltk.download('punkt') # Download the 'punkt' package for sentence tokenization
-nltk.download('stopwords') # Download the 'stopwords' package
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 
 from current_project import CurrentProject # Import CurrentProject from current_project.py
+from llm_client import generate
+from log_utils import get_logger, preview
 
-
-def extract_keywords(text: str) -> list:
-    """Extracts keywords from the provided text."""
-    stop_words = set(stopwords.words('english'))  # Define English stop words
-    words = word_tokenize(text) # Tokenize the text
-    keywords = [word for word in words if word.lower() not in stop_words and word.isalnum()] # Filter keywords
-    return keywords
+logger = get_logger(__name__)
 
 
 def get_api_key() -> str:
@@ -36,7 +26,6 @@ def get_api_key() -> str:
 def rephrase_prompt(user_request: str) -> str:
     """Rephrases the user request into an optimized prompt for an LLM."""
     temperature_value = st.session_state.get("temperature", 0.1)
-    print("Executing rephrase_prompt()")
     api_key = get_api_key()
     if not api_key:
         st.error("API key not found. Please enter your API key.")
@@ -66,30 +55,20 @@ def rephrase_prompt(user_request: str) -> str:
         "stream": False,  # Disable streaming for this request
     }
     headers = {"Content-Type": "application/json"}
-    print(f"Request URL: {url}")
-    print(f"Request Headers: {headers}")
-    print(f"Request Payload: {json.dumps(ollama_request, indent=2)}")
+    logger.debug("Rephrasing with %s at %s: %s", ollama_request["model"], url, preview(user_request))
     try:
-        print("Sending request to Ollama API...")
-        response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
-        print(f"Response received. Status Code: {response.status_code}")
-        if response.status_code == 200:
-            print("Request successful. Parsing response...")
-            response_data = response.json()
-            rephrased = response_data.get("response", "").strip()  # Extract "response" directly
-            return rephrased
-        print(f"Request failed. Status Code: {response.status_code}")
-        print(f"Response Content: {response.text}")
-        return None
+        # Reruns and other sessions asking to rephrase the same request share one generation
+        response_data = generate(ollama_url, ollama_request, headers=headers, timeout=240) # Added timeout
+        rephrased = response_data.get("response", "").strip()  # Extract "response" directly
+        return rephrased
     except requests.exceptions.RequestException as error:
-        print(f"Error occurred while sending the request: {str(error)}")
+        logger.error("Error occurred while sending the request: %s", error)
         return None
     except (KeyError, ValueError) as error:
-        print(f"Error occurred while parsing the response: {str(error)}")
-        print(f"Response Content: {response.text}")
+        logger.error("Error occurred while parsing the response: %s", error)
         return None
     except Exception as error:
-        print(f"An unexpected error occurred: {str(error)}")
+        logger.exception("An unexpected error occurred: %s", error)
         return None
 
 
@@ -98,7 +77,6 @@ def get_agents_from_text(text: str) -> tuple:
     api_key = get_api_key()
     temperature_value = st.session_state.get("temperature", 0.5)
     ollama_url = st.session_state.get("ollama_url", "http://localhost:11434")
-    url = f"{ollama_url}/api/generate"
     headers = {"Content-Type": "application/json"}
     available_skills = list(load_skills().keys())  # Get available skills
     # --- Extract goal, objectives, and deliverables ---
@@ -317,52 +295,47 @@ def get_agents_from_text(text: str) -> tuple:
         "stream": False,
     }
     try:
-        response = requests.post(url, json=ollama_request, headers=headers, timeout=240) # Added timeout
-        if response.status_code == 200:
-            response_data = response.json()
-            # Extract the JSON string from the "response" field and parse it
-            agent_list_str = response_data.get("response", "[]")
-            agent_list_data = json.loads(agent_list_str)
-
-            # Handle both direct array and "experts" key
-            if isinstance(agent_list_data, list):
-                agent_list = agent_list_data
-            elif isinstance(agent_list_data, dict) and "experts" in agent_list_data:
-                agent_list = agent_list_data["experts"]
-            else:
-                agent_list = []  # Default to empty list if no valid structure found
-
-            print(f"Raw content from Ollama: {agent_list}")
-            
-            # Return empty lists if no agents are found
-            if not agent_list:
-                return [], [], current_project
-
-            autogen_agents = []
-            crewai_agents = []
-
-            for agent_data in agent_list:
-                expert_name = agent_data.get("expert_name", "")
-                description = agent_data.get("description", "")
-                skills = agent_data.get("skills", [])
-                tools = agent_data.get("tools", [])
-                ollama_url = agent_data.get("ollama_url", "http://localhost:11434")
-                temperature = agent_data.get("temperature", 0.1)
-                model = agent_data.get("model", "mistral:instruct")
-                db_path = agent_data.get("db_path", os.path.join("./db", f"{expert_name}_memory")) # Get db_path from agent_data
-                enable_memory = agent_data.get("enable_memory", False)
-                moa_role = agent_data.get("moa_role", "proposer")
-                autogen_agent, crewai_agent = create_agent_data(
-                    expert_name, description, skills, tools, ollama_url=ollama_url, temperature=temperature, model=model, db_path=db_path, enable_memory=enable_memory, moa_role=moa_role
-                )
-                autogen_agents.append(autogen_agent)
-                crewai_agents.append(crewai_agent)
-            return autogen_agents, crewai_agents, current_project # Return the current project
-        print(
-            f"API request failed with status code {response.status_code}: {response.text}"
-        )
+        response_data = generate(ollama_url, ollama_request, headers=headers, timeout=240) # Added timeout
+        # Extract the JSON string from the "response" field and parse it
+        agent_list_str = response_data.get("response", "[]")
+        agent_list_data = json.loads(agent_list_str)
+
+        # Handle both direct array and "experts" key
+        if isinstance(agent_list_data, list):
+            agent_list = agent_list_data
+        elif isinstance(agent_list_data, dict) and "experts" in agent_list_data:
+            agent_list = agent_list_data["experts"]
+        else:
+            agent_list = []  # Default to empty list if no valid structure found
+
+        logger.debug("Raw content from Ollama: %s", preview(agent_list))
+        
+        # Return empty lists if no agents are found
+        if not agent_list:
+            return [], [], current_project
+
+        autogen_agents = []
+        crewai_agents = []
+
+        for agent_data in agent_list:
+            expert_name = agent_data.get("expert_name", "")
+            description = agent_data.get("description", "")
+            skills = agent_data.get("skills", [])
+            tools = agent_data.get("tools", [])
+            ollama_url = agent_data.get("ollama_url", "http://localhost:11434")
+            temperature = agent_data.get("temperature", 0.1)
+            model = agent_data.get("model", "mistral:instruct")
+            db_path = agent_data.get("db_path", os.path.join("./db", f"{expert_name}_memory")) # Get db_path from agent_data
+            enable_memory = agent_data.get("enable_memory", False)
+            moa_role = agent_data.get("moa_role", "proposer")
+            autogen_agent, crewai_agent = create_agent_data(
+                expert_name, description, skills, tools, ollama_url=ollama_url, temperature=temperature, model=model, db_path=db_path, enable_memory=enable_memory, moa_role=moa_role
+            )
+            autogen_agents.append(autogen_agent)
+            crewai_agents.append(crewai_agent)
+        return autogen_agents, crewai_agents, current_project # Return the current project
     except Exception as error:
-        print(f"Error making API request: {error}")
+        logger.error("Error making API request: %s", error)
     return [], [], None # Return None for current_project if there's an error
 
 
@@ -6,6 +6,12 @@ import time
 import requests
 import streamlit as st
 
+from model_residency import keep_alive_for
+from llm_client import generate, generate_stream
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
+
 def make_api_request(url: str, data: dict, headers: dict, api_key: str = None, timeout: int = 120) -> dict: # Updated timeout to 120
     """Makes an API request and returns the JSON response."""
     time.sleep(2)  # Throttle the request to ensure at least 2 seconds between calls
@@ -13,12 +19,10 @@ def make_api_request(url: str, data: dict, headers: dict, api_key: str = None, t
         response = requests.post(url, json=data, headers=headers, timeout=timeout)
         if response.status_code == 200:
             return response.json()
-        print(
-            f"Error: API request failed with status {response.status_code}, response: {response.text}"
-        )
+        logger.error("API request failed with status %d, response: %s", response.status_code, preview(response.text))
         return None
     except requests.RequestException as error:
-        print(f"Error: Request failed {error}")
+        logger.error("Request failed: %s", error)
         return None
 
 
@@ -67,7 +71,6 @@ def send_request_to_ollama_api(expert_name: str, request: str, api_key: str = No
     # --- Use agent-specific model if available ---
     model = agent_data.get("model") if agent_data else st.session_state.get("model", "mistral:instruct") # Access from agent_data
 
-    url = f"{ollama_url}/api/generate"
     data = {
         "model": model, # Use agent-specific model
         "prompt": request,
@@ -77,33 +80,27 @@ def send_request_to_ollama_api(expert_name: str, request: str, api_key: str = No
         },
         "stream": stream,  # Include stream parameter
     }
+    keep_alive = keep_alive_for(model, ollama_url)
+    if keep_alive is not None:
+        data["keep_alive"] = keep_alive  # Keep the team's models loaded between speakers
     headers = {
         "Content-Type": "application/json",
     }
 
     if stream:
         try:
-            response = requests.post(url, json=data, headers=headers, stream=True, timeout=timeout)
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode("utf-8")
-                    json_response = json.loads(decoded_line)
-                    # Update session state to trigger UI update
-                    st.session_state["update_ui"] = True
-                    st.session_state["next_agent"] = expert_name
-                    yield json_response
+            # Goes through the endpoint pool; an identical request already in flight is shared, not repeated
+            for json_response in generate_stream(ollama_url, data, headers=headers, timeout=timeout):
+                # Update session state to trigger UI update
+                st.session_state["update_ui"] = True
+                st.session_state["next_agent"] = expert_name
+                yield json_response
         except requests.exceptions.RequestException as e:
             st.error(f"Request failed: {e}")
             return None
     else:
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=timeout)
-            if response.status_code == 200:           
-               return response.json()  # Return the JSON response directly
-            print(
-                f"Error: API request failed with status {response.status_code}, response: {response.text}"
-            )
-            return None
+            return generate(ollama_url, data, headers=headers, timeout=timeout)  # The final response with the whole reply
         except requests.exceptions.RequestException as e:
             st.error(f"Request failed: {e}")
             return None
@@ -0,0 +1,99 @@
+# TeamForgeAI/auto_mode.py
+import queue
+import threading
+import uuid
+
+import streamlit as st
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+AUTO_MODE_POLL_SECONDS = 1.0  # How often the page checks a running job for progress
+FINISHED_JOBS_KEPT = 10
+
+
+class AutoModeJob:
+    """
+    Runs an auto mode group chat on a background thread, so the Streamlit script never blocks on it.
+
+    The worker must not touch st.session_state: it publishes events to a queue instead, and the
+    script drains them on each rerun. Cancellation is cooperative; the worker checks
+    `cancelled` between turns and while a reply is streaming.
+    """
+
+    def __init__(self, run, total_turns: int = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = "pending"
+        self.error = None
+        self.turns_done = 0
+        self.total_turns = total_turns
+        self._run = run
+        self._events = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def start(self) -> "AutoModeJob":
+        self.status = "running"
+        self._thread = threading.Thread(target=self._main, name=f"auto-mode-{self.id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def publish(self, kind: str, **data) -> None:
+        """Queues an event for the UI, e.g. publish("turn", speaker=..., reply=...)."""
+        if kind == "turn":
+            self.turns_done += 1
+        self._events.put(dict(data, type=kind, job_id=self.id))
+
+    def drain(self) -> list:
+        """Returns the events published since the last call."""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _main(self) -> None:
+        try:
+            self._run(self)
+            self.status = "cancelled" if self.cancelled() else "done"
+        except Exception as error:
+            self.status, self.error = "error", str(error)
+            logger.exception("Auto mode job %s failed: %s", self.id, error)
+        self._events.put({"type": "status", "job_id": self.id, "status": self.status, "error": self.error})
+
+
+@st.cache_resource(show_spinner=False)
+def job_registry() -> dict:
+    """Jobs by id, shared across reruns so a running job outlives the script run that started it."""
+    return {}
+
+
+def start_job(run, total_turns: int = None) -> AutoModeJob:
+    """
+    Starts run(job) on a background thread and registers the job.
+
+    :param run: A callable receiving the job; it reports progress with job.publish and stops
+                early when job.cancelled() returns True.
+    """
+    registry = job_registry()
+    finished = [job_id for job_id, job in registry.items() if not job.running]
+    for job_id in finished[:-FINISHED_JOBS_KEPT]:
+        del registry[job_id]
+    job = AutoModeJob(run, total_turns)
+    registry[job.id] = job
+    return job.start()
+
+
+def get_job(job_id: str) -> AutoModeJob:
+    return job_registry().get(job_id) if job_id else None
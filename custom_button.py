@@ -1,6 +1,10 @@
 # TeamForgeAI/custom_button.py
 import streamlit.components.v1 as components
 
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
 def custom_button(expert_name: str, index: int, next_agent: str) -> None:
     """
     Generate a custom button with specific styles and behaviors.
@@ -40,7 +44,7 @@ def custom_button(expert_name: str, index: int, next_agent: str) -> None:
     try:
         components.html(button_style + button_html, height=50)
     except Exception as e:
-        print(f"Error in custom_button: {e}")
+        logger.error("Error in custom_button: %s", e)
 
 def agent_button(expert_name: str, index: int, next_agent: str) -> None:
     """
@@ -56,4 +60,4 @@ def agent_button(expert_name: str, index: int, next_agent: str) -> None:
     try:
         custom_button(expert_name, index, next_agent)
     except Exception as e:
-        print(f"Error in agent_button: {e}")
+        logger.error("Error in agent_button: %s", e)
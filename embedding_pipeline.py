@@ -0,0 +1,192 @@
+# TeamForgeAI/embedding_pipeline.py
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from log_utils import get_logger, sampled
+
+logger = get_logger(__name__)
+DEFAULT_EMBEDDING_MODEL = "llama2"  # Same default model as langchain's OllamaEmbeddings
+DEFAULT_EMBEDDING_HOSTS = ["http://localhost:11434"]
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CONCURRENCY = 2  # Concurrent batches per host
+CHECKPOINT_DIR = "./db/embedding_checkpoints"
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates the token count of a text (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def parse_hosts(hosts) -> list:
+    """Normalizes a comma-separated string or list of Ollama hosts."""
+    if isinstance(hosts, str):
+        hosts = hosts.split(",")
+    hosts = [host.strip().rstrip("/") for host in hosts or [] if host and host.strip()]
+    return hosts or list(DEFAULT_EMBEDDING_HOSTS)
+
+
+def embed_batch(base_url: str, model: str, texts: list, timeout: int = 600) -> tuple:
+    """Embeds a batch of texts on a single Ollama host and returns (embeddings, token_count)."""
+    response = requests.post(f"{base_url}/api/embed", json={"model": model, "input": texts}, timeout=timeout)
+    if response.status_code == 404:
+        # Older Ollama servers only expose the one-prompt-per-call endpoint
+        embeddings = []
+        for text in texts:
+            single_response = requests.post(f"{base_url}/api/embeddings", json={"model": model, "prompt": text}, timeout=timeout)
+            single_response.raise_for_status()
+            embeddings.append(single_response.json()["embedding"])
+        return embeddings, sum(estimate_tokens(text) for text in texts)
+    response.raise_for_status()
+    response_data = response.json()
+    token_count = response_data.get("prompt_eval_count") or sum(estimate_tokens(text) for text in texts)
+    return response_data["embeddings"], token_count
+
+
+def checkpoint_path_for(texts: list, model: str, directory: str = CHECKPOINT_DIR) -> str:
+    """Returns a checkpoint file path that is unique to the model and the exact chunk list."""
+    digest = hashlib.sha256(model.encode("utf-8"))
+    for text in texts:
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+    return os.path.join(directory, f"{digest.hexdigest()[:32]}.jsonl")
+
+
+class EmbeddingPipeline:
+    """Embeds chunks in batches, spread over one or more Ollama hosts, with resumable checkpoints."""
+
+    def __init__(self, hosts=None, model=DEFAULT_EMBEDDING_MODEL, batch_size=DEFAULT_BATCH_SIZE, concurrency=DEFAULT_CONCURRENCY, checkpoint_path=None, timeout=600):
+        self.hosts = parse_hosts(hosts)
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.concurrency = max(1, int(concurrency))
+        self.checkpoint_path = checkpoint_path
+        self.timeout = timeout
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def embed(self, texts: list, progress_callback=None) -> list:
+        """
+        Embeds all texts and returns their vectors in input order.
+
+        :param texts: The chunks to embed.
+        :param progress_callback: Optional callable receiving (chunks_done, total_chunks, stats).
+        :return: A list of embedding vectors, one per text.
+        """
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        results = self._load_checkpoint(len(batches))
+        resumed_chunks = sum(len(batches[index]) for index in results)
+        chunks_done = resumed_chunks
+        tokens_done = 0
+        start_time = time.perf_counter()
+        self._update_stats(len(texts), chunks_done, resumed_chunks, tokens_done, start_time)
+        if progress_callback:
+            progress_callback(chunks_done, len(texts), self.stats)
+
+        pending = [index for index in range(len(batches)) if index not in results]
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.concurrency * len(self.hosts)) as executor:
+                futures = {executor.submit(self._embed_with_failover, index, batches[index]): index for index in pending}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    embeddings, token_count = future.result()
+                    results[index] = embeddings
+                    self._append_checkpoint(index, embeddings)
+                    chunks_done += len(batches[index])
+                    tokens_done += token_count
+                    self._update_stats(len(texts), chunks_done, resumed_chunks, tokens_done, start_time)
+                    if progress_callback:
+                        progress_callback(chunks_done, len(texts), self.stats)
+
+        self._remove_checkpoint()  # Every batch is done; the caller now owns the vectors
+        return [vector for index in range(len(batches)) for vector in results[index]]
+
+    def embed_query(self, text: str) -> list:
+        """Embeds a single query string on the first available host."""
+        embeddings, _ = self._embed_with_failover(0, [text])
+        return embeddings[0]
+
+    def _embed_with_failover(self, batch_index: int, texts: list) -> tuple:
+        """Sends a batch to its assigned host, falling back to the other hosts on failure."""
+        last_error = None
+        for attempt in range(len(self.hosts)):
+            host = self.hosts[(batch_index + attempt) % len(self.hosts)]
+            try:
+                return embed_batch(host, self.model, texts, timeout=self.timeout)
+            except (requests.exceptions.RequestException, KeyError, ValueError) as error:
+                logger.warning("Embedding batch %d failed on %s: %s", batch_index, host, error, extra=sampled(10))  # A dead host fails every batch
+                last_error = error
+        raise RuntimeError(f"Embedding batch {batch_index} failed on all hosts: {last_error}")
+
+    def _update_stats(self, total_chunks: int, chunks_done: int, resumed_chunks: int, tokens_done: int, start_time: float) -> None:
+        """Refreshes the throughput statistics for the chunks embedded in this run."""
+        elapsed = time.perf_counter() - start_time
+        embedded_now = chunks_done - resumed_chunks
+        self.stats = {
+            "total_chunks": total_chunks,
+            "chunks_done": chunks_done,
+            "resumed_chunks": resumed_chunks,
+            "tokens": tokens_done,
+            "elapsed_seconds": elapsed,
+            "chunks_per_second": embedded_now / elapsed if elapsed > 0 else 0.0,
+            "tokens_per_second": tokens_done / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _load_checkpoint(self, batch_count: int) -> dict:
+        """Loads completed batches from the checkpoint file, discarding it if it does not match this run."""
+        results = {}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return results
+        truncated = False
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as file:
+                header = json.loads(file.readline() or "{}")
+                if header.get("model") != self.model or header.get("batch_size") != self.batch_size:
+                    raise ValueError("checkpoint was written with different settings")
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        truncated = True  # A partially written last line from an interrupted run
+                        break
+                    if 0 <= record["batch"] < batch_count:
+                        results[record["batch"]] = record["embeddings"]
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Discarding embedding checkpoint %s: %s", self.checkpoint_path, error)
+            os.remove(self.checkpoint_path)
+            return {}
+        if truncated:
+            # Rewrite the file without the partial line so new batches append cleanly
+            os.remove(self.checkpoint_path)
+            for batch_index, embeddings in results.items():
+                self._append_checkpoint(batch_index, embeddings)
+        return results
+
+    def _append_checkpoint(self, batch_index: int, embeddings: list) -> None:
+        """Appends a finished batch to the checkpoint file."""
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+            new_file = not os.path.exists(self.checkpoint_path)
+            with open(self.checkpoint_path, "a", encoding="utf-8") as file:
+                if new_file:
+                    file.write(json.dumps({"model": self.model, "batch_size": self.batch_size}) + "\n")
+                file.write(json.dumps({"batch": batch_index, "embeddings": embeddings}) + "\n")
+
+    def _remove_checkpoint(self) -> None:
+        """Deletes the checkpoint file of a finished run."""
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            try:
+                os.remove(self.checkpoint_path)
+            except FileNotFoundError:
+                pass
+            except OSError as error:
+                logger.warning("Could not remove embedding checkpoint %s: %s", self.checkpoint_path, error)
@@ -0,0 +1,229 @@
+# TeamForgeAI/endpoint_pool.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+import streamlit as st
+
+from log_utils import get_logger
+
+ENDPOINTS_ENV = "TEAMFORGE_OLLAMA_ENDPOINTS"  # e.g. "http://box1:11434=2, http://box2:11434"
+HEALTH_CHECK_SECONDS = 15
+INITIAL_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 300
+RESIDENT_DISCOUNT = 0.5  # A loaded model is worth about one request in the queue
+
+logger = get_logger(__name__)
+_configured_spec = os.environ.get(ENDPOINTS_ENV, "")
+
+
+def parse_endpoints(spec: str) -> list:
+    """Parses "url[=weight], url[=weight], ..." into [(url, weight)]."""
+    endpoints = []
+    for item in spec.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, weight = item, 1.0
+        if "=" in item:
+            head, tail = item.rsplit("=", 1)
+            try:
+                url, weight = head.strip(), max(float(tail), 0.01)
+            except ValueError:
+                pass  # An "=" that belongs to the URL
+        endpoints.append((url.rstrip("/"), weight))
+    return endpoints
+
+
+class Endpoint:
+    """One Ollama server in a pool and what the pool knows about it."""
+
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url
+        self.weight = weight
+        self.in_flight = 0
+        self.failures = 0
+        self.retry_at = 0.0  # While in the future, the endpoint is ejected
+        self.available_models = None  # From /api/tags; None until the first health check
+        self.resident_models = set()  # From /api/ps and the models this pool last sent here
+
+    @property
+    def ejected(self) -> bool:
+        return self.retry_at > time.time()
+
+    def score(self, model: str) -> float:
+        """Outstanding requests per unit of weight, lower is better; a resident model counts as less load."""
+        score = (self.in_flight + 1) / self.weight
+        return score * RESIDENT_DISCOUNT if model in self.resident_models else score
+
+
+class EndpointPool:
+    """
+    Spreads requests over several Ollama servers.
+
+    Each request goes to the healthy endpoint with the fewest outstanding requests per unit of
+    weight, preferring endpoints that already have the model loaded and that have it pulled at
+    all. An endpoint that fails is ejected and retried with exponential backoff; a background
+    thread checks every endpoint's /api/tags and /api/ps.
+    """
+
+    def __init__(self, endpoints: list):
+        """:param endpoints: A list of (url, weight) pairs."""
+        self.endpoints = [Endpoint(url, weight) for url, weight in endpoints]
+        self._lock = threading.Lock()
+        self._checker = None
+
+    def __contains__(self, url: str) -> bool:
+        return any(endpoint.url == url.rstrip("/") for endpoint in self.endpoints)
+
+    def pick(self, model: str, exclude=()) -> Endpoint:
+        """Chooses an endpoint for model and counts the request against it; release it with release()."""
+        self._start_health_checks()
+        with self._lock:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude] or self.endpoints
+            healthy = [endpoint for endpoint in candidates if not endpoint.ejected]
+            if not healthy:
+                # Everything is ejected: try the endpoint that is due for a retry first rather than fail
+                endpoint = min(candidates, key=lambda endpoint: endpoint.retry_at)
+            else:
+                with_model = [endpoint for endpoint in healthy if endpoint.available_models is None or model in endpoint.available_models]
+                endpoint = min(with_model or healthy, key=lambda endpoint: endpoint.score(model))
+            endpoint.in_flight += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, model: str = None, failed: bool = False) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+            if failed:
+                self._mark_failed(endpoint)
+            else:
+                endpoint.failures, endpoint.retry_at = 0, 0.0
+                if model:
+                    endpoint.resident_models.add(model)
+
+    def _mark_failed(self, endpoint: Endpoint) -> None:
+        endpoint.failures += 1
+        backoff = min(MAX_BACKOFF_SECONDS, INITIAL_BACKOFF_SECONDS * 2 ** (endpoint.failures - 1))
+        endpoint.retry_at = time.time() + backoff
+        logger.warning("Ejected Ollama endpoint %s for %ss after %d failure(s)", endpoint.url, backoff, endpoint.failures)
+
+    @contextmanager
+    def post(self, path: str, model: str, **kwargs):
+        """
+        POSTs to path on the best endpoint for model and yields the response.
+
+        Connection errors, timeouts and 5xx responses eject the endpoint and the request moves on
+        to the next one; once the response is yielded (e.g. while streaming) it is not retried.
+
+        :param kwargs: Passed on to requests.post, e.g. json, headers, stream and timeout.
+        """
+        tried = []
+        while True:
+            endpoint = self.pick(model, exclude=tried)
+            response = None
+            try:
+                response = requests.post(f"{endpoint.url}{path}", **kwargs)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException:
+                if response is not None:
+                    response.close()
+                self.release(endpoint, failed=True)
+                tried.append(endpoint)
+                if len(tried) >= len(self.endpoints):
+                    raise
+                continue
+            break
+        failed = False
+        try:
+            yield response
+        except requests.exceptions.RequestException:
+            failed = True
+            raise
+        finally:
+            response.close()
+            self.release(endpoint, model if response.ok else None, failed=failed)
+
+    def check_health(self) -> None:
+        """Refreshes every endpoint's models and health; ejected endpoints are only retried once their backoff expired."""
+        for endpoint in self.endpoints:
+            if endpoint.ejected:
+                continue
+            try:
+                tags = requests.get(f"{endpoint.url}/api/tags", timeout=5)
+                tags.raise_for_status()
+                loaded = requests.get(f"{endpoint.url}/api/ps", timeout=5)
+                resident = {model["name"] for model in loaded.json().get("models", [])} if loaded.ok else set()
+            except (requests.exceptions.RequestException, ValueError):
+                with self._lock:
+                    self._mark_failed(endpoint)  # Backs off further if it was ejected before
+                continue
+            with self._lock:
+                endpoint.available_models = {model["name"] for model in tags.json().get("models", [])}
+                endpoint.resident_models = resident
+                endpoint.failures, endpoint.retry_at = 0, 0.0
+
+    def status(self) -> list:
+        """A row per endpoint, for display."""
+        return [
+            {
+                "Endpoint": endpoint.url,
+                "Weight": endpoint.weight,
+                "In flight": endpoint.in_flight,
+                "Healthy": not endpoint.ejected,
+                "Loaded models": ", ".join(sorted(endpoint.resident_models)),
+            }
+            for endpoint in self.endpoints
+        ]
+
+    def _start_health_checks(self) -> None:
+        if len(self.endpoints) < 2:
+            return  # A single endpoint has nowhere else to route
+        with self._lock:
+            if self._checker is not None:
+                return
+            self._checker = threading.Thread(target=self._health_loop, name="endpoint-health", daemon=True)
+        self._checker.start()
+
+    def _health_loop(self) -> None:
+        while True:
+            self.check_health()
+            time.sleep(HEALTH_CHECK_SECONDS)
+
+
+@st.cache_resource(show_spinner=False)
+def load_endpoint_pool(spec: str) -> EndpointPool:
+    """One pool per endpoint list, so in-flight counts are shared by every session and thread."""
+    return EndpointPool(parse_endpoints(spec))
+
+
+def configure_endpoints(spec: str) -> None:
+    """
+    Sets the server-wide endpoint list (see parse_endpoints); an empty spec turns pooling off.
+
+    Every session and background job routes through it, so only call this for an explicit
+    change, never on every render.
+    """
+    global _configured_spec
+    _configured_spec = spec or ""
+    logger.info("Endpoint pool set to %s", _configured_spec or "none")
+
+
+def configured_endpoints() -> str:
+    """The server-wide endpoint list, as set by TEAMFORGE_OLLAMA_ENDPOINTS or configure_endpoints()."""
+    return _configured_spec
+
+
+def get_endpoint_pool(ollama_url: str) -> EndpointPool:
+    """
+    The pool that requests for ollama_url go through.
+
+    An agent whose URL is one of the configured endpoints shares the whole pool; any other URL
+    gets a pool of its own, so agents pointed at a specific server stay on it.
+    """
+    pool = load_endpoint_pool(_configured_spec) if _configured_spec else None
+    if pool is not None and ollama_url in pool:
+        return pool
+    return load_endpoint_pool(ollama_url.rstrip("/"))
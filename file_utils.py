@@ -4,6 +4,9 @@ import os
 import random
 
 from agent_creation import create_autogen_agent # Import from agent_creation.py
+from log_utils import get_logger
+
+logger = get_logger(__name__)
 
 def sanitize_text(text: str) -> str:
     """Sanitizes the provided text by removing non-printable characters."""
@@ -116,7 +119,7 @@ def load_skills() -> dict:
                 skill_function = getattr(module, module_name)
                 skill_functions[module_name] = skill_function
             except ImportError as error:
-                print(f"Error importing skill from {filename}: {error}")
+                logger.error("Error importing skill from %s: %s", filename, error)
     return skill_functions
 
 def save_agent_to_json(agent_data: dict, filename: str) -> None:
@@ -146,5 +149,5 @@ def load_agents_from_json(directory: str) -> list:
                     agent_data = json.load(file)
                     agents.append(agent_data) # Append the agent data
             except Exception as error:
-                print(f"Error loading agent from {filepath}: {error}")
+                logger.error("Error loading agent from %s: %s", filepath, error)
     return agents
@@ -0,0 +1,89 @@
+# TeamForgeAI/group_chat_prompt.py
+import re
+
+CHARS_PER_TOKEN = 4  # Rough estimate; good enough to stay inside the context window
+DEFAULT_PROMPT_BUDGET_TOKENS = 1500  # Leaves room for a 512-token reply in Ollama's default 2048-token context
+SUMMARY_SHARE = 0.25  # At most this share of the budget goes to the summary of earlier turns
+SUMMARY_LINE_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def summary_line(message: dict) -> str:
+    """One line for a turn that left the window: the speaker and the first sentence of what they said."""
+    content = " ".join(message["content"].split())
+    first_sentence = re.split(r"(?<=[.!?])\s", content, maxsplit=1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS].rstrip() + "…"
+    return f"- {message['sender']}: {first_sentence}"
+
+
+class GroupChatPrompt:
+    """
+    Builds the prompt for the next speaker of a group chat within a token budget.
+
+    The prompt holds the task, a summary of the turns that no longer fit and a window of the
+    latest turns verbatim, each attributed to its speaker. When the budget is exceeded the
+    window drops its older half at once rather than one turn per reply, so the start of the
+    prompt stays the same for several turns and Ollama's prompt cache only evaluates the new
+    turns.
+    """
+
+    def __init__(self, budget_tokens: int = DEFAULT_PROMPT_BUDGET_TOKENS, summarize=None):
+        """
+        :param budget_tokens: The largest prompt to build, in (estimated) tokens.
+        :param summarize: Optional callable turning a list of summary lines into a shorter text;
+                          by default the lines are kept as they are and the oldest ones dropped.
+        """
+        self.budget_tokens = budget_tokens
+        self.summarize = summarize
+        self.window_start = 1  # Index of the first message shown verbatim; message 0 is the task
+        self.summary_lines = []
+
+    def build(self, messages: list, speaker: str) -> str:
+        """
+        :param messages: The chat so far as {"sender", "content"} dictionaries, the task first.
+        :param speaker: The name of the agent that speaks next.
+        """
+        if not messages:
+            return f"{speaker}:"
+        if self.window_start > len(messages):
+            self.window_start, self.summary_lines = 1, []  # A new chat
+        prompt = self._render(messages, speaker)
+        while estimate_tokens(prompt) > self.budget_tokens and self.window_start < len(messages) - 1:
+            window = len(messages) - self.window_start
+            dropped = messages[self.window_start:self.window_start + max(1, window // 2)]
+            self.summary_lines.extend(summary_line(message) for message in dropped)
+            self.window_start += len(dropped)
+            prompt = self._render(messages, speaker)
+        return prompt
+
+    def _summary(self) -> str:
+        limit = int(self.budget_tokens * SUMMARY_SHARE) * CHARS_PER_TOKEN
+        if self.summarize and len("\n".join(self.summary_lines)) > limit:
+            self.summary_lines = [self.summarize(self.summary_lines)[:limit]]
+        lines = []
+        for line in reversed(self.summary_lines):  # The most recent turns matter most
+            if sum(len(kept) + 1 for kept in lines) + len(line) > limit:
+                break
+            lines.append(line)
+        return "\n".join(reversed(lines))
+
+    def _render(self, messages: list, speaker: str) -> str:
+        turn_limit = self.budget_tokens * CHARS_PER_TOKEN // 2  # No single turn may take more than half the budget
+        parts = [f"Task: {messages[0]['content'][:turn_limit]}"]
+        summary = self._summary()
+        if summary:
+            parts.append(f"Summary of earlier turns:\n{summary}")
+        turns = []
+        for message in messages[self.window_start:]:
+            content = message["content"]
+            if len(content) > turn_limit:
+                content = content[:turn_limit // 2] + "\n[…]\n" + content[-turn_limit // 2:]
+            turns.append(f"{message['sender']}: {content}")
+        if turns:
+            parts.append("Discussion:\n" + "\n\n".join(turns))
+        parts.append(f"{speaker}:")
+        return "\n\n".join(parts)
@@ -0,0 +1,191 @@
+# TeamForgeAI/keywords.py
+"""
+Keyword and keyphrase extraction for search queries and memory lookups.
+
+The default path is plain Python: a precompiled regex tokenizer and the built-in stop word
+set, so extracting keywords from a long discussion never imports NLTK or touches its data.
+Keyphrases are the runs of words between stop words and punctuation, ranked with RAKE
+(word degree over frequency) or a YAKE-style score (casing, position, frequency, context
+spread and sentence spread of each word).
+"""
+import math
+import re
+import statistics
+from collections import Counter, defaultdict
+
+from nltk_resources import ENGLISH_STOP_WORDS
+
+WORD_PATTERN = re.compile(r"[^\W_]+(?:\.\d+)*")  # Runs of letters and digits; version numbers such as 3.12 stay whole
+SENTENCE_BREAK = re.compile(r"[.!?]+(?:\s|$)|\n+")
+PHRASE_BREAK = re.compile(r"[,;:()\[\]{}\"`*#|<>=/\\]+|\s[-–—]+\s")
+MAX_PHRASE_WORDS = 3
+DEFAULT_MAX_PHRASES = 10
+DEFAULT_QUERY_TERMS = 10
+SCORING_METHODS = ("rake", "yake")
+
+
+def tokenize(text: str, use_nltk: bool = False) -> list:
+    """Splits text into words; with use_nltk, NLTK's tokenizer (when available) decides the boundaries."""
+    if use_nltk:
+        from nltk_resources import tokenize as nltk_tokenize
+        return [word for word in nltk_tokenize(text) if word.isalnum()]
+    return WORD_PATTERN.findall(text)
+
+
+def _stop_words(use_nltk: bool) -> frozenset:
+    if use_nltk:
+        from nltk_resources import stop_words
+        return stop_words()
+    return ENGLISH_STOP_WORDS
+
+
+def extract_keywords(text: str, use_nltk: bool = False) -> list:
+    """Every word of text that is not a stop word, in order and unranked."""
+    stop_words = _stop_words(use_nltk)
+    return [word for word in tokenize(text, use_nltk) if word.lower() not in stop_words]
+
+
+def _candidates(text: str) -> list:
+    """
+    (sentence index, [(word, sentence-initial)]) for each whole run of content words between
+    stop words and punctuation; runs are only cut to phrase length after scoring.
+    """
+    runs = []
+    for sentence_index, sentence in enumerate(SENTENCE_BREAK.split(text)):
+        first = True
+        for fragment in PHRASE_BREAK.split(sentence):
+            run = []
+            for word in WORD_PATTERN.findall(fragment):
+                if word.lower() in ENGLISH_STOP_WORDS or (word.replace(".", "").isdigit() and not run):
+                    if run:
+                        runs.append((sentence_index, run))
+                    run = []
+                else:
+                    run.append((word, first))
+                first = False
+            if run:
+                runs.append((sentence_index, run))
+    return runs
+
+
+def _windows(runs: list) -> list:
+    """The runs with every run longer than MAX_PHRASE_WORDS replaced by its overlapping windows."""
+    return [
+        (sentence_index, run[start:start + MAX_PHRASE_WORDS])
+        for sentence_index, run in runs
+        for start in range(max(1, len(run) - MAX_PHRASE_WORDS + 1))
+    ]
+
+
+def _rake(runs: list) -> dict:
+    """
+    Phrase (lower case) -> RAKE score: the sum of its words' degree / frequency; higher is better.
+
+    Degrees come from the whole runs, so words that co-occur with many others still stand out;
+    the scored phrases are the runs' windows of at most MAX_PHRASE_WORDS words.
+    """
+    frequency = Counter()
+    degree = Counter()
+    for _, run in runs:
+        for word, _ in run:
+            frequency[word.lower()] += 1
+            degree[word.lower()] += len(run)
+    scores = {}
+    for _, run in _windows(runs):
+        words = [word.lower() for word, _ in run]
+        scores[" ".join(words)] = sum(degree[word] / frequency[word] for word in words)
+    return scores
+
+
+def _yake(runs: list, sentence_count: int) -> dict:
+    """Phrase (lower case) -> the inverse of its YAKE score, so that here too higher is better."""
+    frequency = Counter()
+    capitalized = Counter()
+    sentences = defaultdict(list)
+    left = defaultdict(list)
+    right = defaultdict(list)
+    for sentence_index, run in runs:
+        words = [word.lower() for word, _ in run]
+        for position, (word, first) in enumerate(run):
+            key = words[position]
+            frequency[key] += 1
+            capitalized[key] += (word[:1].isupper() and not first) or (len(word) > 1 and word.isupper())
+            sentences[key].append(sentence_index)
+            if position:
+                left[key].append(words[position - 1])
+            if position + 1 < len(words):
+                right[key].append(words[position + 1])
+    counts = list(frequency.values())
+    mean, deviation = statistics.fmean(counts), statistics.pstdev(counts)
+    max_frequency = max(counts)
+    word_scores = {}
+    for word, count in frequency.items():
+        casing = capitalized[word] / (1 + math.log(count))
+        position = math.log(math.log(3 + statistics.median(sentences[word])))
+        relative_frequency = count / (mean + deviation)
+        spread = sum(len(set(neighbours)) / len(neighbours) for neighbours in (left[word], right[word]) if neighbours)
+        relatedness = 1 + spread * count / max_frequency
+        sentence_spread = len(set(sentences[word])) / sentence_count
+        word_scores[word] = relatedness * position / (
+            casing + relative_frequency / relatedness + sentence_spread / relatedness
+        )
+    phrase_frequency = Counter(" ".join(word.lower() for word, _ in run) for _, run in runs)
+    scores = {}
+    for phrase, count in phrase_frequency.items():
+        words = phrase.split()
+        product = math.prod(word_scores[word] for word in words)
+        scores[phrase] = count * (1 + sum(word_scores[word] for word in words)) / product
+    return scores
+
+
+def extract_keyphrases(text: str, max_phrases: int = DEFAULT_MAX_PHRASES, method: str = "rake") -> list:
+    """
+    The best (phrase, score) pairs of text, best first; higher scores are better.
+
+    Phrases are deduplicated ignoring case, and a phrase whose words all belong to a better
+    one is dropped, so "web search" does not follow "google web search".
+
+    :param method: "rake", or "yake" to favour capitalized, early and context-specific words.
+    """
+    if method not in SCORING_METHODS:
+        raise ValueError(f"Unknown keyphrase scoring method {method!r}; use one of {', '.join(SCORING_METHODS)}")
+    runs = _candidates(text)
+    if not runs:
+        return []
+    if method == "rake":
+        scores = _rake(runs)
+    else:
+        scores = _yake(_windows(runs), max(run[0] for run in runs) + 1)
+    surface = {}
+    for _, run in _windows(runs):
+        surface.setdefault(" ".join(word.lower() for word, _ in run), " ".join(word for word, _ in run))
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    selected = []
+    for phrase, score in ranked:
+        words = set(phrase.split())
+        if any(words <= chosen for _, _, chosen in selected):
+            continue
+        selected.append((surface[phrase], score, words))
+        if len(selected) == max_phrases:
+            break
+    return [(phrase, score) for phrase, score, _ in selected]
+
+
+def build_query(*texts: str, max_terms: int = DEFAULT_QUERY_TERMS, method: str = "rake") -> str:
+    """
+    A search query of at most max_terms words from the best keyphrases of texts.
+
+    Texts are given most important first; each one's phrases are used before the next one's,
+    and a word already in the query is not repeated.
+    """
+    terms = []
+    seen = set()
+    for text in texts:
+        for phrase, _ in extract_keyphrases(text or "", max_phrases=max_terms, method=method):
+            for word in phrase.split():
+                if word.lower() not in seen and len(terms) < max_terms:
+                    seen.add(word.lower())
+                    terms.append(word)
+            if len(terms) == max_terms:
+                return " ".join(terms)
+    return " ".join(terms)
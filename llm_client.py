@@ -0,0 +1,169 @@
+# TeamForgeAI/llm_client.py
+import copy
+import hashlib
+import json
+import threading
+
+from endpoint_pool import get_endpoint_pool
+from llm_scheduler import INTERACTIVE, get_scheduler
+
+# Request fields that do not change what the model generates, so they are left out of the coalescing key
+NON_SEMANTIC_FIELDS = ("stream", "keep_alive")
+
+
+def request_key(ollama_url: str, payload: dict) -> str:
+    """Identifies a generation by endpoint, model, prompt and options."""
+    semantic = {key: value for key, value in payload.items() if key not in NON_SEMANTIC_FIELDS}
+    return hashlib.sha256(json.dumps([ollama_url.rstrip("/"), semantic], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Flight:
+    """
+    One upstream /api/generate stream shared by every caller that asked for the same generation.
+
+    Chunks are kept, so a caller that joins late still receives the whole reply. When every
+    caller has gone (e.g. all were cancelled), the upstream request is closed. The subscriber
+    count and the abandoned flag belong to SingleFlight and only change under its lock.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self.abandoned = False
+        self.ticket = None  # The flight's place in the LLM scheduler
+        self._condition = threading.Condition()
+
+    def publish(self, chunk: dict) -> None:
+        with self._condition:
+            self.chunks.append(chunk)
+            self._condition.notify_all()
+
+    def finish(self, error: Exception = None) -> None:
+        with self._condition:
+            self.done, self.error = True, error
+            self._condition.notify_all()
+
+    def failure(self) -> Exception:
+        """
+        The flight's error for one subscriber: a copy of the same type, chained to the original,
+        so threads raising it at the same time do not share one exception and its traceback.
+        """
+        try:
+            error = copy.copy(self.error)
+        except Exception:
+            error = RuntimeError(f"Shared generation failed: {self.error}")
+        error.__cause__ = self.error
+        return error
+
+    def follow(self, should_stop=None):
+        """Yields every chunk of the flight, from the first, as it arrives."""
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.done:
+                    self._condition.wait(timeout=0.5)
+                    if should_stop and should_stop():
+                        return
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                    index += 1
+                elif self.error is not None:
+                    raise self.failure()
+                else:
+                    return
+            yield chunk
+            if should_stop and should_stop():
+                return
+
+
+class SingleFlight:
+    """Coalesces identical concurrent generations into one upstream call."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.shared = 0  # Calls that were served by a flight another caller started
+
+    def stream(self, ollama_url: str, payload: dict, headers: dict = None, timeout: float = None, should_stop=None, priority: str = INTERACTIVE):
+        """
+        Yields the JSON chunks of a streaming /api/generate call.
+
+        If the same generation is already in flight, this joins it instead of sending another request.
+
+        :param should_stop: Optional callable; when it returns True this caller stops receiving chunks.
+        :param priority: The llm_scheduler class of the request; joining a queued request raises it to this class.
+        """
+        # A generator: nothing is joined or sent until the first chunk is asked for, and the caller
+        # is subscribed only together with the finally that unsubscribes it
+        key = request_key(ollama_url, payload)
+        flight = self._join(key, ollama_url, payload, headers, timeout, priority)
+        try:
+            yield from flight.follow(should_stop)
+        finally:
+            self._leave(key, flight)
+
+    def _join(self, key, ollama_url, payload, headers, timeout, priority) -> Flight:
+        scheduler = get_scheduler()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Flight()
+                flight.ticket = scheduler.enqueue(priority)
+                threading.Thread(target=self._fly, args=(key, flight, ollama_url, payload, headers, timeout), daemon=True).start()
+            else:
+                self.shared += 1
+                scheduler.promote(flight.ticket, priority)
+            flight.subscribers += 1
+            return flight
+
+    def _leave(self, key, flight):
+        with self._lock:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody can join an abandoned flight: later identical calls start a fresh generation
+                flight.abandoned = True
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def _fly(self, key, flight, ollama_url, payload, headers, timeout):
+        error = None
+        scheduler = get_scheduler()
+        scheduler.wait(flight.ticket)
+        try:
+            if flight.abandoned:
+                return  # Everybody gave up while the request was queued
+            with get_endpoint_pool(ollama_url).post("/api/generate", payload["model"], json=dict(payload, stream=True), headers=headers, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if flight.abandoned:
+                        break  # Closing the response makes Ollama stop generating
+                    if line:
+                        flight.publish(json.loads(line.decode("utf-8")))
+        except Exception as exception:
+            error = exception
+        finally:
+            scheduler.release(flight.ticket)
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]  # Later calls start a fresh generation
+            flight.finish(error)
+
+
+_single_flight = SingleFlight()
+
+
+def generate_stream(ollama_url: str, payload: dict, headers: dict = None, timeout: float = None, should_stop=None, priority: str = INTERACTIVE):
+    """Yields the JSON chunks of a streaming /api/generate call, shared with identical concurrent calls."""
+    return _single_flight.stream(ollama_url, payload, headers, timeout, should_stop, priority)
+
+
+def generate(ollama_url: str, payload: dict, headers: dict = None, timeout: float = None, priority: str = INTERACTIVE) -> dict:
+    """A non-streaming /api/generate call: the final chunk's fields with the whole reply under "response"."""
+    parts, final = [], {}
+    for chunk in generate_stream(ollama_url, payload, headers, timeout, priority=priority):
+        parts.append(chunk.get("response", ""))
+        if chunk.get("done"):
+            final = chunk
+    return dict(final, response="".join(parts))
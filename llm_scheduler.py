@@ -0,0 +1,145 @@
+# TeamForgeAI/llm_scheduler.py
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+INTERACTIVE = "interactive"  # A user is waiting on the reply: agent clicks, chat, Workbench tests
+BACKGROUND = "background"  # Work the user started but is not watching token by token: auto mode, web search synthesis
+BATCH = "batch"  # Long jobs: repo documentation, benchmarks
+PRIORITY_LEVELS = {INTERACTIVE: 0, BACKGROUND: 1, BATCH: 2}
+CONCURRENCY_ENV = "TEAMFORGE_LLM_CONCURRENCY"  # Total concurrent requests, e.g. OLLAMA_NUM_PARALLEL times the number of servers
+CLASS_LIMITS_ENV = "TEAMFORGE_LLM_CLASS_LIMITS"  # Per-class overrides, e.g. "batch=8,background=4"
+DEFAULT_CONCURRENCY = 4
+AGING_SECONDS = 30  # A waiting request moves up one class for every 30 seconds it has waited
+
+
+def class_limits(concurrency: int) -> dict:
+    """
+    Concurrent requests per class: interactive requests may use every slot, background and batch
+    work half of them (at least one), unless CLASS_LIMITS_ENV sets a class's limit.
+    """
+    limits = {INTERACTIVE: concurrency, BACKGROUND: max(1, concurrency // 2), BATCH: max(1, concurrency // 2)}
+    for item in filter(None, os.environ.get(CLASS_LIMITS_ENV, "").split(",")):
+        priority, _, value = item.partition("=")
+        priority = priority.strip().lower()
+        if priority not in PRIORITY_LEVELS or not value.strip().isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid {CLASS_LIMITS_ENV} entry {item!r}; expected e.g. batch=8")
+        limits[priority] = int(value)
+    return limits
+
+
+class Ticket:
+    def __init__(self, priority: str, sequence: int):
+        self.priority = priority
+        self.sequence = sequence
+        self.enqueued_at = time.monotonic()
+
+    def effective_level(self, now: float) -> float:
+        return PRIORITY_LEVELS[self.priority] - (now - self.enqueued_at) / AGING_SECONDS
+
+
+class LLMScheduler:
+    """
+    Admits LLM requests by priority class so interactive turns do not queue behind batch work.
+
+    At most `concurrency` requests run at once and at most class_limits()[class] of each class.
+    When a slot frees up it goes to the waiting request with the best priority whose class is
+    below its limit; waiting time ages a request upwards, so batch work is delayed, never starved.
+    """
+
+    def __init__(self, concurrency: int = None, limits: dict = None):
+        self.concurrency = concurrency or int(os.environ.get(CONCURRENCY_ENV, DEFAULT_CONCURRENCY))
+        self.limits = dict(class_limits(self.concurrency), **(limits or {}))
+        self.running = {priority: 0 for priority in PRIORITY_LEVELS}
+        self.waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, priority: str = INTERACTIVE) -> Ticket:
+        """Blocks until the request may run; pair every call with release()."""
+        return self.wait(self.enqueue(priority))
+
+    def enqueue(self, priority: str = INTERACTIVE) -> Ticket:
+        """Queues a request without waiting, so its ticket can be promoted while it waits in wait()."""
+        if priority not in PRIORITY_LEVELS:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITY_LEVELS)}")
+        with self._condition:
+            ticket = Ticket(priority, next(self._sequence))
+            self.waiting.append(ticket)
+            self._condition.notify_all()
+            return ticket
+
+    def wait(self, ticket: Ticket) -> Ticket:
+        """Blocks until a queued request may run."""
+        with self._condition:
+            try:
+                while self._next_admitted() is not ticket:
+                    self._condition.wait(timeout=1.0)  # Wakes up periodically so aging is taken into account
+            except BaseException:
+                # An interrupted waiter (e.g. a stopped Streamlit script) must not stay in the queue
+                self.waiting.remove(ticket)
+                self._condition.notify_all()
+                raise
+            self.waiting.remove(ticket)
+            self.running[ticket.priority] += 1
+            self._condition.notify_all()  # Another class may still have room
+            return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        with self._condition:
+            self.running[ticket.priority] -= 1
+            self._condition.notify_all()
+
+    def promote(self, ticket: Ticket, priority: str) -> None:
+        """Raises the class of a waiting request, e.g. when an interactive caller joins a batch request."""
+        with self._condition:
+            if ticket in self.waiting and PRIORITY_LEVELS[priority] < PRIORITY_LEVELS[ticket.priority]:
+                ticket.priority = priority
+                self._condition.notify_all()
+
+    def _next_admitted(self) -> Ticket:
+        if sum(self.running.values()) >= self.concurrency:
+            return None
+        now = time.monotonic()
+        eligible = [ticket for ticket in self.waiting if self.running[ticket.priority] < self.limits[ticket.priority]]
+        return min(eligible, key=lambda ticket: (ticket.effective_level(now), ticket.sequence), default=None)
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE):
+        ticket = self.acquire(priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def limit(self, priority: str) -> int:
+        """How many requests of a class can run at once."""
+        return min(self.limits[priority], self.concurrency)
+
+    def stats(self) -> dict:
+        """Running and waiting requests per class."""
+        with self._condition:
+            return {
+                priority: {"running": self.running[priority], "waiting": sum(1 for ticket in self.waiting if ticket.priority == priority)}
+                for priority in PRIORITY_LEVELS
+            }
+
+
+_scheduler = LLMScheduler()
+
+
+def get_scheduler() -> LLMScheduler:
+    """The process-wide scheduler shared by every session, thread and the Workbench plugin."""
+    return _scheduler
+
+
+def llm_slot(priority: str = INTERACTIVE):
+    """Context manager that holds a slot of the shared scheduler for one LLM request."""
+    return _scheduler.slot(priority)
+
+
+def llm_slot_limit(priority: str = INTERACTIVE) -> int:
+    """How many requests of a class the shared scheduler runs at once."""
+    return _scheduler.limit(priority)
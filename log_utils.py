@@ -0,0 +1,90 @@
+# TeamForgeAI/log_utils.py
+import logging
+import os
+import threading
+
+LOG_LEVEL_ENV = "TEAMFORGE_LOG_LEVEL"  # DEBUG, INFO, WARNING or ERROR
+DEFAULT_LOG_LEVEL = "INFO"
+LOGGER_NAMESPACE = "teamforge"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+PREVIEW_CHARS = 200  # Longest text a log line shows of a response, prompt or payload
+
+_configure_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through one in n records logged with extra=sampled(n), counted per call site."""
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample_every", 1)
+        if every <= 1:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % every:
+            return False
+        record.msg = f"{record.msg} [1 in {every} logged]"
+        return True
+
+
+def configure_logging(level: str = None) -> logging.Logger:
+    """
+    Sets up the app's loggers once: a stderr handler on the "teamforge" logger at the level of
+    TEAMFORGE_LOG_LEVEL (INFO by default). Passing level changes it later, e.g. from the UI.
+    """
+    root = logging.getLogger(LOGGER_NAMESPACE)
+    with _configure_lock:
+        if not root.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handler.addFilter(SamplingFilter())
+            root.addHandler(handler)
+            root.propagate = False  # Libraries that call logging.basicConfig() must not print everything twice
+            root.setLevel(os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL).upper())
+        if level:
+            root.setLevel(level.upper())
+    return root
+
+
+def get_logger(name: str) -> logging.Logger:
+    """The logger for a module; pass __name__."""
+    configure_logging()
+    return logging.getLogger(f"{LOGGER_NAMESPACE}.{name}")
+
+
+class Preview:
+    """A size-capped rendering of a value, computed only when a handler formats the record."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value, limit: int = PREVIEW_CHARS):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}… ({len(text)} chars)"
+
+
+def preview(value, limit: int = PREVIEW_CHARS) -> Preview:
+    """
+    Wraps a log argument, e.g. logger.debug("Reply: %s", preview(reply)).
+
+    Nothing is converted or copied until the record is emitted, so a preview of a whole
+    discussion costs nothing when its level is disabled.
+    """
+    return Preview(value, limit)
+
+
+def sampled(every: int) -> dict:
+    """The extra= argument that logs only one in every records of a repeated call, e.g. per chunk or per batch."""
+    return {"sample_every": every}
@@ -4,26 +4,8 @@ from streamlit.components.v1 import html
 st.set_page_config(layout="wide")
 import os
 
-# Function to load other apps as plugins
-import sys  # Import the sys module
-
-def load_plugin(plugin_name):
-    plugin_dir = os.path.join(os.path.dirname(__file__), 'plugins', plugin_name)
-    plugin_path = os.path.join(plugin_dir, 'main.py')
-    if not os.path.exists(plugin_path):
-        st.error(f"Plugin {plugin_name} not found at {plugin_path}")
-        return
-
-    # Add the plugin's directory to the Python path
-    sys.path.append(plugin_dir)
-
-    with open(plugin_path, encoding='utf-8') as f:
-        code = compile(f.read(), plugin_path, 'exec')
-        exec(code, globals())
-
-    # Optionally remove the plugin's directory from the Python path
-    # sys.path.remove(plugin_dir)
-    
+from plugin_loader import PluginError, run_plugin
+
 # Initialize current_app in session state if not present
 if "current_app" not in st.session_state:
     st.session_state.current_app = "TeamForgeAI"
@@ -89,10 +71,15 @@ if st.session_state.current_app == "TeamForgeAI":
     from skills.update_project_status import update_project_status
     from skills.summarize_project_status import summarize_project_status
     from autogen.agentchat import ConversableAgent, GroupChat, GroupChatManager  # Import for automated group chat
-    from autogen.agentchat.contrib.capabilities.teachability import Teachability  # Import Teachability
 
     from ollama_llm import OllamaLLM  # Import OllamaLLM from ollama_llm.py
     from agent_creation import create_autogen_agent # Import from agent_creation.py
+    from model_residency import preload_model, get_residency_manager
+    from speaker_scheduler import SpeakerScheduler
+    from auto_mode import start_job, get_job, AUTO_MODE_POLL_SECONDS
+    from group_chat_prompt import GroupChatPrompt
+    from llm_scheduler import BACKGROUND
+    from tracing import span
 
     # Initialize session state variables if they are not already present
     if "trigger_rerun" not in st.session_state:
@@ -133,6 +120,8 @@ if st.session_state.current_app == "TeamForgeAI":
         st.session_state.chat_manager_db_path = "./db/group_chat_manager"
     if "auto_mode" not in st.session_state:
         st.session_state.auto_mode = False  # Auto mode is OFF by default
+    if "schedule_by_model" not in st.session_state:
+        st.session_state.schedule_by_model = False  # Plain round-robin by default
 
     # Ensure agents_data is initialized
     if "agents_data" not in st.session_state:
@@ -146,37 +135,59 @@ if st.session_state.current_app == "TeamForgeAI":
     class OllamaGroupChatManager(GroupChatManager):
         """A GroupChatManager that uses OllamaLLM for text generation."""
 
-        def __init__(self, groupchat, **kwargs):  # Remove the ollama_llm parameter
+        def __init__(self, groupchat, schedule_by_model=False, **kwargs):  # Remove the ollama_llm parameter
             super().__init__(groupchat, **kwargs)
             self.current_speaker_index = 0  # Initialize current speaker index
+            self.scheduler = SpeakerScheduler(self.current_speaker_index) if schedule_by_model else None  # Groups each round's speakers by model
+            self.prompt_builder = GroupChatPrompt()  # Keeps the prompt within budget as the chat grows
 
-        def generate_reply(self, messages, sender, config=None):
+        def generate_reply(self, messages, sender, config=None, should_stop=None):
             """Overrides the generate_reply method to use the speaker's OllamaLLM."""
             current_speaker = next(agent for agent in self.groupchat.agents if agent.name == sender)
             prompt = self._construct_prompt(messages, sender, config)
-            reply = current_speaker.ollama_llm.generate_text(prompt, temperature=current_speaker.ollama_llm.temperature)
+            reply = current_speaker.ollama_llm.generate_text(prompt, temperature=current_speaker.ollama_llm.temperature, should_stop=should_stop)
             return reply
         
         def _construct_prompt(self, messages, sender, config):
-            """Constructs the prompt for the LLM."""
-            # Implement the logic to construct the prompt from the messages and sender
-            # This is a placeholder implementation and should be customized as needed
-            return "\n".join([msg['content'] for msg in messages])
+            """Constructs the prompt for the LLM: the task, a summary of older turns and the latest turns by speaker."""
+            return self.prompt_builder.build(messages, sender)
 
         def select_next_speaker(self, groupchat):
             """Selects the next speaker in a round-robin fashion."""
             self.current_speaker_index = (self.current_speaker_index + 1) % len(groupchat.agents)
             return groupchat.agents[self.current_speaker_index]
 
-        def initiate_chat_round_robin(self, initial_message):
-            """Initiates the chat and ensures all agents get a turn to speak."""
+        def plan_speakers(self, rounds=2):
+            """The speakers of the whole chat, in order."""
+            if self.scheduler:
+                return [speaker for _ in range(rounds) for speaker in self.scheduler.next_round(self.groupchat.agents)]
+            return [self.select_next_speaker(self.groupchat) for _ in range(len(self.groupchat.agents) * rounds)]
+
+        def initiate_chat_round_robin(self, initial_message, speakers=None, on_turn=None, should_stop=None):
+            """
+            Initiates the chat and ensures all agents get a turn to speak.
+
+            :param on_turn: Called with (speaker_name, reply) after every turn; by default the reply is
+                            added to the discussion history, which only works on the script thread.
+            :param should_stop: Optional callable checked between turns and while a reply streams.
+            """
             messages = [{'content': initial_message, 'sender': 'User'}]
-            for _ in range(len(self.groupchat.agents) * 2):  # Adjust multiplier for more rounds
-                current_speaker = self.select_next_speaker(self.groupchat)
-                reply = self.generate_reply(messages, current_speaker.name)
+            speakers = speakers if speakers is not None else self.plan_speakers()
+            for turn, current_speaker in enumerate(speakers):
+                if should_stop and should_stop():
+                    break
+                # Load the following speaker's model while this one generates
+                if turn + 1 < len(speakers):
+                    preload_model(speakers[turn + 1].ollama_llm.model, speakers[turn + 1].ollama_llm.base_url)
+                reply = self.generate_reply(messages, current_speaker.name, should_stop=should_stop)
+                if should_stop and should_stop():
+                    break  # Drop the reply that was cut off mid-stream
                 messages.append({'content': reply, 'sender': current_speaker.name})
                 self.groupchat.messages.append({'sender': current_speaker.name, 'content': reply})
-                update_discussion_and_whiteboard(current_speaker.name, reply, "")  # Update discussion history
+                if on_turn:
+                    on_turn(current_speaker.name, reply)
+                else:
+                    update_discussion_and_whiteboard(current_speaker.name, reply, "")  # Update discussion history
 
     def main() -> None:
         """Main function for the Streamlit app."""
@@ -199,6 +210,8 @@ if st.session_state.current_app == "TeamForgeAI":
             display_rephrased_request()
             display_user_input()
 
+            st.checkbox("Group speakers by model", key="schedule_by_model", help="Orders each auto mode round so agents sharing a model speak back to back, proposers still before aggregators. Saves model reloads when the team's models do not fit in memory together.")
+
             # Add a button to toggle auto mode
             if st.button("Toggle Auto Mode"):
                 st.session_state.auto_mode = not st.session_state.auto_mode
@@ -206,8 +219,11 @@ if st.session_state.current_app == "TeamForgeAI":
                     st.info("Auto Mode is ON. The Chat Manager will now handle agent interactions.")
                     initiate_auto_mode() # Start Auto Mode when button is clicked
                 else:
+                    cancel_auto_mode()
                     st.info("Auto Mode is OFF. You can interact with agents individually.")
 
+            display_auto_mode_progress()
+
         with column2:
             # Load a random background image with a unique cache key
             selected_background = load_background_images("TeamForgeAI/files/backgrounds", cache_key=random.random())
@@ -244,9 +260,7 @@ if st.session_state.current_app == "TeamForgeAI":
 
             display_download_button()
 
-        # Save discussion history whenever it changes
-        if st.session_state.discussion_history:
-            save_discussion_history(st.session_state.discussion_history, st.session_state.selected_discussion or f"discussion_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        save_discussion_if_changed()
 
         # Call summarize_project_status and display the result
         if st.session_state.discussion_history:
@@ -259,7 +273,14 @@ if st.session_state.current_app == "TeamForgeAI":
             # st.write(status_message)  # No need to display the message here, it's added to the discussion history
 
         if st.session_state.trigger_rerun:
-            st.experimental_rerun()  # Trigger a rerun of the Streamlit script
+            st.rerun()  # Trigger a rerun of the Streamlit script
+
+    def save_discussion_if_changed():
+        """Saves the discussion history whenever it changes (not on every rerun)."""
+        if st.session_state.discussion_history and st.session_state.discussion_history != st.session_state.get("saved_discussion_history"):
+            with span("file.save"):
+                save_discussion_history(st.session_state.discussion_history, st.session_state.selected_discussion or f"discussion_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            st.session_state.saved_discussion_history = st.session_state.discussion_history
 
     def load_agents_from_files():
         """Loads agents from JSON files in the 'agents' directory."""
@@ -281,27 +302,96 @@ if st.session_state.current_app == "TeamForgeAI":
 
             # Create agents from session state, without teachability
             agents = [create_autogen_agent(agent_data) for agent_data in st.session_state.agents_data]
+            for agent in agents:
+                agent.ollama_llm.priority = BACKGROUND  # Agents clicked by hand go first
 
             # Create group chat and manager
             group_chat = GroupChat(agents=agents, messages=[], max_round=10)
 
             # Create OllamaGroupChatManager instance
-            group_chat_manager = OllamaGroupChatManager(groupchat=group_chat)
-
-            # Initiate the chat with the re-engineered prompt
-            group_chat_manager.initiate_chat_round_robin(
-                st.session_state.rephrased_request  # Use rephrased_request here
-            )
-
-            # Turn off auto mode after the chat is complete
-            st.session_state.auto_mode = False
-            st.session_state.trigger_rerun = True  # Trigger a rerun to display the updated discussion history
+            group_chat_manager = OllamaGroupChatManager(groupchat=group_chat, schedule_by_model=st.session_state.schedule_by_model)
+            speakers = group_chat_manager.plan_speakers()
+            get_residency_manager()  # Register the team's models while the session is at hand
+            rephrased_request = st.session_state.rephrased_request  # The worker thread cannot read the session
+
+            def run_chat(job):
+                # Runs on a background thread; it reports turns through the job, never the session
+                group_chat_manager.initiate_chat_round_robin(
+                    rephrased_request,  # Use rephrased_request here
+                    speakers=speakers,
+                    on_turn=lambda speaker, reply: job.publish("turn", speaker=speaker, reply=reply),
+                    should_stop=job.cancelled,
+                )
+                scheduler = group_chat_manager.scheduler
+                if scheduler and not job.cancelled():
+                    job.publish("info", message=f"Grouping speakers by model saved {scheduler.reloads_saved} model reloads ({scheduler.scheduled_swaps} instead of {scheduler.round_robin_swaps}).")
+
+            cancel_auto_mode()  # Never run two chats for the same session
+            job = start_job(run_chat, total_turns=len(speakers))
+            st.session_state.auto_mode_job_id = job.id
         else:
             st.warning("Please make sure you have added agents and entered a user request before enabling Auto Mode.")
 
+    def cancel_auto_mode():
+        """Asks the running auto mode job, if any, to stop after the reply that is streaming."""
+        job = get_job(st.session_state.get("auto_mode_job_id"))
+        if job and job.running:
+            job.cancel()
+
+    def drain_auto_mode_job(job) -> bool:
+        """Adds the turns a background auto mode job has finished to the discussion; True if there were any."""
+        turns = False
+        for event in job.drain():
+            if event["type"] == "turn":
+                update_discussion_and_whiteboard(event["speaker"], event["reply"], "")
+                turns = True
+            elif event["type"] == "info":
+                st.session_state.auto_mode_message = event["message"]
+        return turns
+
+    @st.fragment(run_every=AUTO_MODE_POLL_SECONDS)
+    def follow_auto_mode_job():
+        """
+        Polls the running job by rerunning only this fragment: the progress, the Stop button and the
+        latest turn. The whole page reruns once, when the job is over.
+        """
+        job = get_job(st.session_state.get("auto_mode_job_id"))
+        if job is None:
+            return
+        running = job.running  # Checked before draining, so a finished job's last events are never left behind
+        if drain_auto_mode_job(job):
+            save_discussion_if_changed()
+        if not running:
+            st.rerun()  # Render the finished discussion and how the job ended
+        st.progress(job.turns_done / job.total_turns if job.total_turns else 0.0, text=f"Auto Mode: {job.turns_done} of {job.total_turns} turns done")
+        if st.button("Stop Auto Mode"):
+            job.cancel()
+        if st.session_state.last_comment:
+            st.markdown(st.session_state.last_comment)
+
+    def display_auto_mode_progress():
+        """Shows the progress of a background auto mode job, or how it ended."""
+        job = get_job(st.session_state.get("auto_mode_job_id"))
+        if job is None:
+            return
+        if job.running:
+            follow_auto_mode_job()
+            return
+        drain_auto_mode_job(job)
+        # The job is over: show how it ended once and forget it
+        st.session_state.auto_mode = False
+        st.session_state.auto_mode_job_id = None
+        if job.status == "error":
+            st.error(f"Auto Mode failed: {job.error}")
+        elif job.status == "cancelled":
+            st.info(f"Auto Mode stopped after {job.turns_done} of {job.total_turns} turns.")
+        if st.session_state.get("auto_mode_message"):
+            st.info(st.session_state.pop("auto_mode_message"))
+
     def terminate_auto_mode():
         """Terminates the automated group chat workflow."""
         st.info("Terminating Auto Mode")
+        cancel_auto_mode()  # Stop the background chat before clearing the state it works on
         st.session_state.auto_mode = False  # Set auto_mode to False to stop the loop
 
         # Clear any existing chat state or messages
@@ -309,10 +399,13 @@ if st.session_state.current_app == "TeamForgeAI":
         st.session_state.rephrased_request = ""
         st.session_state.current_project = CurrentProject()  # Reinitialize current_project to prevent AttributeError
 
-        st.experimental_rerun()  # Trigger a rerun of the Streamlit script to apply changes
+        st.rerun()  # Trigger a rerun of the Streamlit script to apply changes
 
     if __name__ == "__main__":
         main()
 
 elif app == "Ollama Workbench":
-    load_plugin("Ollama_Workbench")
+    try:
+        run_plugin("Ollama_Workbench")  # Imported once per server, then only its entry point runs
+    except PluginError as error:
+        st.error(str(error))
@@ -0,0 +1,212 @@
+# TeamForgeAI/model_residency.py
+import os
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+import requests
+import streamlit as st
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+TEAM_KEEP_ALIVE = "30m"  # Team models stay loaded between turns instead of Ollama's default 5 minutes
+MEMORY_OVERHEAD = 1.2  # Loaded size relative to the weights on disk (KV cache and compute buffers)
+MEMORY_BUDGET_ENV = "TEAMFORGE_MODEL_MEMORY_GB"  # Overrides the detected memory, e.g. with the GPU's VRAM
+DEFAULT_MODEL = "mistral:instruct"
+SESSION_TEAM_TTL = 30 * 60  # Seconds after which a session that stopped rerunning no longer holds its team's models
+STATUS_TTL = 15  # Seconds /api/ps and /api/tags answers are reused, so reruns do not block on them
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+
+
+@st.cache_data(ttl=STATUS_TTL, show_spinner=False)
+def loaded_models(ollama_url: str) -> dict:
+    """The models Ollama currently holds in memory, from /api/ps, as {name: {size, size_vram, expires_at}}."""
+    try:
+        response = requests.get(f"{ollama_url}/api/ps", timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as error:
+        logger.warning("Could not list loaded models: %s", error)
+        return {}
+    return {
+        model["name"]: {"size": model.get("size", 0), "size_vram": model.get("size_vram", 0), "expires_at": model.get("expires_at")}
+        for model in response.json().get("models", [])
+    }
+
+
+@st.cache_data(ttl=STATUS_TTL, show_spinner=False)
+def model_sizes(ollama_url: str) -> dict:
+    """The size of every local model's weights, from /api/tags."""
+    try:
+        response = requests.get(f"{ollama_url}/api/tags", timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as error:
+        logger.warning("Could not fetch model sizes: %s", error)
+        return {}
+    return {model["name"]: model.get("size", 0) for model in response.json().get("models", [])}
+
+
+def is_local(ollama_url: str) -> bool:
+    """Whether ollama_url points at this machine, whose memory is the one available_memory() can see."""
+    host = urlparse(ollama_url).hostname or "localhost"
+    return host in LOCAL_HOSTS or host in (socket.gethostname(), socket.getfqdn())
+
+
+def available_memory(ollama_url: str = None) -> int:
+    """
+    Memory available for models in bytes: the configured budget, else physical memory, else None.
+
+    The physical memory is this machine's, so for a remote ollama_url it is only known when the
+    budget is configured.
+    """
+    if os.environ.get(MEMORY_BUDGET_ENV):
+        return int(float(os.environ[MEMORY_BUDGET_ENV]) * 1024 ** 3)
+    if ollama_url and not is_local(ollama_url):
+        return None
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None  # Not available on Windows
+
+
+def team_models(agents_data: list, default_model: str = DEFAULT_MODEL) -> list:
+    """The distinct models a team's agents use, in speaking order."""
+    return list(dict.fromkeys(agent_data.get("model") or default_model for agent_data in agents_data))
+
+
+class ModelResidencyManager:
+    """
+    Keeps the models of the sessions' current teams loaded in Ollama.
+
+    Requests for team models carry a long keep_alive, so switching speakers does not evict and
+    reload multi-GB weights. The next speaker's model can be preloaded in the background while
+    the current one generates, as long as the whole team fits in memory; otherwise preloading
+    would only evict the model that is generating.
+
+    The manager is shared by every session on an endpoint, so each session registers its own
+    team and a model is only unloaded once no session's team uses it any more.
+    """
+
+    def __init__(self, ollama_url: str):
+        self.ollama_url = ollama_url
+        self.team = []  # The models of all sessions' teams
+        self._teams = {}  # session id -> (models, last seen)
+        self._preloading = set()
+        self._lock = threading.Lock()
+
+    def set_team(self, models: list, session_id: str = "default") -> None:
+        """Sets a session's team and unloads the models that no session's team uses any more."""
+        now = time.monotonic()
+        with self._lock:
+            previous = self._teams.get(session_id, ([], None))[0]
+            self._teams[session_id] = (list(models), now)
+            # Sessions that went away are forgotten without unloading; their models expire with their keep_alive
+            self._teams = {session: team for session, team in self._teams.items() if now - team[1] < SESSION_TEAM_TTL}
+            self.team = list(dict.fromkeys(model for team, _ in self._teams.values() for model in team))
+            released = [model for model in previous if model not in self.team]
+        for model in released:
+            self._load(model, keep_alive=0)
+
+    def team_of(self, session_id: str = "default") -> list:
+        """The models of one session's team."""
+        with self._lock:
+            return list(self._teams.get(session_id, ([], None))[0])
+
+    def keep_alive(self, model: str):
+        """The keep_alive to send with a request for model, or None for Ollama's default."""
+        return TEAM_KEEP_ALIVE if model in self.team else None
+
+    def memory_needed(self, models: list) -> int:
+        """Estimated memory to hold all models at once; loaded models count with their actual size."""
+        loaded = loaded_models(self.ollama_url)
+        sizes = model_sizes(self.ollama_url)
+        return sum(loaded[model]["size"] if model in loaded else int(sizes.get(model, 0) * MEMORY_OVERHEAD) for model in models)
+
+    def fits(self, models: list = None) -> bool:
+        """Whether models (the team by default) can all be loaded at once; True when memory is unknown."""
+        memory = available_memory(self.ollama_url)
+        return memory is None or self.memory_needed(models or self.team) <= memory
+
+    def memory_warning(self, models: list = None) -> str:
+        """A warning when models (the team by default) do not fit in memory together, else None."""
+        models = models or self.team
+        memory = available_memory(self.ollama_url)
+        if memory is None or len(models) < 2:
+            return None
+        needed = self.memory_needed(models)
+        if needed <= memory:
+            return None
+        return (
+            f"The team's models ({', '.join(models)}) need about {needed / 1024 ** 3:.1f} GB but only "
+            f"{memory / 1024 ** 3:.1f} GB is available, so Ollama will reload models when speakers change. "
+            f"Use fewer distinct models or smaller quantizations, or set {MEMORY_BUDGET_ENV} if the detected memory is wrong."
+        )
+
+    def preload(self, model: str) -> None:
+        """Loads model in the background unless it is already loaded or the team does not fit in memory."""
+        with self._lock:
+            if not model or model in self._preloading:
+                return
+            self._preloading.add(model)
+        threading.Thread(target=self._preload, args=(model,), daemon=True).start()
+
+    def _preload(self, model: str) -> None:
+        try:
+            if model not in loaded_models(self.ollama_url) and self.fits(list(dict.fromkeys(self.team + [model]))):
+                self._load(model, self.keep_alive(model))
+        finally:
+            with self._lock:
+                self._preloading.discard(model)
+
+    def _load(self, model: str, keep_alive) -> None:
+        """A request without a prompt loads (or with keep_alive 0, unloads) a model."""
+        payload = {"model": model}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        try:
+            requests.post(f"{self.ollama_url}/api/generate", json=payload, timeout=600)
+        except requests.exceptions.RequestException as error:
+            logger.warning("Could not load %s: %s", model, error)
+
+
+@st.cache_resource(show_spinner=False)
+def load_residency_manager(ollama_url: str) -> ModelResidencyManager:
+    """One manager per Ollama endpoint, shared across reruns and sessions."""
+    return ModelResidencyManager(ollama_url)
+
+
+def residency_session_id() -> str:
+    """Identifies the current session to the shared managers."""
+    if "residency_session_id" not in st.session_state:
+        st.session_state.residency_session_id = uuid.uuid4().hex
+    return st.session_state.residency_session_id
+
+
+def get_residency_manager(ollama_url: str = None) -> ModelResidencyManager:
+    """Returns the manager for ollama_url (the session's endpoint by default) with the session's team registered."""
+    manager = load_residency_manager(ollama_url or st.session_state.get("ollama_url", "http://localhost:11434"))
+    models = team_models(st.session_state.get("agents_data", []), st.session_state.get("model", DEFAULT_MODEL))
+    manager.set_team(models, residency_session_id())  # Also marks the session as still active
+    return manager
+
+
+def keep_alive_for(model: str, ollama_url: str = None):
+    """The keep_alive for a request, never failing the request over it; safe to call from worker threads."""
+    try:
+        # With an explicit endpoint the session is not read, so background jobs can call this too
+        manager = load_residency_manager(ollama_url) if ollama_url else get_residency_manager()
+        return manager.keep_alive(model)
+    except Exception as error:
+        logger.warning("Could not determine keep_alive for %s: %s", model, error)
+        return None
+
+
+def preload_model(model: str, ollama_url: str = None) -> None:
+    """Preloads the next speaker's model in the background; best-effort and safe to call from worker threads."""
+    try:
+        manager = load_residency_manager(ollama_url) if ollama_url else get_residency_manager()
+        manager.preload(model)
+    except Exception as error:
+        logger.warning("Could not preload %s: %s", model, error)
@@ -0,0 +1,117 @@
+# TeamForgeAI/nltk_resources.py
+import os
+import re
+import socket
+import threading
+from functools import lru_cache
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+NLTK_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", "nltk_data")  # Project-local NLTK data
+# NLTK package name -> the path nltk.data.find() looks for; newer NLTK releases tokenize with punkt_tab
+NLTK_PACKAGES = {"punkt": "tokenizers/punkt", "punkt_tab": "tokenizers/punkt_tab", "stopwords": "corpora/stopwords"}
+DOWNLOAD_TIMEOUT = 30  # Seconds a download may stall before it is given up
+# NLTK's English list (without the apostrophe forms, which tokenizers split) plus "could" and "would"; the
+# keyword extractor's default, and the fallback when NLTK or its data is unavailable, e.g. offline on first start
+ENGLISH_STOP_WORDS = frozenset("""
+a about above after again against ain all am an and any are aren as at be because been before being below between
+both but by can could couldn d did didn do does doesn doing don down during each few for from further had hadn has
+hasn have haven having he her here hers herself him himself his how i if in into is isn it its itself just ll m ma
+me mightn more most mustn my myself needn no nor not now o of off on once only or other our ours ourselves out over
+own re s same shan she should shouldn so some such t than that the their theirs them themselves then there these
+they this those through to too under until up ve very was wasn we were weren what when where which while who whom
+why will with won would wouldn y you your yours yourself yourselves
+""".split())
+
+_checked = None
+_check_lock = threading.Lock()
+
+
+def ensure_nltk_data() -> bool:
+    """
+    Checks, once per process, that NLTK and its tokenizer and stop word data are installed.
+
+    Nothing is downloaded here, so a request never waits on the network; run
+    `python nltk_resources.py` (see download_nltk_data) to fetch the data into files/nltk_data.
+
+    :return: Whether NLTK and its data can be used; if not, callers fall back to plain-Python equivalents.
+    """
+    global _checked
+    with _check_lock:
+        if _checked is not None:
+            return _checked
+        try:
+            import nltk
+        except ImportError:
+            _checked = False
+            return _checked
+        missing = _missing(nltk)
+        # Older NLTK releases only need punkt, newer ones only punkt_tab
+        _checked = "stopwords" not in missing and not {"punkt", "punkt_tab"} <= set(missing)
+        if not _checked:
+            logger.warning("NLTK data unavailable (%s); using the built-in tokenizer and stop words", ", ".join(missing))
+        return _checked
+
+
+def download_nltk_data(timeout: float = DOWNLOAD_TIMEOUT) -> bool:
+    """Downloads the missing NLTK data into files/nltk_data, then checks again; for setup, not requests."""
+    global _checked
+    try:
+        import nltk
+    except ImportError:
+        return False
+    missing = _missing(nltk)
+    if missing:
+        os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+        previous_timeout = socket.getdefaulttimeout()
+        socket.setdefaulttimeout(timeout)  # nltk.download opens its URLs without a timeout of its own
+        try:
+            for package in missing:
+                nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True, raise_on_error=False)
+        finally:
+            socket.setdefaulttimeout(previous_timeout)
+    with _check_lock:
+        _checked = None
+    stop_words.cache_clear()
+    return ensure_nltk_data()
+
+
+def _missing(nltk) -> list:
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return [package for package, path in NLTK_PACKAGES.items() if not _has(nltk, path)]
+
+
+def _has(nltk, path: str) -> bool:
+    try:
+        nltk.data.find(path)
+        return True
+    except LookupError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def stop_words() -> frozenset:
+    """English stop words, from NLTK when available; read once."""
+    if ensure_nltk_data():
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words("english"))
+    return ENGLISH_STOP_WORDS
+
+
+def tokenize(text: str) -> list:
+    """Splits text into word tokens, with NLTK's tokenizer when available."""
+    if ensure_nltk_data():
+        from nltk.tokenize import word_tokenize
+        try:
+            return word_tokenize(text)
+        except LookupError:
+            pass  # This NLTK release wants the other punkt package
+    return re.findall(r"\w+|[^\w\s]", text)
+
+
+if __name__ == "__main__":
+    # Fetches the NLTK data into files/nltk_data, e.g. while building an image
+    print("NLTK data ready" if download_nltk_data() else "NLTK data could not be fetched")
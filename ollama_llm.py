@@ -1,20 +1,32 @@
 # TeamForgeAI/ollama_llm.py
 import json
-import requests
 import streamlit as st
 
+from model_residency import keep_alive_for
+from llm_client import generate_stream
+from llm_scheduler import INTERACTIVE
+from tracing import span
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
+
 class OllamaLLM:
     """A custom LLM wrapper for Ollama."""
 
-    def __init__(self, base_url="http://localhost:11434", api_key=None, model="mistral:instruct", temperature=0.7):
+    def __init__(self, base_url="http://localhost:11434", api_key=None, model="mistral:instruct", temperature=0.7, priority=INTERACTIVE):
         self.base_url = base_url
         self.api_key = api_key
         self.model = model
         self.temperature = temperature  # Set default temperature here
+        self.priority = priority  # The llm_scheduler class of this LLM's requests
+
+    def generate_text(self, prompt, temperature=None, max_tokens=512, should_stop=None):
+        """
+        Generates text using the Ollama API.
 
-    def generate_text(self, prompt, temperature=None, max_tokens=512):
-        """Generates text using the Ollama API."""
-        url = f"{self.base_url}/api/generate"
+        :param should_stop: Optional callable checked while the reply streams; when it returns True
+                            the request is closed and the text generated so far is returned.
+        """
         headers = {"Content-Type": "application/json"}
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
@@ -26,19 +38,21 @@ class OllamaLLM:
                 "max_tokens": max_tokens,
             },
         }
-        response = requests.post(url, headers=headers, json=data, stream=True)
-        
+        keep_alive = keep_alive_for(self.model, self.base_url)
+        if keep_alive is not None:
+            data["keep_alive"] = keep_alive  # Keep the team's models loaded between speakers
+        responses = []
         try:
-            responses = []
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8').strip()
-                    responses.append(json.loads(decoded_line).get("response", ""))
+            # Identical concurrent prompts share one upstream stream; when should_stop cuts this
+            # caller off and nobody else is listening, the request is closed and Ollama stops
+            with span("llm.generate", {"llm.model": self.model, "llm.priority": self.priority}) as llm_span:
+                for chunk in generate_stream(self.base_url, data, headers=headers, should_stop=should_stop, priority=self.priority):
+                    llm_span.observe_chunk(chunk)
+                    responses.append(chunk.get("response", ""))
             return "".join(responses)
         except ValueError as e:
-            print(f"DEBUG: JSON decode error - {e}")
-            print(f"DEBUG: API response text - {responses}")
+            logger.error("JSON decode error: %s; response so far: %s", e, preview("".join(responses)))
             raise
         except Exception as e:
-            print(f"DEBUG: Unexpected error - {e}")
+            logger.error("Unexpected error generating with %s: %s", self.model, e)
             raise
\ No newline at end of file
@@ -0,0 +1,95 @@
+# TeamForgeAI/plugin_loader.py
+import importlib.util
+import json
+import os
+import sys
+import threading
+
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
+PLUGINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+MANIFEST_FILE = "plugin.json"  # {"name": ..., "entry_point": "module:function"}
+DEFAULT_ENTRY_POINT = "main:main"
+MODULE_PREFIX = "teamforge_plugin_"  # Plugins are imported under their own names, never over the app's modules
+
+
+class PluginError(Exception):
+    """A plugin is missing, has a bad manifest, or failed to import."""
+
+
+class Plugin:
+    """A plugin directory, its manifest and, once loaded, its entry module."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.id = os.path.basename(directory)
+        manifest = {}
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, encoding="utf-8") as file:
+                    manifest = json.load(file)
+            except ValueError as error:
+                raise PluginError(f"Invalid {MANIFEST_FILE} in plugin {self.id}: {error}") from error
+        self.name = manifest.get("name", self.id.replace("_", " "))
+        module_name, _, self.entry_function = manifest.get("entry_point", DEFAULT_ENTRY_POINT).partition(":")
+        self.entry_path = os.path.join(directory, f"{module_name}.py")
+        self.module_name = f"{MODULE_PREFIX}{self.id}"
+        self.module = None
+        self.loaded_mtime = None
+
+    def _stale(self) -> bool:
+        try:
+            return self.module is None or os.path.getmtime(self.entry_path) != self.loaded_mtime
+        except OSError:
+            return True  # Removed; load() reports it
+
+    def load(self):
+        """Imports the entry module once, again only when its file changed; returns the module."""
+        if not self._stale():
+            return self.module
+        if not os.path.exists(self.entry_path):
+            raise PluginError(f"Plugin {self.id} has no entry module at {self.entry_path}")
+        if self.directory not in sys.path:
+            sys.path.append(self.directory)  # For the plugin's imports of its sibling modules; added once
+        mtime = os.path.getmtime(self.entry_path)
+        spec = importlib.util.spec_from_file_location(self.module_name, self.entry_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[self.module_name] = module
+        try:
+            spec.loader.exec_module(module)  # Byte code is cached in __pycache__ like any other import
+        except Exception as error:
+            sys.modules.pop(self.module_name, None)
+            raise PluginError(f"Plugin {self.id} failed to import: {error}") from error
+        if not callable(getattr(module, self.entry_function, None)):
+            raise PluginError(f"Plugin {self.id} has no entry point {self.entry_function}() in {self.entry_path}")
+        self.module, self.loaded_mtime = module, mtime
+        logger.info("Loaded plugin %s from %s", self.id, self.entry_path)
+        return module
+
+
+_plugins = {}
+_lock = threading.Lock()
+
+
+def get_plugin(plugin_id: str) -> Plugin:
+    """The plugin in plugins/<plugin_id>, shared by every session of the server."""
+    with _lock:
+        plugin = _plugins.get(plugin_id)
+        if plugin is None:
+            directory = os.path.join(PLUGINS_DIR, plugin_id)
+            if not os.path.isdir(directory):
+                raise PluginError(f"Plugin {plugin_id} not found at {directory}")
+            plugin = _plugins[plugin_id] = Plugin(directory)
+        return plugin
+
+
+def run_plugin(plugin_id: str):
+    """Runs a plugin's entry point, importing it on first use; sessions switching apps do not re-import it."""
+    plugin = get_plugin(plugin_id)
+    with _lock:  # Two sessions opening the plugin at once import it once
+        module = plugin.load()
+    return getattr(module, plugin.entry_function)()
+
@@ -0,0 +1,215 @@
+# benchmark.py
+import json
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from contextlib import nullcontext
+from ollama_config import OLLAMA_URL, BATCH, INTERACTIVE, llm_slot
+
+BENCHMARK_DIR = "benchmarks"  # Holds the benchmark history database, see benchmark_history
+BENCHMARK_MODES = ["isolated", "concurrent"]
+PERCENTILES = (50, 90, 99)
+DEFAULT_MEASURED_RUNS = 5  # Enough for benchmark_history to flag a regression (it needs at least 4 per side)
+SUMMARY_METRICS = {
+    "ttft_s": "TTFT (s)",
+    "load_s": "Load (s)",
+    "prompt_eval_rate": "Prompt eval (tokens/s)",
+    "eval_rate": "Eval (tokens/s)",
+    "total_s": "Total (s)",
+}
+# Fields of the final /api/generate (or /api/chat) chunk that are kept with every sample (durations are in nanoseconds)
+TIMING_FIELDS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+
+
+def build_options(temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0):
+    """Generation options in the form Ollama expects them."""
+    return {
+        "temperature": temperature,
+        "num_predict": max_tokens,
+        "presence_penalty": presence_penalty,
+        "frequency_penalty": frequency_penalty,
+    }
+
+
+def timed_generate(model, prompt, options=None, base_url=OLLAMA_URL, keep_alive=None, context=None, return_context=False, timeout=600, priority=INTERACTIVE):
+    """
+    Streams one generation and measures it.
+
+    :param return_context: Keep the context tokens of the final chunk in the sample (under "context").
+    :param priority: The scheduler class to queue the request in, or None to send it right away
+                     (e.g. when the concurrency itself is being measured). Time spent queued is not
+                     part of the measurement.
+    :return: A sample dictionary with the response, client-side TTFT and wall time, Ollama's timing
+             fields and the derived rates. Failed requests are returned with an "error" key.
+    """
+    payload = {"model": model, "prompt": prompt, "stream": True, "options": options or {}}
+    if context:
+        payload["context"] = context
+    return timed_stream(f"{base_url}/generate", payload, lambda part: part.get("response"), keep_alive, return_context, timeout, priority)
+
+
+def timed_chat(model, messages, options=None, base_url=OLLAMA_URL, keep_alive=None, timeout=600, priority=INTERACTIVE):
+    """Like timed_generate, for /api/chat with a list of {"role", "content"} messages."""
+    payload = {"model": model, "messages": messages, "stream": True, "options": options or {}}
+    return timed_stream(f"{base_url}/chat", payload, lambda part: (part.get("message") or {}).get("content"), keep_alive, False, timeout, priority)
+
+
+def timed_stream(url, payload, text_of, keep_alive=None, return_context=False, timeout=600, priority=INTERACTIVE):
+    """Sends a streaming request and builds a sample from its chunks; text_of extracts a chunk's text."""
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    with llm_slot(priority) if priority else nullcontext():
+        return _timed_stream(url, payload, text_of, return_context, timeout)
+
+
+def _timed_stream(url, payload, text_of, return_context, timeout):
+    sample = {"model": payload["model"], "started_at": time.time(), "response": "", "ttft_s": None, "error": None}
+    start = time.perf_counter()
+    try:
+        with requests.post(url, json=payload, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            parts = []
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                part = json.loads(line)
+                if part.get("error"):
+                    raise ValueError(part["error"])
+                text = text_of(part)
+                if text:
+                    if sample["ttft_s"] is None:
+                        sample["ttft_s"] = time.perf_counter() - start
+                    parts.append(text)
+                if part.get("done"):
+                    for field in TIMING_FIELDS:
+                        sample[field] = part.get(field)
+                    if return_context:
+                        sample["context"] = part.get("context")
+                    break
+            sample["response"] = "".join(parts)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        sample["error"] = str(e)
+    sample["total_s"] = time.perf_counter() - start
+    sample["load_s"] = sample["load_duration"] / 1e9 if sample.get("load_duration") is not None else None
+    sample["prompt_eval_rate"] = rate(sample.get("prompt_eval_count"), sample.get("prompt_eval_duration"))
+    sample["eval_rate"] = rate(sample.get("eval_count"), sample.get("eval_duration"))
+    return sample
+
+
+def rate(count, duration_ns):
+    """Tokens per second from a token count and a duration in nanoseconds."""
+    if not count or not duration_ns:
+        return None
+    return count / (duration_ns / 1e9)
+
+
+def unload_model(model, base_url=OLLAMA_URL):
+    """Asks Ollama to unload a model right away, so the next model is measured on its own."""
+    try:
+        requests.post(f"{base_url}/generate", json={"model": model, "keep_alive": 0}, timeout=60)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not unload {model}: {e}")
+
+
+def load_model(model, base_url=OLLAMA_URL):
+    """Loads a model without generating, so the next request does not pay the load time."""
+    try:
+        requests.post(f"{base_url}/generate", json={"model": model}, timeout=600)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not load {model}: {e}")
+
+
+def percentile(values, q):
+    """The q-th percentile of values, linearly interpolated."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Per-model percentiles of every summary metric, over the measured (non-warmup, successful) samples."""
+    by_model = {}
+    for sample in samples:
+        if not sample.get("warmup") and not sample.get("error"):
+            by_model.setdefault(sample["model"], []).append(sample)
+    summary = {}
+    for model, model_samples in by_model.items():
+        stats = {"runs": len(model_samples)}
+        for metric in SUMMARY_METRICS:
+            values = [sample[metric] for sample in model_samples if sample.get(metric) is not None]
+            for q in PERCENTILES:
+                stats[f"{metric}_p{q}"] = percentile(values, q)
+            stats[f"{metric}_mean"] = sum(values) / len(values) if values else None
+        summary[model] = stats
+    return summary
+
+
+def run_benchmark(models, prompt, options=None, repetitions=DEFAULT_MEASURED_RUNS, warmup=1, mode="isolated", base_url=OLLAMA_URL, progress_callback=None):
+    """
+    Benchmarks models with warmup runs and repeated measurements.
+
+    In "isolated" mode models run one after another and each is unloaded when it is done, so
+    load time and memory pressure of one model never leak into another's numbers. In
+    "concurrent" mode all models run at the same time, each in its own thread; those requests
+    bypass the scheduler, whose class limits would otherwise cap how many run at once.
+
+    :param progress_callback: Optional callable receiving (runs_done, total_runs, sample).
+    :return: A run dictionary with an id, the settings, the raw samples and a per-model summary.
+    """
+    run = {
+        "id": datetime.now().strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6],
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "models": list(models),
+        "prompt": prompt,
+        "options": options or {},
+        "repetitions": repetitions,
+        "warmup": warmup,
+        "mode": mode,
+        "host": base_url,
+        "samples": [],
+    }
+    total_runs = len(models) * (repetitions + warmup)
+    priority = None if mode == "concurrent" else BATCH
+
+    def run_model(model, report_progress):
+        samples = []
+        for index in range(warmup + repetitions):
+            sample = timed_generate(model, prompt, options, base_url, priority=priority)
+            sample["warmup"] = index < warmup
+            sample["repetition"] = index - warmup
+            samples.append(sample)
+            if report_progress:
+                report_progress(sample)
+        return samples
+
+    completed = []
+
+    def report(sample):
+        completed.append(sample)
+        if progress_callback:
+            progress_callback(len(completed), total_runs, sample)
+
+    if mode == "concurrent":
+        # Progress is reported from this thread only, as each model finishes (Streamlit calls are not thread-safe)
+        with ThreadPoolExecutor(max_workers=max(1, len(models))) as executor:
+            for future in as_completed([executor.submit(run_model, model, None) for model in models]):
+                samples = future.result()
+                run["samples"].extend(samples)
+                if progress_callback:
+                    progress_callback(len(run["samples"]), total_runs, samples[-1])
+    else:
+        for model in models:
+            run["samples"].extend(run_model(model, report))
+            if len(models) > 1:
+                unload_model(model, base_url)
+
+    run["summary"] = summarize(run["samples"])
+    return run
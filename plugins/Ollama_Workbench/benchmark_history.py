@@ -0,0 +1,196 @@
+# benchmark_history.py
+import itertools
+import json
+import os
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import requests
+
+from benchmark import BENCHMARK_DIR, SUMMARY_METRICS, TIMING_FIELDS
+from ollama_config import OLLAMA_URL
+
+HISTORY_DB_PATH = os.path.join(BENCHMARK_DIR, "history.db")
+SIGNIFICANCE_LEVEL = 0.05
+MIN_RELATIVE_CHANGE = 0.05  # Changes smaller than 5% are not flagged, however significant
+# Fewest measured runs per side whose exact permutation test can get below SIGNIFICANCE_LEVEL (3 vs 3 bottoms out at 2/20)
+MIN_SIGNIFICANT_RUNS = 4
+PERMUTATION_LIMIT = 20000  # Above this many relabelings the permutation test samples instead of enumerating
+HIGHER_IS_BETTER = {"prompt_eval_rate", "eval_rate"}
+SAMPLE_COLUMNS = ("ttft_s", "total_s", "load_s", "prompt_eval_rate", "eval_rate") + TIMING_FIELDS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    host TEXT,
+    ollama_version TEXT,
+    mode TEXT,
+    prompt TEXT,
+    options TEXT,
+    repetitions INTEGER,
+    warmup INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT REFERENCES runs(id),
+    model TEXT,
+    digest TEXT,
+    quantization TEXT,
+    parameter_size TEXT,
+    warmup INTEGER,
+    repetition INTEGER,
+    started_at REAL,
+    error TEXT,
+    {", ".join(f"{column} REAL" for column in SAMPLE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS samples_run_model ON samples (run_id, model);
+"""
+
+_lock = threading.Lock()
+
+
+@contextmanager
+def connect(db_path=HISTORY_DB_PATH):
+    """Opens the history database, commits on success and always closes it."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    try:
+        connection.executescript(SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def fetch_model_details(base_url=OLLAMA_URL):
+    """Digest, quantization and size of every local model, from /api/tags."""
+    try:
+        response = requests.get(f"{base_url}/tags", timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Could not fetch model details: {e}")
+        return {}
+    details = {}
+    for model in response.json().get("models", []):
+        model_details = model.get("details") or {}
+        details[model["name"]] = {
+            "digest": model.get("digest"),
+            "quantization": model_details.get("quantization_level"),
+            "parameter_size": model_details.get("parameter_size"),
+        }
+    return details
+
+
+def fetch_ollama_version(base_url=OLLAMA_URL):
+    try:
+        response = requests.get(f"{base_url}/version", timeout=10)
+        response.raise_for_status()
+        return response.json().get("version")
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+def record_run(run, db_path=HISTORY_DB_PATH):
+    """Stores a benchmark run and all its samples, tagged with each model's digest and quantization."""
+    base_url = run.get("host", OLLAMA_URL)
+    details = fetch_model_details(base_url)
+    with _lock, connect(db_path) as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run["id"], run["created_at"], base_url, fetch_ollama_version(base_url), run["mode"], run["prompt"],
+             json.dumps(run["options"]), run["repetitions"], run["warmup"]),
+        )
+        columns = ("run_id", "model", "digest", "quantization", "parameter_size", "warmup", "repetition", "started_at", "error") + SAMPLE_COLUMNS
+        rows = []
+        for sample in run["samples"]:
+            model_details = details.get(sample["model"], {})
+            rows.append(
+                (run["id"], sample["model"], model_details.get("digest"), model_details.get("quantization"), model_details.get("parameter_size"),
+                 int(sample["warmup"]), sample["repetition"], sample["started_at"], sample["error"])
+                + tuple(sample.get(column) for column in SAMPLE_COLUMNS)
+            )
+        connection.executemany(f"INSERT INTO samples ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})", rows)
+    return run["id"]
+
+
+def list_runs(db_path=HISTORY_DB_PATH):
+    """All recorded runs, newest first, with the models each one measured."""
+    with connect(db_path) as connection:
+        rows = connection.execute(
+            """SELECT runs.*, GROUP_CONCAT(DISTINCT samples.model) AS models
+               FROM runs LEFT JOIN samples ON samples.run_id = runs.id
+               GROUP BY runs.id ORDER BY runs.created_at DESC"""
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def load_samples(run_id, db_path=HISTORY_DB_PATH):
+    """The measured (non-warmup, successful) samples of a run."""
+    with connect(db_path) as connection:
+        rows = connection.execute("SELECT * FROM samples WHERE run_id = ? AND warmup = 0 AND error IS NULL", (run_id,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def permutation_p_value(baseline, candidate):
+    """Two-sided permutation test on the difference of means; exact for small samples."""
+    pooled = list(baseline) + list(candidate)
+    n = len(baseline)
+    observed = abs(sum(candidate) / len(candidate) - sum(baseline) / n)
+    total = sum(pooled)
+
+    def difference(group):
+        group_sum = sum(group)
+        return abs((total - group_sum) / (len(pooled) - n) - group_sum / n)
+
+    combinations = 1
+    for i in range(n):
+        combinations = combinations * (len(pooled) - i) // (i + 1)
+    if combinations <= PERMUTATION_LIMIT:
+        relabelings = (list(group) for group in itertools.combinations(pooled, n))
+        count = combinations
+    else:
+        rng = random.Random(0)
+        relabelings = (rng.sample(pooled, n) for _ in range(PERMUTATION_LIMIT))
+        count = PERMUTATION_LIMIT
+    extreme = sum(1 for group in relabelings if difference(group) >= observed - 1e-12)
+    return extreme / count
+
+
+def compare_runs(baseline_id, candidate_id, alpha=SIGNIFICANCE_LEVEL, min_change=MIN_RELATIVE_CHANGE, db_path=HISTORY_DB_PATH):
+    """
+    Compares every metric of every model measured in both runs.
+
+    :return: A list of rows with the baseline and candidate means, the relative change, the
+             permutation-test p-value and whether the change is a significant regression.
+    """
+    baseline_samples = load_samples(baseline_id, db_path)
+    candidate_samples = load_samples(candidate_id, db_path)
+    rows = []
+    for model in sorted({sample["model"] for sample in baseline_samples} & {sample["model"] for sample in candidate_samples}):
+        for metric, label in SUMMARY_METRICS.items():
+            before = [sample[metric] for sample in baseline_samples if sample["model"] == model and sample[metric] is not None]
+            after = [sample[metric] for sample in candidate_samples if sample["model"] == model and sample[metric] is not None]
+            if not before or not after:
+                continue
+            before_mean, after_mean = sum(before) / len(before), sum(after) / len(after)
+            change = (after_mean - before_mean) / before_mean if before_mean else 0.0
+            p_value = permutation_p_value(before, after) if len(before) > 1 and len(after) > 1 else None
+            worse = change < 0 if metric in HIGHER_IS_BETTER else change > 0
+            significant = p_value is not None and p_value < alpha and abs(change) >= min_change
+            digests = {sample["digest"] for sample in baseline_samples + candidate_samples if sample["model"] == model}
+            rows.append({
+                "model": model,
+                "metric": label,
+                "baseline_mean": before_mean,
+                "candidate_mean": after_mean,
+                "change": change,
+                "p_value": p_value,
+                "regression": significant and worse,
+                "improvement": significant and not worse,
+                "model_changed": len(digests) > 1,
+            })
+    return rows
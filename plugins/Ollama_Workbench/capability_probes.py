@@ -0,0 +1,161 @@
+# capability_probes.py
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmark import BENCHMARK_DIR, build_options, timed_generate
+from benchmark_history import fetch_model_details
+from ollama_utils import OLLAMA_URL
+
+CAPABILITIES_PATH = os.path.join(BENCHMARK_DIR, "capabilities.json")
+PROBE_VERSION = 1  # Bump when a probe changes, so every model is probed again
+PROBE_MAX_TOKENS = 256  # Probes need short answers, not the 4,000 tokens of a test run
+PROBE_CONCURRENCY = 4
+PROBE_LABELS = {
+    "json_handling": "JSON Handling",
+    "function_calling": "Function Calling",
+    "schema_adherence": "Schema Adherence",
+    "context_length": "Context Length",
+}
+
+_lock = threading.Lock()
+
+
+def generate(model, prompt, base_url):
+    sample = timed_generate(model, prompt, build_options(temperature=0.0, max_tokens=PROBE_MAX_TOKENS), base_url)
+    if sample["error"]:
+        raise RuntimeError(sample["error"])
+    return sample["response"]
+
+
+def parse_json_response(text):
+    """Parses a JSON answer, tolerating a surrounding Markdown code fence."""
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    return json.loads(fenced.group(1) if fenced else text.strip())
+
+
+def probe_json_handling(model, base_url):
+    response = generate(model, "Return the following data in JSON format: name: John, age: 30, city: New York", base_url)
+    try:
+        parse_json_response(response)
+        return {"passed": True}
+    except ValueError:
+        return {"passed": False, "detail": response[:200]}
+
+
+def probe_function_calling(model, base_url):
+    prompt = "Define a function named 'add' that takes two numbers and returns their sum. Then call the function with arguments 5 and 3."
+    response = generate(model, prompt, base_url)
+    return {"passed": "8" in response}
+
+
+def probe_schema_adherence(model, base_url):
+    prompt = (
+        'Respond with ONLY a JSON object matching this schema, no other text: '
+        '{"title": string, "year": integer, "tags": array of strings}. '
+        'Describe the film "The Matrix".'
+    )
+    response = generate(model, prompt, base_url)
+    try:
+        data = parse_json_response(response)
+    except ValueError:
+        return {"passed": False, "detail": "not valid JSON"}
+    expected = {"title": str, "year": int, "tags": list}
+    problems = [key for key, kind in expected.items() if not isinstance(data, dict) or not isinstance(data.get(key), kind)]
+    if not problems and not all(isinstance(tag, str) for tag in data["tags"]):
+        problems.append("tags")
+    return {"passed": not problems, "detail": f"wrong or missing: {', '.join(problems)}" if problems else ""}
+
+
+def probe_context_length(model, base_url):
+    """Reads the context length from the model metadata; no generation needed."""
+    response = requests.post(f"{base_url}/show", json={"name": model}, timeout=30)
+    response.raise_for_status()
+    info = response.json()
+    configured = re.search(r"num_ctx\s+(\d+)", info.get("parameters") or "")
+    trained = next((value for key, value in (info.get("model_info") or {}).items() if key.endswith(".context_length")), None)
+    value = int(configured.group(1)) if configured else trained
+    return {"passed": value is not None, "value": value, "detail": f"trained for {trained}" if trained and configured else ""}
+
+
+PROBES = {
+    "json_handling": probe_json_handling,
+    "function_calling": probe_function_calling,
+    "schema_adherence": probe_schema_adherence,
+    "context_length": probe_context_length,
+}
+
+
+def load_capabilities(path=CAPABILITIES_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable capability cache {path}: {e}")
+        return {}
+
+
+def save_capabilities(capabilities, path=CAPABILITIES_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(capabilities, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run_probe(name, model, base_url):
+    try:
+        return PROBES[name](model, base_url)
+    except (requests.exceptions.RequestException, RuntimeError, ValueError) as e:
+        return {"passed": False, "error": str(e)}
+
+
+def get_capabilities(models, base_url=OLLAMA_URL, force=False, path=CAPABILITIES_PATH):
+    """
+    Returns {model: {probe_name: result}}, probing only models whose digest has not been probed yet.
+
+    Results are stored per model digest, so a model is probed again only after it changes
+    (a new pull, a different quantization) or when force is set.
+    """
+    details = fetch_model_details(base_url)
+    with _lock:
+        cache = load_capabilities(path)
+    results, to_probe = {}, []
+    for model in models:
+        digest = details.get(model, {}).get("digest")
+        entry = cache.get(digest) if digest else None
+        if entry and entry.get("probe_version") == PROBE_VERSION and not force:
+            results[model] = entry["results"]
+        else:
+            to_probe.append(model)
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=PROBE_CONCURRENCY) as executor:
+            futures = {(model, name): executor.submit(run_probe, name, model, base_url) for model in to_probe for name in PROBES}
+            for (model, name), future in futures.items():
+                results.setdefault(model, {})[name] = future.result()
+        with _lock:
+            cache = load_capabilities(path)
+            for model in to_probe:
+                digest = details.get(model, {}).get("digest")
+                # Failed requests are not cached, so an unreachable server does not stick
+                if digest and not any("error" in result for result in results[model].values()):
+                    cache[digest] = {"model": model, "probed_at": datetime.now().isoformat(timespec="seconds"), "probe_version": PROBE_VERSION, "results": results[model]}
+            save_capabilities(cache, path)
+    return results
+
+
+def describe(result):
+    """A short display string for one probe result."""
+    if "error" in result:
+        return f"⚠️ {result['error']}"
+    if "value" in result:
+        return f"{result['value']:,} tokens" if result["value"] else "❌ unknown"
+    text = "✅" if result["passed"] else "❌"
+    return f"{text} {result['detail']}" if result.get("detail") else text
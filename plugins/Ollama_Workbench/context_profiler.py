@@ -0,0 +1,137 @@
+# context_profiler.py
+import random
+
+import numpy as np
+
+from benchmark import build_options, load_model, timed_chat, timed_generate, unload_model
+from ollama_utils import BATCH, OLLAMA_URL
+
+PROFILE_STRATEGIES = {
+    "context": "Reuse context tokens (/api/generate)",
+    "full_text": "Resend full transcript (/api/generate)",
+    "chat": "Message history (/api/chat)",
+}
+CHARS_PER_TOKEN = 4  # Rough estimate, used to put every strategy on the same conversation-length axis
+MAX_FIT_DEGREE = 2
+TOPIC_WORDS = (
+    "the", "system", "latency", "memory", "cache", "model", "agent", "request", "token", "queue", "report",
+    "budget", "schedule", "design", "review", "team", "data", "result", "context", "plan", "risk", "change",
+)
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def synthetic_conversation(turns, words_per_turn, seed=0):
+    """User messages for a long synthetic conversation; the same seed always gives the same text."""
+    rng = random.Random(seed)
+    messages = []
+    for index in range(turns):
+        words = " ".join(rng.choice(TOPIC_WORDS) for _ in range(words_per_turn))
+        messages.append(f"Turn {index + 1}: {words}. Reply in one short sentence.")
+    return messages
+
+
+def transcript(history, prompt):
+    lines = [f"{message['role'].capitalize()}: {message['content']}" for message in history]
+    return "\n".join(lines + [f"User: {prompt}", "Assistant:"])
+
+
+def profile_strategy(model, strategy, user_turns, options, base_url=OLLAMA_URL, progress_callback=None):
+    """
+    Plays the conversation against one model with one way of carrying the history forward.
+
+    "context" passes back the context tokens of the previous /api/generate answer, "full_text"
+    resends the whole transcript as a new prompt and "chat" sends the message list to /api/chat.
+
+    :return: One row per turn with the conversation length and Ollama's prefill and decode timings.
+    """
+    history, context, rows = [], None, []
+    for index, prompt in enumerate(user_turns):
+        if strategy == "context":
+            sample = timed_generate(model, prompt, options, base_url, context=context, return_context=True, priority=BATCH)
+            context = sample.get("context") or context
+        elif strategy == "full_text":
+            sample = timed_generate(model, transcript(history, prompt), options, base_url, priority=BATCH)
+        else:
+            sample = timed_chat(model, history + [{"role": "user", "content": prompt}], options, base_url, priority=BATCH)
+        history += [{"role": "user", "content": prompt}, {"role": "assistant", "content": sample["response"]}]
+        row = {
+            "strategy": strategy,
+            "turn": index + 1,
+            "conversation_tokens": estimate_tokens(transcript(history[:-2], prompt)),
+            "prefill_s": (sample.get("prompt_eval_duration") or 0) / 1e9 if not sample["error"] else None,
+            "decode_s": (sample.get("eval_duration") or 0) / 1e9 if not sample["error"] else None,
+        }
+        row.update({key: sample.get(key) for key in ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration", "ttft_s", "total_s", "error")})
+        rows.append(row)
+        if progress_callback:
+            progress_callback(strategy, index + 1, len(user_turns), row)
+    return rows
+
+
+def fit_prefill_curve(rows, max_degree=MAX_FIT_DEGREE):
+    """
+    Least-squares fit of prefill time (s) against conversation length (tokens).
+
+    :return: {"coefficients": [c0, c1, c2, ...], "r2": ...} with prefill ≈ c0 + c1·n + c2·n², or None
+             when there are too few successful turns.
+    """
+    points = [(row["conversation_tokens"], row["prefill_s"]) for row in rows if row["prefill_s"] is not None]
+    if len(points) < 2:
+        return None
+    x, y = np.array(points, dtype=float).T
+    degree = min(max_degree, len(points) - 1)
+    coefficients = np.polyfit(x, y, degree)
+    predicted = np.polyval(coefficients, x)
+    spread = float(np.sum((y - y.mean()) ** 2))
+    r2 = 1.0 - float(np.sum((y - predicted) ** 2)) / spread if spread else 1.0
+    return {"coefficients": [float(c) for c in coefficients[::-1]], "r2": r2}
+
+
+def summarize_profile(rows):
+    """Per-strategy totals and the fitted prefill curve."""
+    summary = {}
+    for strategy in dict.fromkeys(row["strategy"] for row in rows):
+        strategy_rows = [row for row in rows if row["strategy"] == strategy]
+        ok = [row for row in strategy_rows if not row["error"]]
+        summary[strategy] = {
+            "turns": len(strategy_rows),
+            "errors": len(strategy_rows) - len(ok),
+            "prefill_s": sum(row["prefill_s"] for row in ok),
+            "prompt_tokens": sum(row["prompt_eval_count"] or 0 for row in ok),
+            "total_s": sum(row["total_s"] for row in ok),
+            "last_ttft_s": ok[-1]["ttft_s"] if ok else None,
+            "fit": fit_prefill_curve(ok),
+        }
+    return summary
+
+
+def recommend_strategy(summary):
+    """The strategy with the lowest total time among those that completed every turn."""
+    complete = {strategy: stats for strategy, stats in summary.items() if stats["turns"] and not stats["errors"]}
+    return min(complete, key=lambda strategy: complete[strategy]["total_s"]) if complete else None
+
+
+def run_profile(model, turns=20, words_per_turn=60, strategies=tuple(PROFILE_STRATEGIES), max_tokens=48, base_url=OLLAMA_URL,
+                unload_between=True, seed=0, progress_callback=None):
+    """
+    Profiles how prefill cost grows over a long conversation, for each way of sending the history.
+
+    The model is unloaded and loaded again before each strategy (unless unload_between is off), so
+    no strategy benefits from the KV cache another one left behind.
+
+    :param progress_callback: Optional callable receiving (strategy, turn, turns, row).
+    :return: {"model", "rows", "summary", "recommended"}
+    """
+    user_turns = synthetic_conversation(turns, words_per_turn, seed)
+    options = build_options(temperature=0.0, max_tokens=max_tokens)
+    rows = []
+    for strategy in strategies:
+        if unload_between:
+            unload_model(model, base_url)
+        load_model(model, base_url)
+        rows.extend(profile_strategy(model, strategy, user_turns, options, base_url, progress_callback))
+    summary = summarize_profile(rows)
+    return {"model": model, "rows": rows, "summary": summary, "recommended": recommend_strategy(summary)}
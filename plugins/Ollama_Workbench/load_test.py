@@ -0,0 +1,193 @@
+# load_test.py
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark import timed_generate, build_options, percentile
+from ollama_config import OLLAMA_URL
+
+LOAD_TEST_MODES = ["closed", "open"]  # closed: fixed number of users; open: Poisson arrivals
+DEFAULT_BUCKET_SECONDS = 5
+MAX_IN_FLIGHT = 256  # Upper bound on concurrent requests in open-loop mode
+
+
+class LoadTest:
+    """
+    Drives an Ollama endpoint with a mix of models and prompts for a fixed duration.
+
+    Closed loop: `concurrency` simulated users each send a request as soon as their previous one
+    returns. Open loop: requests arrive as a Poisson process at `arrival_rate` per second,
+    whether or not earlier ones have finished, which exposes queueing.
+
+    The test runs on background threads; `samples` can be read while it is running.
+    """
+
+    def __init__(self, models, prompts, duration_s=60, mode="closed", concurrency=4, arrival_rate=1.0, options=None, base_url=OLLAMA_URL, seed=None):
+        self.models = list(models)
+        self.prompts = [prompt for prompt in prompts if prompt.strip()]
+        self.duration_s = duration_s
+        self.mode = mode
+        self.concurrency = max(1, int(concurrency))
+        self.arrival_rate = arrival_rate
+        self.options = options or build_options()
+        self.base_url = base_url
+        self.samples = []
+        self.started_at = None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.models or not self.prompts:
+            raise ValueError("A load test needs at least one model and one prompt.")
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self):
+        if self._thread:
+            self._thread.join()
+        return self.snapshot()
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.samples)
+
+    def _run(self):
+        if self.mode == "open":
+            self._run_open_loop()
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for _ in range(self.concurrency):
+                    executor.submit(self._closed_loop_user)
+
+    def _deadline_passed(self):
+        return self._stop.is_set() or time.perf_counter() - self.started_at >= self.duration_s
+
+    def _closed_loop_user(self):
+        while not self._deadline_passed():
+            self._send(time.perf_counter())
+
+    def _run_open_loop(self):
+        with ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT) as executor:
+            next_arrival = time.perf_counter()
+            while True:
+                next_arrival += self._random.expovariate(self.arrival_rate)
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                if self._deadline_passed():
+                    break
+                executor.submit(self._send, next_arrival)
+
+    def _send(self, scheduled_at):
+        with self._lock:
+            model = self._random.choice(self.models)
+            prompt = self._random.choice(self.prompts)
+        sent_at = time.perf_counter()
+        # Not queued in the scheduler: the load test measures how the server itself handles concurrency
+        sample = timed_generate(model, prompt, self.options, self.base_url, priority=None)
+        sample["prompt"] = prompt
+        sample["scheduled_s"] = scheduled_at - self.started_at
+        sample["finished_s"] = time.perf_counter() - self.started_at
+        sample["client_queue_s"] = max(0.0, sent_at - scheduled_at)  # Waiting for a free client worker
+        sample["server_queue_s"] = server_queue_delay(sample)
+        sample["latency_s"] = sample["client_queue_s"] + sample["total_s"]
+        with self._lock:
+            self.samples.append(sample)
+
+
+def server_queue_delay(sample):
+    """Estimates how long a request waited in Ollama's queue: TTFT minus model load and prompt evaluation."""
+    if sample.get("ttft_s") is None or sample.get("error"):
+        return None
+    work = (sample.get("load_duration") or 0) / 1e9 + (sample.get("prompt_eval_duration") or 0) / 1e9
+    return max(0.0, sample["ttft_s"] - work)
+
+
+def timeseries(samples, bucket_s=DEFAULT_BUCKET_SECONDS):
+    """Aggregates samples into time buckets by completion time, for charting."""
+    buckets = {}
+    for sample in samples:
+        buckets.setdefault(int(sample["finished_s"] // bucket_s), []).append(sample)
+    rows = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        ok = [sample for sample in bucket if not sample["error"]]
+        latencies = [sample["latency_s"] for sample in ok]
+        queueing = [sample["client_queue_s"] + (sample["server_queue_s"] or 0) for sample in ok]
+        rows.append({
+            "Time (s)": (index + 1) * bucket_s,
+            "Requests/s": len(ok) / bucket_s,
+            "Tokens/s": sum(sample.get("eval_count") or 0 for sample in ok) / bucket_s,
+            "Latency p50 (s)": percentile(latencies, 50),
+            "Latency p95 (s)": percentile(latencies, 95),
+            "Latency p99 (s)": percentile(latencies, 99),
+            "Queueing delay (s)": sum(queueing) / len(queueing) if queueing else None,
+            "Error rate": (len(bucket) - len(ok)) / len(bucket),
+        })
+    return rows
+
+
+def summarize_load_test(samples, duration_s):
+    """Overall throughput, latency percentiles and error rate of a load test."""
+    # Requests still in flight at the deadline finish afterwards; count the time they took
+    duration_s = max([duration_s] + [sample["finished_s"] for sample in samples])
+    ok = [sample for sample in samples if not sample["error"]]
+    latencies = [sample["latency_s"] for sample in ok]
+    ttfts = [sample["ttft_s"] for sample in ok if sample["ttft_s"] is not None]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+        "requests_per_s": len(ok) / duration_s if duration_s else 0.0,
+        "tokens_per_s": sum(sample.get("eval_count") or 0 for sample in ok) / duration_s if duration_s else 0.0,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_p99_s": percentile(latencies, 99),
+        "ttft_p50_s": percentile(ttfts, 50),
+        "ttft_p95_s": percentile(ttfts, 95),
+    }
+
+
+if __name__ == "__main__":
+    # Headless entry point, e.g. for CI against stub_ollama.py:
+    #   python load_test.py --stub --duration 10 --mode open --rate 8
+    parser = argparse.ArgumentParser(description="Load test an Ollama endpoint.")
+    parser.add_argument("--host", default=OLLAMA_URL, help="Base API URL, e.g. http://localhost:11434/api")
+    parser.add_argument("--models", default="stub:latest", help="Comma-separated models to mix")
+    parser.add_argument("--prompts", default="Say hello.", help="Prompts to mix, separated by '||'")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--mode", choices=LOAD_TEST_MODES, default="closed")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=2.0, help="Arrivals per second in open-loop mode")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--stub", action="store_true", help="Start a local stub server and test against it")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Exit with status 1 above this error rate")
+    args = parser.parse_args()
+
+    host = args.host
+    if args.stub:
+        from stub_ollama import start_in_background
+        stub = start_in_background(port=0, models=args.models.split(","))
+        host = f"http://127.0.0.1:{stub.server_address[1]}/api"
+
+    test = LoadTest(args.models.split(","), args.prompts.split("||"), args.duration, args.mode, args.concurrency, args.rate,
+                    build_options(max_tokens=args.max_tokens), host, seed=0)
+    samples = test.start().wait()
+    summary = summarize_load_test(samples, args.duration)
+    print(json.dumps(summary, indent=2))
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        raise SystemExit(1)
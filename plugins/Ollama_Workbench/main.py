@@ -6,10 +6,9 @@ from model_tests import *
 from ui_elements import (
     model_comparison_test, contextual_response_test, feature_test,
     list_local_models, pull_models, show_model_details, remove_model_ui,
-    vision_comparison_test, chat_interface, update_models, files_tab, manage_prompts
+    vision_comparison_test, chat_interface, update_models, files_tab, manage_prompts,
+    benchmark_history_view, load_test_tab
 )
-from repo_docs import main as repo_docs_main
-from web_to_corpus import main as web_to_corpus_main
 from streamlit_extras.buy_me_a_coffee import button
 
 # Define constants
@@ -26,6 +25,8 @@ SIDEBAR_SECTIONS = {
         ("Model Comparison by Response Quality", "Model Comparison by Response Quality"),
         ("Contextual Response Test by Model", "Contextual Response Test by Model"),
         ("Vision Model Comparison", "Vision Model Comparison"),
+        ("Benchmark History", "Benchmark History"),
+        ("Load Test", "Load Test"),
     ],
     "Document": [
         ("Repository Analyzer", "Repository Analyzer"),
@@ -95,13 +96,19 @@ def main_content():
         remove_model_ui()
     elif st.session_state.selected_test == "Vision Model Comparison":
         vision_comparison_test()
+    elif st.session_state.selected_test == "Benchmark History":
+        benchmark_history_view()
+    elif st.session_state.selected_test == "Load Test":
+        load_test_tab()
     elif st.session_state.selected_test == "Chat":
         chat_interface()
     elif st.session_state.selected_test == "Update Models":
         update_models()
     elif st.session_state.selected_test == "Repository Analyzer":
+        from repo_docs import main as repo_docs_main  # fpdf and the analyzers load with the tab
         repo_docs_main()
     elif st.session_state.selected_test == "Web to Corpus":
+        from web_to_corpus import main as web_to_corpus_main  # Selenium, pdfkit and PyPDF2 load with the tab
         web_to_corpus_main()
     elif st.session_state.selected_test == "Files":
         files_tab()
@@ -137,6 +144,8 @@ def display_welcome_message():
         - **Model Comparison by Response Quality**: Compare the response quality and performance of multiple models for a given prompt.
         - **Contextual Response Test by Model**: Test how well a model maintains context across multiple prompts.
         - **Vision Model Comparison**: Compare the performance of vision models using the same test image.
+        - **Benchmark History**: Browse recorded benchmark runs and flag significant regressions between two runs.
+        - **Load Test**: Drive an Ollama endpoint with concurrent or Poisson-arriving requests and chart throughput, latency, queueing and errors.
 
         #### **Document**
         - **Repository Analyzer**: Analyze your Python repository, generate documentation, debug reports, or a README.md file.
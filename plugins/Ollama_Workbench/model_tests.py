@@ -1,38 +1,25 @@
 # model_tests.py
 import streamlit as st
-import pandas as pd
 import time
 import json
-import matplotlib.pyplot as plt
 from ollama_utils import call_ollama_endpoint
+from benchmark import build_options, run_benchmark
 
-# Set plot style based on Streamlit theme
-if st.get_option("theme.base") == "light":
-    plt.style.use('default')  # Use default white background for light mode
-else:
-    plt.style.use('dark_background')  # Use dark background for dark mode
+def performance_test(models, prompt, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, repetitions=1, warmup=0, mode="isolated", progress_callback=None):
+    """Benchmarks the models and returns the full run: raw samples plus per-model percentiles."""
+    if not models:  # Check if any models are selected
+        return None
+    options = build_options(temperature, max_tokens, presence_penalty, frequency_penalty)
+    return run_benchmark(models, prompt, options, repetitions=repetitions, warmup=warmup, mode=mode, progress_callback=progress_callback)
 
-def performance_test(models, prompt, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None):
+def last_results(run):
+    """{model: (response, elapsed_time, eval_count, eval_duration)} from each model's last measured sample."""
     results = {}
-    if models:  # Check if any models are selected
-        for model in models:
-            start_time = time.time()
-            result, _, eval_count, eval_duration = call_ollama_endpoint(
-                model,
-                prompt,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                presence_penalty=presence_penalty,
-                frequency_penalty=frequency_penalty,
-                context=context,
-            )
-            end_time = time.time()
-            elapsed_time = end_time - start_time
-            results[model] = (result, elapsed_time, eval_count, eval_duration)
-            time.sleep(0.1)
-        return results
-    else:
-        return {}  # Return an empty dictionary if no models are selected
+    for sample in (run or {}).get("samples", []):
+        if not sample["warmup"]:
+            result = sample["response"] if not sample["error"] else f"An error occurred: {sample['error']}"
+            results[sample["model"]] = (result, sample["total_s"], sample.get("eval_count"), sample.get("eval_duration"))
+    return results
 
 def vision_test(models, image_file, temperature=0.5, max_tokens=150, presence_penalty=0.0, frequency_penalty=0.0, context=None):
     results = {}
@@ -0,0 +1,17 @@
+# ollama_config.py
+"""The Ollama endpoint and request priorities, importable without Streamlit or the ollama package (e.g. headless in CI)."""
+from contextlib import nullcontext
+
+try:
+    # Inside TeamForgeAI, Workbench requests share the app's priority queue with the agents
+    from llm_scheduler import llm_slot, llm_slot_limit, INTERACTIVE, BATCH
+except ImportError:
+    INTERACTIVE, BATCH = "interactive", "batch"
+
+    def llm_slot(priority=INTERACTIVE):
+        return nullcontext()
+
+    def llm_slot_limit(priority=INTERACTIVE):
+        return None  # Standalone, nothing limits the requests but the server
+
+OLLAMA_URL = "http://localhost:11434/api"
@@ -7,7 +7,7 @@ import streamlit as st
 import ollama
 from datetime import datetime
 
-OLLAMA_URL = "http://localhost:11434/api"
+from ollama_config import OLLAMA_URL, BATCH, INTERACTIVE, llm_slot, llm_slot_limit
 
 @st.cache_data  # Cache the list of available models
 def get_available_models():
@@ -41,24 +41,26 @@ def call_ollama_endpoint(model, prompt=None, image=None, temperature=0.5, max_to
 
         # Send image data using multipart/form-data
         files = {"file": (filename, image_bytesio, image_format)}
-        response = requests.post(f"{OLLAMA_URL}/generate", data=payload, files=files, stream=True)
+        request = {"data": payload, "files": files}
     else:
-        response = requests.post(f"{OLLAMA_URL}/generate", json=payload, stream=True)
-    try:
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        return f"An error occurred: {str(e)}", None, None, None  # Return None for eval_count and eval_duration
+        request = {"json": payload}
+    with llm_slot(INTERACTIVE):
+        response = requests.post(f"{OLLAMA_URL}/generate", stream=True, **request)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            return f"An error occurred: {str(e)}", None, None, None  # Return None for eval_count and eval_duration
 
-    response_parts = []
-    eval_count = None
-    eval_duration = None
-    for line in response.iter_lines():
-        part = json.loads(line)
-        response_parts.append(part.get("response", ""))
-        if part.get("done", False):
-            eval_count = part.get("eval_count", None)
-            eval_duration = part.get("eval_duration", None)
-            break
+        response_parts = []
+        eval_count = None
+        eval_duration = None
+        for line in response.iter_lines():
+            part = json.loads(line)
+            response_parts.append(part.get("response", ""))
+            if part.get("done", False):
+                eval_count = part.get("eval_count", None)
+                eval_duration = part.get("eval_duration", None)
+                break
     return "".join(response_parts), part.get("context", None), eval_count, eval_duration
 
 def check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty):
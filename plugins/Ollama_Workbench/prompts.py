@@ -57,7 +57,7 @@ def manage_prompts():
     if edited_prompts != prompts:
         save_prompts(prompt_type, edited_prompts)
         st.success(f"{selected_prompt_type} prompts saved successfully!")
-        st.experimental_rerun()
+        st.rerun()
 
     # Download prompts
     st.download_button(
@@ -76,6 +76,6 @@ def manage_prompts():
             edited_prompts.update(uploaded_prompts)
             save_prompts(prompt_type, edited_prompts)
             st.success(f"{selected_prompt_type} prompts uploaded and appended successfully!")
-            st.experimental_rerun()
+            st.rerun()
         except json.JSONDecodeError:
             st.error("Invalid JSON file. Please upload a valid prompts JSON file.")
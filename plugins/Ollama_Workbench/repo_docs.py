@@ -1,12 +1,30 @@
 import os
+import ast
 import requests
 import json
+import hashlib
 import subprocess
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+import threading
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import streamlit as st
 from fpdf import FPDF
 import tempfile
 import queue
+import html
+from ollama_utils import BATCH, llm_slot, llm_slot_limit
+
+CACHE_DIR = os.path.join("db", "repo_docs_cache")  # Per-file results, one folder per analyzed repository; never inside it
+CACHE_SAVE_EVERY = 25  # Files finished between cache writes; the cache is also written when a run ends or fails
+DEFAULT_LLM_WORKERS = 2  # Match OLLAMA_NUM_PARALLEL on the server for real concurrency
+PYLINT_BATCH_SIZE = 200  # Files per pylint invocation, keeps the command line short
+MAX_SINGLE_PROMPT_CHARS = 12000  # Larger files are documented per top-level class or function
+CHUNKED_TASK_TYPES = ("documentation", "debug")
+IMPORT_SCAN_POOL_THRESHOLD = 50  # Below this many uncached files, process start-up costs more than it saves
+
+# Bounds the LLM requests in flight across all files and units; replaced in main() from the UI setting
+llm_slots = threading.BoundedSemaphore(DEFAULT_LLM_WORKERS)
 
 class PDF(FPDF):
     def header(self):
@@ -139,6 +157,12 @@ The README will include:
 
 INSTRUCTION: Use appropriate Markdown formatting to make the README visually appealing and easy to read. Here's the code to base the README on:
 
+{file_content}
+"""
+    elif task_type == "summary":
+        prompt = f"""
+You are an expert in Python programming and technical writing. Summarize the purpose of the following Python module in one short paragraph, then list its main classes and functions with one line each. This summary will be shared as context while each part of the module is documented separately.
+
 {file_content}
 """
     elif task_type == "requirements":
@@ -170,6 +194,115 @@ def run_pylint(file_path):
     result = subprocess.run(['pylint', file_path], capture_output=True, text=True)
     return result.stdout
 
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def cache_directory(repo_path):
+    """The cache folder of a repository, keyed by its absolute path."""
+    repo_path = os.path.abspath(repo_path)
+    return os.path.join(CACHE_DIR, f"{os.path.basename(repo_path) or 'repo'}_{content_hash(repo_path)[:12]}")
+
+class AnalysisCache:
+    """
+    Per-file results keyed by content hash (last, after any "|"), so re-runs only process files that changed.
+
+    Entries are written by save(), which callers invoke every few files and when a run ends,
+    not after every file.
+    """
+
+    def __init__(self, repo_path, name):
+        self.path = os.path.join(cache_directory(repo_path), f"{name}.json")
+        self.entries = {}
+        self.used = set()  # Keys read or written in this run
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache {self.path}: {e}")
+
+    def get(self, key):
+        with self._lock:
+            self.used.add(key)
+            return self.entries.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self.used.add(key)
+            self.entries[key] = value
+            self.dirty = True
+
+    def prune(self):
+        """
+        Drops the entries of files that no longer exist or changed; call after a complete run.
+
+        Every current file was looked up during the run, so an entry is kept when it was used or
+        when it belongs to a current file's content hash (e.g. results for other models).
+        """
+        with self._lock:
+            current = {key.rsplit("|", 1)[-1] for key in self.used}
+            stale = [key for key in self.entries if key not in self.used and key.rsplit("|", 1)[-1] not in current]
+            for key in stale:
+                del self.entries[key]
+            self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        """Writes the cache if it changed; the file is written outside the lock the workers use."""
+        with self._save_lock:
+            with self._lock:
+                if not self.dirty:
+                    return
+                data = json.dumps(self.entries)
+                self.dirty = False
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path + ".tmp", 'w', encoding='utf-8') as file:
+                file.write(data)
+            os.replace(self.path + ".tmp", self.path)
+
+def format_pylint_messages(messages):
+    lines = [f"{m['path']}:{m['line']}:{m['column']}: {m['message-id']}: {m['message']} ({m['symbol']})" for m in messages]
+    return "\n".join(lines) if lines else "No pylint messages."
+
+def run_pylint_batch(file_paths, cache=None):
+    """Runs pylint once per batch of files (with its own worker processes) and returns {file_path: report}."""
+    reports = {}
+    hashes = {}
+    pending = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                hashes[file_path] = content_hash(file.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        cached = cache.get(hashes[file_path]) if cache else None
+        if cached is not None:
+            reports[file_path] = cached
+        else:
+            pending.append(file_path)
+
+    for start in range(0, len(pending), PYLINT_BATCH_SIZE):
+        batch = pending[start:start + PYLINT_BATCH_SIZE]
+        try:
+            result = subprocess.run(['pylint', '--output-format=json', '--jobs=0'] + batch, capture_output=True, text=True)
+            messages = json.loads(result.stdout or "[]")
+        except (OSError, ValueError) as e:
+            print(f"Error running pylint: {e}")
+            reports.update({file_path: f"Error running pylint: {e}" for file_path in batch})
+            continue
+        by_file = {os.path.abspath(file_path): [] for file_path in batch}
+        for message in messages:
+            by_file.setdefault(os.path.abspath(message.get('absolutePath') or message['path']), []).append(message)
+        for file_path in batch:
+            reports[file_path] = format_pylint_messages(by_file[os.path.abspath(file_path)])
+            if cache:
+                cache.set(hashes[file_path], reports[file_path])
+    if cache:
+        cache.save()
+    return reports
+
 def get_all_code_files(root_dir):
     code_files = []
     for subdir, _, files in os.walk(root_dir):
@@ -198,60 +331,254 @@ def process_file_with_updates(file_path, task_type, model, temperature, max_toke
         print(f"Error reading file {file_path}: UnicodeDecodeError")
         return file_path, f"Error reading file: UnicodeDecodeError", "", ""
 
-def generate_pdf(results, output_path, task_type):
-    pdf = PDF()
-    pdf.set_left_margin(10)
-    pdf.set_right_margin(10)
-    pdf.add_page()
-
-    for file_path, documentation, pylint_report, file_content in results:
-        chapter_title = f"File: {file_path}"
-        if task_type == "debug":
-            chapter_body = f"Pylint Report:\n{pylint_report}\n\nDebug Report:\n{documentation}\n\nCode:\n{file_content}"
-        elif task_type == "documentation":
-            chapter_body = f"Documentation:\n{documentation}\n\nCode:\n{file_content}"
-        else:  # README
-            chapter_body = documentation
-        pdf.add_chapter(chapter_title, chapter_body)
-
-    pdf.output(output_path, 'F')
-
-def process_file_with_updates(file_path, task_type, model, temperature, max_tokens, update_queue):
+def chapter_body(task_type, documentation, pylint_report, file_content):
+    if task_type == "debug":
+        return f"Pylint Report:\n{pylint_report}\n\nDebug Report:\n{documentation}\n\nCode:\n{file_content}"
+    elif task_type == "documentation":
+        return f"Documentation:\n{documentation}\n\nCode:\n{file_content}"
+    else:  # README
+        return documentation
+
+class ReportWriter:
+    """
+    Writes the report chapter by chapter as files finish, instead of from a full results list at the end.
+
+    Only the Markdown and HTML reports are incremental: their chapters are flushed to disk
+    immediately, so a partial report can be read during long runs. FPDF keeps its pages in memory
+    until output, so the PDF is written on close(), which callers run in a finally block so that
+    a failed run still leaves the chapters it finished.
+    """
+
+    def __init__(self, base_path, task_type, formats=("pdf",)):
+        self.task_type = task_type
+        self.paths = {extension: f"{base_path}.{extension}" for extension in formats}
+        self.chapters = 0
+        self.pdf = None
+        self.markdown_file = self.html_file = None
+        if "pdf" in self.paths:
+            self.pdf = PDF()
+            self.pdf.set_left_margin(10)
+            self.pdf.set_right_margin(10)
+            self.pdf.add_page()
+        if "md" in self.paths:
+            self.markdown_file = open(self.paths["md"], 'w', encoding='utf-8')
+            self.markdown_file.write(f"# Repository Analysis ({task_type})\n\n")
+            self.markdown_file.flush()
+        if "html" in self.paths:
+            self.html_file = open(self.paths["html"], 'w', encoding='utf-8')
+            self.html_file.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Repository Analysis ({task_type})</title></head>\n<body>\n<h1>Repository Analysis ({task_type})</h1>\n")
+            self.html_file.flush()
+
+    def add(self, file_path, documentation, pylint_report, file_content):
+        body = chapter_body(self.task_type, documentation, pylint_report, file_content)
+        self.chapters += 1
+        if self.pdf:
+            self.pdf.add_chapter(f"File: {file_path}", body)
+        if self.markdown_file:
+            if self.task_type == "readme":
+                self.markdown_file.write(f"## File: {file_path}\n\n{documentation}\n\n")
+            else:
+                self.markdown_file.write(f"## File: {file_path}\n\n")
+                if self.task_type == "debug":
+                    self.markdown_file.write(f"### Pylint Report\n\n```\n{pylint_report}\n```\n\n")
+                self.markdown_file.write(f"### {'Debug Report' if self.task_type == 'debug' else 'Documentation'}\n\n{documentation}\n\n")
+                self.markdown_file.write(f"### Code\n\n```python\n{file_content}\n```\n\n")
+            self.markdown_file.flush()
+        if self.html_file:
+            self.html_file.write(f"<h2>File: {html.escape(file_path)}</h2>\n<pre style=\"white-space: pre-wrap\">{html.escape(body)}</pre>\n")
+            self.html_file.flush()
+
+    def close(self):
+        """Finishes every format; calling it again does nothing."""
+        if self.markdown_file:
+            self.markdown_file.close()
+            self.markdown_file = None
+        if self.html_file:
+            self.html_file.write("</body></html>\n")
+            self.html_file.close()
+            self.html_file = None
+        if self.pdf:
+            pdf, self.pdf = self.pdf, None
+            pdf.output(self.paths["pdf"], 'F')
+
+def split_into_units(file_content, max_chars=MAX_SINGLE_PROMPT_CHARS):
+    """
+    Splits a module into (name, source) units along its top-level classes and functions.
+
+    The first unit, "module", holds everything else (imports, constants, statements) plus the
+    signatures of the other units. Classes longer than max_chars are split into their methods,
+    and neighbouring small units are merged up to max_chars.
+    """
+    tree = ast.parse(file_content)
+    lines = file_content.splitlines(keepends=True)
+
+    def segment(node):
+        start = min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+        return "".join(lines[start - 1:node.end_lineno])
+
+    definitions = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    module_parts, signatures, units = [], [], []
+    for node in tree.body:
+        if not isinstance(node, definitions):
+            module_parts.append(segment(node))
+            continue
+        source = segment(node)
+        signatures.append(lines[node.lineno - 1].strip())
+        if isinstance(node, ast.ClassDef) and len(source) > max_chars:
+            methods = [child for child in node.body if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            header = [segment(child) for child in node.body if child not in methods]
+            units.append((node.name, lines[node.lineno - 1] + "".join(header)))
+            units.extend((f"{node.name}.{method.name}", segment(method)) for method in methods)
+        else:
+            units.append((node.name, source))
+    # Merge neighbouring small units so short helpers do not each cost a request
+    merged = []
+    for name, source in units:
+        if merged and len(merged[-1][1]) + len(source) <= max_chars:
+            merged[-1] = (f"{merged[-1][0]}, {name}", merged[-1][1] + "\n" + source)
+        else:
+            merged.append((name, source))
+    module_source = "".join(module_parts) + "\n# Definitions in this module:\n" + "\n".join(f"# {signature}" for signature in signatures)
+    return [("module", module_source)] + merged
+
+def collect_stream(file_content, task_type, model, temperature, max_tokens, update_queue=None, prefix=""):
+    """Runs one generation while holding an LLM slot (and a batch slot of the app's scheduler) and returns the full text."""
+    with llm_slots, llm_slot(BATCH):
+        text = ""
+        for chunk in generate_documentation_stream(file_content, task_type, model, temperature, max_tokens):
+            text += chunk
+            if update_queue is not None:
+                update_queue.put(("output", prefix + text))
+        return text
+
+def process_file_in_units(file_path, file_content, task_type, model, temperature, max_tokens, update_queue, cache=None):
+    """Documents a large file per top-level unit, concurrently, and stitches the results back together."""
+    units = split_into_units(file_content)
+    module_source = units[0][1]
+    summary = collect_stream(module_source, "summary", model, temperature, max_tokens, update_queue, f"{file_path} (module summary)\n")
+
+    def process_unit(name, source):
+        cache_key = f"unit|{model}|{temperature}|{max_tokens}|{content_hash(source)}"
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            return cached
+        unit_content = f"Module summary of {file_path}:\n{summary}\n\nDocument only the following part of the module, `{name}`:\n\n{source}"
+        text = collect_stream(unit_content, task_type, model, temperature, max_tokens, update_queue, f"{file_path} ({name})\n")
+        if cache:
+            cache.set(cache_key, text)
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, len(units))) as executor:
+        # Only leaf LLM calls take an llm_slots permit, so this nested pool cannot deadlock
+        unit_results = list(executor.map(lambda unit: process_unit(*unit), units))
+
+    sections = [f"## Module summary\n\n{summary}"]
+    sections += [f"## `{name}`\n\n{text}" for (name, _), text in zip(units, unit_results)]
+    return "\n\n".join(sections)
+
+def process_file_with_updates(file_path, task_type, model, temperature, max_tokens, update_queue, cache=None):
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
             file_content = file.read()
-        
+
+        cache_key = f"{model}|{temperature}|{max_tokens}|{content_hash(file_content)}"
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            update_queue.put(("status", f"Unchanged, using cached result: {file_path}"))
+            return file_path, cached, "", file_content
+
         # Update status
         update_queue.put(("status", f"Processing: {file_path}"))
         
-        # Generate documentation with real-time updates
-        documentation = ""
-        for chunk in generate_documentation_stream(file_content, task_type, model, temperature, max_tokens):
-            documentation += chunk
-            update_queue.put(("output", documentation))
-        
-        pylint_report = run_pylint(file_path) if task_type == "debug" else ""
-        return file_path, documentation, pylint_report, file_content
+        documentation = None
+        if task_type in CHUNKED_TASK_TYPES and len(file_content) > MAX_SINGLE_PROMPT_CHARS:
+            try:
+                documentation = process_file_in_units(file_path, file_content, task_type, model, temperature, max_tokens, update_queue, cache)
+            except SyntaxError as e:
+                print(f"Could not parse {file_path}, documenting it as a whole: {e}")
+
+        if documentation is None:
+            # Generate documentation with real-time updates
+            documentation = collect_stream(file_content, task_type, model, temperature, max_tokens, update_queue)
+
+        if cache:
+            cache.set(cache_key, documentation)  # Written to disk by main(), every CACHE_SAVE_EVERY files
+        # Pylint runs separately, over all files at once, see run_pylint_batch
+        return file_path, documentation, "", file_content
     except UnicodeDecodeError:
         print(f"Error reading file {file_path}: UnicodeDecodeError")
         return file_path, f"Error reading file: UnicodeDecodeError", "", ""
 
-def generate_requirements_file(repo_path):
-    requirements = set()
+def scan_imports(file_path):
+    """Returns the top-level names of every absolute import in a file, including nested ones."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            tree = ast.parse(file.read(), filename=file_path)
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError) as e:
+        print(f"Skipping imports of {file_path}: {e}")
+        return []
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return sorted(names)
+
+def local_module_names(repo_path, code_files):
+    """Names that resolve to the repository itself: its modules and the directories holding them."""
+    names = set()
+    for code_file in code_files:
+        names.add(os.path.splitext(os.path.basename(code_file))[0])
+        relative_dir = os.path.relpath(os.path.dirname(code_file), repo_path)
+        if relative_dir != os.curdir:
+            names.update(relative_dir.split(os.sep))
+    return names
+
+def generate_requirements_file(repo_path, cache=None):
     code_files = get_all_code_files(repo_path)
+
+    imports_by_file = {}
+    pending = {}
     for code_file in code_files:
-        with open(code_file, 'r') as file:
-            for line in file:
-                if line.startswith('import ') or line.startswith('from '):
-                    parts = line.split()
-                    if parts[0] == 'import':
-                        requirements.add(parts[1].split('.')[0])
-                    elif parts[0] == 'from':
-                        requirements.add(parts[1].split('.')[0])
+        try:
+            with open(code_file, 'r', encoding='utf-8') as file:
+                file_hash = content_hash(file.read())
+        except (OSError, UnicodeDecodeError):
+            continue
+        cached = cache.get(file_hash) if cache else None
+        if cached is not None:
+            imports_by_file[code_file] = cached
+        else:
+            pending[code_file] = file_hash
+
+    if len(pending) >= IMPORT_SCAN_POOL_THRESHOLD:
+        with ProcessPoolExecutor() as executor:
+            scanned = dict(zip(pending, executor.map(scan_imports, pending, chunksize=16)))
+    else:
+        scanned = {code_file: scan_imports(code_file) for code_file in pending}
+    for code_file, names in scanned.items():
+        imports_by_file[code_file] = names
+        if cache:
+            cache.set(pending[code_file], names)
+    if cache:
+        cache.save()
+
+    stdlib = set(getattr(sys, 'stdlib_module_names', ())) | set(sys.builtin_module_names) | {'__future__'}
+    local = local_module_names(repo_path, code_files)
+    distributions = metadata.packages_distributions() if hasattr(metadata, 'packages_distributions') else {}
+
+    requirements = set()
+    for names in imports_by_file.values():
+        for name in names:
+            if name in stdlib or name in local:
+                continue
+            # Map the import name to the installed distribution, e.g. bs4 -> beautifulsoup4
+            requirements.add(distributions.get(name, [name])[0])
 
     requirements_path = os.path.join(repo_path, 'requirements.txt')
     with open(requirements_path, 'w') as req_file:
-        for requirement in sorted(requirements):
+        for requirement in sorted(requirements, key=str.lower):
             req_file.write(requirement + '\n')
     return requirements_path
 
@@ -267,6 +594,13 @@ def main():
     # Add temperature and max tokens sliders
     temperature = st.slider("Temperature", min_value=0.0, max_value=1.0, value=0.2, step=0.1)
     max_tokens = st.slider("Max Tokens", min_value=100, max_value=32000, value=4000, step=100)
+    llm_workers = st.number_input("Parallel LLM requests", min_value=1, max_value=16, value=DEFAULT_LLM_WORKERS, help="Files documented at the same time. Set OLLAMA_NUM_PARALLEL on the server to at least this value.")
+    batch_limit = llm_slot_limit(BATCH)
+    if batch_limit and llm_workers > batch_limit:
+        st.caption(f"Only {batch_limit} batch requests run at once; raise TEAMFORGE_LLM_CONCURRENCY or set TEAMFORGE_LLM_CLASS_LIMITS (e.g. batch={int(llm_workers)}) to use more.")
+        llm_workers = batch_limit
+    use_cache = st.checkbox("Reuse results for unchanged files", value=True, help=f"Results are cached under {CACHE_DIR} in the app folder, not in the repository.")
+    extra_formats = st.multiselect("Also write the report as", ["Markdown", "HTML"], default=["Markdown"], help="Markdown and HTML are written chapter by chapter while the analysis runs; the PDF is written when it ends.")
 
     if st.button("Analyze Repository"):
         if not repo_path or not os.path.isdir(repo_path):
@@ -274,7 +608,11 @@ def main():
             return
 
         if task_type == "requirements":
-            requirements_path = generate_requirements_file(repo_path)
+            imports_cache = AnalysisCache(repo_path, "imports") if use_cache else None
+            requirements_path = generate_requirements_file(repo_path, imports_cache)
+            if imports_cache:
+                imports_cache.prune()
+                imports_cache.save()
             st.success(f"requirements.txt file has been created at {requirements_path}")
             return
 
@@ -284,7 +622,12 @@ def main():
             st.warning("No Python files found in the specified directory.")
             return
 
-        results = []
+        report_base = os.path.join(repo_path, f"repository_{task_type}_report")
+        formats = ("pdf",) + tuple({"Markdown": "md", "HTML": "html"}[name] for name in extra_formats)
+        report = ReportWriter(report_base, task_type, formats)
+        if len(formats) > 1:
+            st.info("Partial reports are written while the analysis runs: " + ", ".join(report.paths[extension] for extension in formats[1:]))
+        readme_content = None
         progress_bar = st.progress(0)
         status_text = st.empty()
         output_area = st.empty()
@@ -303,27 +646,48 @@ def main():
                 except queue.Empty:
                     break
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            futures = {executor.submit(process_file_with_updates, file_path, task_type, model, temperature, max_tokens, update_queue): file_path for file_path in code_files}
-            for i, future in enumerate(as_completed(futures)):
-                file_path, documentation, pylint_report, file_content = future.result()
-                results.append((file_path, documentation, pylint_report, file_content))
-                progress = (i + 1) / len(code_files)
-                progress_bar.progress(progress)
-                update_ui()
+        global llm_slots
+        llm_slots = threading.BoundedSemaphore(int(llm_workers))
+        cache = AnalysisCache(repo_path, task_type) if use_cache else None
+        pylint_cache = AnalysisCache(repo_path, "pylint") if use_cache else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pylint_executor, ThreadPoolExecutor(max_workers=int(llm_workers)) as executor:
+                # Pylint runs in its own processes while the LLM requests are in flight
+                pylint_future = pylint_executor.submit(run_pylint_batch, code_files, pylint_cache) if task_type == "debug" else None
+                futures = {executor.submit(process_file_with_updates, file_path, task_type, model, temperature, max_tokens, update_queue, cache): file_path for file_path in code_files}
+                for i, future in enumerate(as_completed(futures)):
+                    file_path, documentation, pylint_report, file_content = future.result()
+                    if pylint_future:
+                        pylint_report = pylint_future.result().get(file_path, "")
+                    # Each chapter is written as soon as its file is done; nothing is kept around
+                    report.add(file_path, documentation, pylint_report, file_content)
+                    if readme_content is None:
+                        readme_content = documentation
+                    if cache and (i + 1) % CACHE_SAVE_EVERY == 0:
+                        cache.save()
+                    progress = (i + 1) / len(code_files)
+                    progress_bar.progress(progress)
+                    update_ui()
+            for finished_cache in (cache, pylint_cache if task_type == "debug" else None):
+                if finished_cache:
+                    finished_cache.prune()  # Only after a complete run, when every current file was looked up
+        finally:
+            # Save the PDF report and close the other formats, also when a file failed
+            report.close()
+            for run_cache in (cache, pylint_cache):
+                if run_cache:
+                    run_cache.save()  # An aborted run keeps the results it already has
 
         progress_bar.empty()
         status_text.empty()
 
-        # Generate and save PDF report
-        pdf_filename = f"repository_{task_type}_report.pdf"
-        pdf_path = os.path.join(repo_path, pdf_filename)
-        generate_pdf(results, pdf_path, task_type)
-        
+        pdf_filename = os.path.basename(report.paths["pdf"])
+
         st.success(f"Analysis complete! PDF report saved as {pdf_filename} in the repository folder.")
 
         if task_type == "readme":
-            readme_content = results[0][1] if results else "No content generated"
+            readme_content = readme_content or "No content generated"
             readme_path = os.path.join(repo_path, "README.md")
             with open(readme_path, "w") as readme_file:
                 readme_file.write(readme_content)
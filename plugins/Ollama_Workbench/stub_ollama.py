@@ -0,0 +1,130 @@
+# stub_ollama.py
+"""
+A minimal stand-in for the Ollama HTTP API, for load tests and benchmarks without a GPU (e.g. in CI).
+
+It serves /api/generate and /api/chat (streaming, with Ollama's timing fields), /api/show, /api/tags,
+/api/ps and /api/version.
+A semaphore emulates OLLAMA_NUM_PARALLEL: requests beyond it wait, which shows up as queueing delay.
+
+    python stub_ollama.py --port 11435 --parallel 2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 11435
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"  # Close after each response, like a plain streaming server
+    settings = None  # Set by make_server()
+    slots = None
+    loaded = None  # Names of "loaded" models, for /api/ps
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            models = [{"name": name, "digest": f"stub-{name}", "size": 0, "details": {"quantization_level": "Q4_0", "parameter_size": "7B"}} for name in self.settings.models]
+            self.send_json({"models": models})
+        elif self.path == "/api/ps":
+            self.send_json({"models": [{"name": name, "size": 0, "size_vram": 0} for name in sorted(self.loaded)]})
+        elif self.path == "/api/version":
+            self.send_json({"version": "stub"})
+        else:
+            self.send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/api/show":
+            self.send_json({"parameters": "", "details": {"quantization_level": "Q4_0"}, "model_info": {"stub.context_length": 4096}})
+            return
+        if self.path not in ("/api/generate", "/api/chat"):
+            self.send_json({"error": "not found"}, 404)
+            return
+        chat = self.path == "/api/chat"
+        if request.get("keep_alive") in (0, "0"):
+            self.loaded.discard(request.get("model"))
+        else:
+            self.loaded.add(request.get("model"))
+        prompt = "\n".join(message.get("content", "") for message in request.get("messages", [])) if chat else request.get("prompt")
+        if not prompt:
+            self.send_json({"model": request.get("model"), "response": "", "done": True})  # Load/unload requests
+            return
+        if random.random() < self.settings.error_rate:
+            self.send_json({"error": "stub error"}, 500)
+            return
+
+        settings = self.settings
+        queued_at = time.perf_counter()
+        with self.slots:
+            started_at = time.perf_counter()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            time.sleep(settings.prompt_ms / 1000)
+            for index in range(settings.tokens):
+                text = f"token{index} "
+                part = {"model": request.get("model"), "message": {"role": "assistant", "content": text}} if chat else {"model": request.get("model"), "response": text}
+                self.wfile.write((json.dumps(dict(part, done=False)) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(settings.token_ms / 1000)
+            finished_at = time.perf_counter()
+            prompt_tokens = max(1, len(prompt) // 4)
+            final = {
+                "model": request.get("model"),
+                "done": True,
+                "total_duration": int((finished_at - queued_at) * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(settings.prompt_ms * 1e6),
+                "eval_count": settings.tokens,
+                "eval_duration": int((finished_at - started_at - settings.prompt_ms / 1000) * 1e9),
+            }
+            if chat:
+                final["message"] = {"role": "assistant", "content": ""}
+            else:
+                final["response"] = ""
+                final["context"] = list(request.get("context") or []) + list(range(prompt_tokens + settings.tokens))
+            self.wfile.write((json.dumps(final) + "\n").encode("utf-8"))
+
+
+def make_server(port=DEFAULT_PORT, parallel=2, prompt_ms=50, token_ms=10, tokens=20, error_rate=0.0, models=("stub:latest",)):
+    """Creates (but does not start) a stub server; call serve_forever() on the result."""
+    settings = argparse.Namespace(prompt_ms=prompt_ms, token_ms=token_ms, tokens=tokens, error_rate=error_rate, models=list(models))
+    handler = type("ConfiguredStubOllamaHandler", (StubOllamaHandler,), {"settings": settings, "slots": threading.BoundedSemaphore(parallel), "loaded": set()})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def start_in_background(**kwargs):
+    """Starts a stub server on a daemon thread and returns it; stop it with shutdown()."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Ollama server for load tests.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--parallel", type=int, default=2, help="Concurrent generations, like OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--prompt-ms", type=float, default=50, help="Simulated prompt evaluation time")
+    parser.add_argument("--token-ms", type=float, default=10, help="Simulated time per generated token")
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens generated per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--models", default="stub:latest", help="Comma-separated model names reported by /api/tags")
+    args = parser.parse_args()
+    server = make_server(args.port, args.parallel, args.prompt_ms, args.token_ms, args.tokens, args.error_rate, args.models.split(","))
+    print(f"Stub Ollama listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
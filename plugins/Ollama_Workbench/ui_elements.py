@@ -3,17 +3,28 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import json
+import time
 import os
 import ollama
 from ollama_utils import *
 from model_tests import *
 import requests
 import re
-from langchain_community.embeddings import OllamaEmbeddings # Updated import
-from langchain_community.vectorstores import Chroma # Updated import
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.docstore.document import Document
 from prompts import get_agent_prompt, get_metacognitive_prompt, manage_prompts
+from embedding_pipeline import (
+    EmbeddingPipeline, checkpoint_path_for,
+    DEFAULT_EMBEDDING_MODEL, DEFAULT_EMBEDDING_HOSTS, DEFAULT_BATCH_SIZE, DEFAULT_CONCURRENCY
+)
+from retrieval import CorpusIndex, chunk_text, corpus_fingerprint
+from benchmark import BENCHMARK_MODES, DEFAULT_MEASURED_RUNS, PERCENTILES, SUMMARY_METRICS, build_options
+from benchmark_history import record_run, list_runs, compare_runs, SIGNIFICANCE_LEVEL, MIN_SIGNIFICANT_RUNS
+from capability_probes import get_capabilities, describe, PROBE_LABELS
+from load_test import LoadTest, LOAD_TEST_MODES, DEFAULT_BUCKET_SECONDS, timeseries, summarize_load_test
+from context_profiler import PROFILE_STRATEGIES, run_profile
+
+# The built-in hybrid index needs no external DB; Chroma (and langchain) are only imported when selected
+VECTOR_STORE_OPTIONS = ["NumPy (built-in)", "Chroma"]
+VECTOR_STORE_FOLDER = "vector_store"
 
 def list_local_models():
     response = requests.get(f"{OLLAMA_URL}/tags")
@@ -50,21 +61,30 @@ def update_model_selection(selected_models, key):
     """Callback function to update session state during form submission."""
     st.session_state[key] = selected_models
 
-@st.cache_data  # Cache the comparison and visualization logic
-def run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty):
-    results = performance_test(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty)
+def run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, repetitions=1, warmup=0, mode="isolated", progress_callback=None):
+    # Not cached: every click is a fresh measurement
+    run = performance_test(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, repetitions, warmup, mode, progress_callback)
+    results = last_results(run)
 
     # Prepare data for visualization
     models = list(results.keys())  # Get models from results
-    times = [results[model][1] for model in models]
-    tokens_per_second = [
-        results[model][2] / (results[model][3] / (10**9)) if results[model][2] and results[model][3] else 0
-        for model in models
-    ]
+    times = [run["summary"].get(model, {}).get("total_s_p50") or results[model][1] for model in models]
+    tokens_per_second = [run["summary"].get(model, {}).get("eval_rate_p50") or 0 for model in models]
 
     df = pd.DataFrame({"Model": models, "Time (seconds)": times, "Tokens/second": tokens_per_second})
 
-    return results, df, tokens_per_second, models  # Return models
+    return results, df, tokens_per_second, models, run  # Return models and the full run
+
+def benchmark_summary_table(run):
+    """One row per model with the percentiles of every benchmark metric."""
+    rows = []
+    for model, stats in run["summary"].items():
+        row = {"Model": model, "Runs": stats["runs"]}
+        for metric, label in SUMMARY_METRICS.items():
+            for q in PERCENTILES:
+                row[f"{label} p{q}"] = stats.get(f"{metric}_p{q}")
+        rows.append(row)
+    return pd.DataFrame(rows)
 
 def model_comparison_test():
     st.header("Model Comparison by Response Quality")
@@ -96,23 +116,138 @@ def model_comparison_test():
 
     prompt = st.text_area("Enter the prompt:", value="Write a short story about a brave knight.")
 
+    with st.expander("Benchmark Settings"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mode = st.selectbox("Mode", BENCHMARK_MODES, help="isolated: one model at a time, unloaded afterwards. concurrent: all models at once.")
+        with col2:
+            warmup = st.number_input("Warmup runs", min_value=0, max_value=10, value=1, help="Not measured; absorbs model load time.")
+        with col3:
+            repetitions = st.number_input(
+                "Measured runs", min_value=1, max_value=50, value=DEFAULT_MEASURED_RUNS,
+                help=f"Runs can only be compared for regressions with at least {MIN_SIGNIFICANT_RUNS} measured runs.",
+            )
+
     # Check if the button is clicked
     if st.button(label='Compare Models'):
         if selected_models:
+            progress_bar = st.progress(0)
+            def update_progress(runs_done, total_runs, sample):
+                progress_bar.progress(runs_done / total_runs, text=f"{runs_done}/{total_runs} runs ({sample['model']})")
+
             # Run the comparison and get the results, dataframe, tokens_per_second, and models
-            results, df, tokens_per_second, models = run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty)
+            results, df, tokens_per_second, models, run = run_comparison(selected_models, prompt, temperature, max_tokens, presence_penalty, frequency_penalty, int(repetitions), int(warmup), mode, update_progress)
+            progress_bar.empty()
+            record_run(run)
 
             # Plot the results using st.bar_chart
             st.bar_chart(df, x="Model", y=["Time (seconds)", "Tokens/second"], color=["#4CAF50", "#FFC107"])  # Green and amber
+            st.dataframe(benchmark_summary_table(run), use_container_width=True, hide_index=True)
+            st.caption(f"Run {run['id']} recorded in the benchmark history.")
 
+            capabilities = get_capabilities(models)  # Probed once per model digest, then cached
             for model, (result, elapsed_time, eval_count, eval_duration) in results.items():
                 st.subheader(f"Results for {model} (Time taken: {elapsed_time:.2f} seconds, Tokens/second: {tokens_per_second[models.index(model)]:.2f}):")
                 st.write(result)
-                st.write("JSON Handling Capability: ", "✅" if check_json_handling(model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
-                st.write("Function Calling Capability: ", "✅" if check_function_calling(model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
+                display_capabilities(capabilities.get(model, {}))
         else:
             st.warning("Please select at least one model.")
 
+def benchmark_history_view():
+    st.header("Benchmark History")
+    runs = list_runs()
+    if not runs:
+        st.info("No benchmark runs recorded yet. Runs from 'Model Comparison by Response Quality' are recorded here.")
+        return
+
+    runs_df = pd.DataFrame(runs)[["id", "created_at", "models", "host", "ollama_version", "mode", "repetitions", "warmup", "prompt"]]
+    st.dataframe(runs_df, use_container_width=True, hide_index=True)
+
+    run_ids = [run["id"] for run in runs]
+    col1, col2 = st.columns(2)
+    with col1:
+        baseline_id = st.selectbox("Baseline run", run_ids, index=min(1, len(run_ids) - 1))
+    with col2:
+        candidate_id = st.selectbox("Candidate run", run_ids, index=0)
+
+    repetitions = {run["id"]: run["repetitions"] for run in runs}
+    too_few_runs = min(repetitions[baseline_id] or 0, repetitions[candidate_id] or 0) < MIN_SIGNIFICANT_RUNS
+    if too_few_runs:
+        st.caption(f"Both runs need at least {MIN_SIGNIFICANT_RUNS} measured runs: with fewer, the permutation test can never reach p < {SIGNIFICANCE_LEVEL}.")
+
+    if st.button("Compare Runs", disabled=too_few_runs):
+        rows = compare_runs(baseline_id, candidate_id)
+        if not rows:
+            st.warning("The selected runs have no measured model in common.")
+            return
+        comparison_df = pd.DataFrame(rows)
+        comparison_df["change"] = comparison_df["change"].map(lambda change: f"{change:+.1%}")
+        st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+        st.caption(f"Changes are flagged when the permutation-test p-value is below {SIGNIFICANCE_LEVEL}.")
+
+        regressions = [row for row in rows if row["regression"]]
+        for row in regressions:
+            note = " (model digest changed)" if row["model_changed"] else ""
+            st.error(f"Regression: {row['model']} {row['metric']} {row['baseline_mean']:.3f} → {row['candidate_mean']:.3f} ({row['change']:+.1%}, p={row['p_value']:.3f}){note}")
+        if not regressions:
+            st.success("No statistically significant regressions.")
+
+def load_test_tab():
+    st.header("Load Test")
+    st.write("Drive an Ollama endpoint with many simultaneous requests to see how throughput, latency and queueing behave under load. Use `python stub_ollama.py` to try it without a GPU.")
+
+    base_url = st.text_input("Ollama API URL", value=OLLAMA_URL)
+    available_models = get_available_models()
+    models = st.multiselect("Models to mix", available_models, default=available_models[:1])
+    prompts = st.text_area("Prompts to mix (one per line)", value="Write a haiku about the sea.\nExplain what a hash map is in two sentences.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        mode = st.selectbox("Arrival mode", LOAD_TEST_MODES, format_func=lambda mode: "Closed loop (fixed users)" if mode == "closed" else "Open loop (Poisson arrivals)")
+    with col2:
+        concurrency = st.number_input("Concurrent users", min_value=1, max_value=128, value=8, disabled=mode != "closed")
+    with col3:
+        arrival_rate = st.number_input("Arrivals per second", min_value=0.1, max_value=100.0, value=1.0, step=0.1, disabled=mode != "open")
+    with col4:
+        duration_s = st.number_input("Duration (seconds)", min_value=5, max_value=3600, value=60)
+    max_tokens = st.slider("Max Tokens", min_value=16, max_value=4000, value=256, step=16)
+
+    if st.button("Start Load Test"):
+        if not models or not prompts.strip():
+            st.warning("Please select at least one model and enter at least one prompt.")
+            return
+        test = LoadTest(models, prompts.splitlines(), duration_s, mode, concurrency, arrival_rate, build_options(max_tokens=max_tokens), base_url).start()
+        progress_bar = st.progress(0)
+        charts = st.empty()
+        while test.running:
+            time.sleep(1)
+            elapsed = time.perf_counter() - test.started_at
+            progress_bar.progress(min(1.0, elapsed / duration_s), text=f"{elapsed:.0f}s elapsed, {len(test.samples)} requests completed")
+            display_load_test_charts(charts, test.snapshot())
+        progress_bar.empty()
+        samples = test.wait()
+        display_load_test_charts(charts, samples)
+        st.subheader("Summary")
+        st.json(summarize_load_test(samples, duration_s))
+
+def display_load_test_charts(placeholder, samples):
+    rows = timeseries(samples, DEFAULT_BUCKET_SECONDS)
+    if not rows:
+        return
+    df = pd.DataFrame(rows).set_index("Time (s)")
+    with placeholder.container():
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption("Throughput")
+            st.line_chart(df[["Requests/s", "Tokens/s"]])
+            st.caption("Error rate")
+            st.line_chart(df[["Error rate"]])
+        with col2:
+            st.caption("Latency percentiles (s)")
+            st.line_chart(df[["Latency p50 (s)", "Latency p95 (s)", "Latency p99 (s)"]])
+            st.caption("Queueing delay (s)")
+            st.line_chart(df[["Queueing delay (s)"]])
+
 def vision_comparison_test():
     st.header("Vision Model Comparison")
 
@@ -158,16 +293,17 @@ def vision_comparison_test():
                     start_time = time.time()
                     try:
                         # Use ollama.chat for vision tests
-                        response = ollama.chat(
-                            model=model,
-                            messages=[
-                                {
-                                    'role': 'user',
-                                    'content': 'Describe this image:',
-                                    'images': [uploaded_file]
-                                }
-                            ]
-                        )
+                        with llm_slot(INTERACTIVE):
+                            response = ollama.chat(
+                                model=model,
+                                messages=[
+                                    {
+                                        'role': 'user',
+                                        'content': 'Describe this image:',
+                                        'images': [uploaded_file]
+                                    }
+                                ]
+                            )
                         result = response['message']['content']
                         print(f"Model: {model}, Result: {result}")  # Debug statement
                     except Exception as e:
@@ -218,6 +354,10 @@ def contextual_response_test():
         index=available_models.index(st.session_state.selected_model) if st.session_state.selected_model in available_models else 0
     )
 
+    if st.toggle("Profiler mode", value=False, help="Run a long synthetic conversation and measure how prefill cost grows with each way of sending the history."):
+        context_profile_test(selected_model)
+        return
+
     prompts = st.text_area("Enter the prompts (one per line):", value="Hi, how are you?\nWhat's your name?\nTell me a joke.")
 
     col1, col2, col3, col4 = st.columns(4)
@@ -261,8 +401,67 @@ def contextual_response_test():
         # Plot the results using st.bar_chart
         st.bar_chart(df, x="Prompt", y=["Time (seconds)", "Tokens/second"], color=["#4CAF50", "#FFC107"])  # Green and amber
 
-        st.write("JSON Handling Capability: ", "✅" if check_json_handling(selected_model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
-        st.write("Function Calling Capability: ", "✅" if check_function_calling(selected_model, temperature, max_tokens, presence_penalty, frequency_penalty) else "❌")
+        display_capabilities(get_capabilities([selected_model]).get(selected_model, {}))
+
+def context_profile_test(selected_model):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        turns = st.number_input("Turns", min_value=2, max_value=200, value=20)
+    with col2:
+        words_per_turn = st.number_input("Words per user turn", min_value=5, max_value=1000, value=60, step=5)
+    with col3:
+        max_tokens = st.number_input("Max tokens per answer", min_value=8, max_value=1024, value=48, step=8)
+    strategies = st.multiselect("Strategies", list(PROFILE_STRATEGIES), default=list(PROFILE_STRATEGIES), format_func=PROFILE_STRATEGIES.get)
+    unload_between = st.checkbox("Unload the model between strategies", value=True, help="Keeps one strategy's KV cache from speeding up the next.")
+
+    if st.button("Start Profiling", key="start_context_profile"):
+        if not selected_model or not strategies:
+            st.warning("Please select a model and at least one strategy.")
+            return
+        progress_bar = st.progress(0)
+        completed = []
+
+        def update_progress(strategy, turn, total_turns, row):
+            completed.append(row)
+            progress_bar.progress(len(completed) / (total_turns * len(strategies)), text=f"{PROFILE_STRATEGIES[strategy]}: turn {turn}/{total_turns}")
+
+        profile = run_profile(selected_model, turns, words_per_turn, strategies, max_tokens, unload_between=unload_between, progress_callback=update_progress)
+        progress_bar.empty()
+
+        df = pd.DataFrame(profile["rows"])
+        errors = df[df["error"].notna()]
+        if not errors.empty:
+            st.warning(f"{len(errors)} turns failed, e.g. {errors['error'].iloc[0]}")
+        ok = df[df["error"].isna()]
+        if ok.empty:
+            return
+        st.subheader("Prefill time per turn (s)")
+        st.line_chart(ok.pivot_table(index="conversation_tokens", columns="strategy", values="prefill_s"))
+        st.subheader("Time to first token per turn (s)")
+        st.line_chart(ok.pivot_table(index="turn", columns="strategy", values="ttft_s"))
+
+        summary_rows = []
+        for strategy, stats in profile["summary"].items():
+            fit = stats["fit"]
+            coefficients = (fit["coefficients"] + [0.0, 0.0, 0.0])[:3] if fit else [None] * 3
+            summary_rows.append({
+                "Strategy": PROFILE_STRATEGIES[strategy],
+                "Total (s)": stats["total_s"],
+                "Prefill (s)": stats["prefill_s"],
+                "Prompt tokens evaluated": stats["prompt_tokens"],
+                "Last TTFT (s)": stats["last_ttft_s"],
+                "Fixed (s)": coefficients[0],
+                "Per token (ms)": coefficients[1] * 1000 if coefficients[1] is not None else None,
+                "Per token² (µs)": coefficients[2] * 1e6 if coefficients[2] is not None else None,
+                "Fit R²": fit["r2"] if fit else None,
+                "Errors": stats["errors"],
+            })
+        st.subheader("Prefill cost curve (prefill ≈ fixed + a·n + b·n², n = conversation tokens)")
+        st.dataframe(pd.DataFrame(summary_rows), hide_index=True)
+        if profile["recommended"]:
+            st.success(f"Fastest for this model: {PROFILE_STRATEGIES[profile['recommended']]}")
+        with st.expander("Per-turn measurements"):
+            st.dataframe(df, hide_index=True)
 
 def feature_test():
     st.header("Model Feature Test")
@@ -288,30 +487,26 @@ def feature_test():
         index=available_models.index(st.session_state.selected_model) if st.session_state.selected_model in available_models else 0
     )
 
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        temperature = st.slider("Temperature", min_value=0.0, max_value=1.0, value=0.5, step=0.1)
-    with col2:
-        max_tokens = st.slider("Max Tokens", min_value=100, max_value=32000, value=4000, step=100)
-    with col3:
-        presence_penalty = st.slider("Presence Penalty", min_value=-2.0, max_value=2.0, value=0.0, step=0.1)
-    with col4:
-        frequency_penalty = st.slider("Frequency Penalty", min_value=-2.0, max_value=2.0, value=0.0, step=0.1)
+    st.caption("Probes run at temperature 0 with short answers, once per model version; results are cached by model digest.")
+    reprobe = st.checkbox("Re-run probes even if this model version was already probed", value=False)
 
     if st.button("Run Feature Test", key="run_feature_test"):
-        json_result = check_json_handling(selected_model, temperature, max_tokens, presence_penalty, frequency_penalty)
-        function_result = check_function_calling(selected_model, temperature, max_tokens, presence_penalty, frequency_penalty)
-
-        st.markdown(f"### JSON Handling Capability: {'✅ Success!' if json_result else '❌ Failure!'}")
-        st.markdown(f"### Function Calling Capability: {'✅ Success!' if function_result else '❌ Failure!'}")
+        capabilities = get_capabilities([selected_model], force=reprobe).get(selected_model, {})
+        for name, result in capabilities.items():
+            st.markdown(f"### {PROBE_LABELS[name]}: {describe(result)}")
 
         # Prepare data for visualization
-        data = {"Feature": ['JSON Handling', 'Function Calling'], "Result": [json_result, function_result]}
+        features = [name for name in capabilities if name != "context_length"]
+        data = {"Feature": [PROBE_LABELS[name] for name in features], "Result": [capabilities[name]["passed"] for name in features]}
         df = pd.DataFrame(data)
 
         # Plot the results using st.bar_chart
         st.bar_chart(df, x="Feature", y="Result", color="#4CAF50")
 
+def display_capabilities(capabilities):
+    for name, result in capabilities.items():
+        st.write(f"{PROBE_LABELS[name]} Capability: ", describe(result))
+
 def list_models():
     st.header("List Local Models")
     models = list_local_models()
@@ -501,6 +696,19 @@ def chat_interface():
             with col4:
                 frequency_penalty = st.slider("🔁 Frequency Penalty", min_value=-2.0, max_value=2.0, value=0.0, step=0.1, key="frequency_penalty_slider_chat")
 
+            # Corpus embedding settings
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.text_input("🧬 Embedding Model", value=DEFAULT_EMBEDDING_MODEL, key="embedding_model")
+            with col2:
+                st.text_input("🖥️ Embedding Hosts (comma-separated)", value=",".join(DEFAULT_EMBEDDING_HOSTS), key="embedding_hosts")
+            with col3:
+                st.slider("📦 Embedding Batch Size", min_value=1, max_value=256, value=DEFAULT_BATCH_SIZE, step=1, key="embedding_batch_size")
+            with col4:
+                st.slider("🔀 Concurrent Batches per Host", min_value=1, max_value=16, value=DEFAULT_CONCURRENCY, step=1, key="embedding_concurrency")
+
+            st.selectbox("🗄️ Vector Store:", VECTOR_STORE_OPTIONS, key="vector_store_backend")
+
         # Display chat history
         for message in st.session_state.chat_history:
             with st.chat_message(message["role"]):
@@ -539,9 +747,10 @@ def chat_interface():
                 else:
                     final_prompt = f"{combined_prompt}{chat_history}\n\nUser: {prompt}"
 
-                for response_chunk in ollama.generate(st.session_state.selected_model, final_prompt, stream=True):
-                    full_response += response_chunk["response"]
-                    response_placeholder.markdown(full_response)
+                with llm_slot(INTERACTIVE):
+                    for response_chunk in ollama.generate(st.session_state.selected_model, final_prompt, stream=True):
+                        full_response += response_chunk["response"]
+                        response_placeholder.markdown(full_response)
                 st.session_state.chat_history.append({"role": "assistant", "content": full_response})
 
             # Automatically detect and save code to workspace
@@ -654,7 +863,7 @@ def files_tab():
         if st.session_state.get(f"delete_{file}", False):
             os.remove(file_path)
             st.success(f"File {file} deleted.")
-            st.experimental_rerun()
+            st.rerun()
     
 
    # File upload section
@@ -664,7 +873,7 @@ def files_tab():
         with open(file_path, "wb") as f:
             f.write(uploaded_file.getbuffer())
         st.success(f"File {uploaded_file.name} uploaded successfully!")
-        st.experimental_rerun()
+        st.rerun()
 
     # Save chat and workspace (existing code)
     if st.button("Save Chat and Workspace"):
@@ -737,8 +946,26 @@ def extract_code_blocks(text):
     # Remove the backticks
     return [block.strip('`').strip() for block in code_blocks]
 
+class PipelineEmbeddings:
+    """Langchain-compatible embeddings backed by the batched, checkpointed EmbeddingPipeline."""
+
+    def __init__(self, pipeline, progress_callback=None):
+        self.pipeline = pipeline
+        self.progress_callback = progress_callback
+
+    def embed_documents(self, texts):
+        self.pipeline.checkpoint_path = checkpoint_path_for(texts, self.pipeline.model)
+        return self.pipeline.embed(texts, progress_callback=self.progress_callback)
+
+    def embed_query(self, text):
+        return self.pipeline.embed_query(text)
+
+@st.cache_resource  # Keep each corpus index (BM25 postings and vector memmap) loaded across reruns
+def load_corpus_index(index_directory):
+    return CorpusIndex(index_directory)  # Shared by all sessions; each passes its own pipeline to add() and search()
+
 def get_corpus_context(corpus_file, query):
-    # Load and split the corpus file
+    # Load the corpus file
     files_folder = "files"
     if not os.path.exists(files_folder):
         os.makedirs(files_folder)
@@ -748,31 +975,60 @@ def get_corpus_context(corpus_file, query):
     except UnicodeDecodeError:
         return "Error: Unable to decode the corpus file. Please ensure it's a text file."
 
-    # Add progress bar for reading the corpus
-    st.info(f"Reading corpus file: {corpus_file}")
-    progress_bar = st.progress(0)
-    total_chars = len(corpus_text)
-    chars_processed = 0
+    pipeline = EmbeddingPipeline(
+        hosts=st.session_state.get("embedding_hosts", DEFAULT_EMBEDDING_HOSTS),
+        model=st.session_state.get("embedding_model", DEFAULT_EMBEDDING_MODEL),
+        batch_size=st.session_state.get("embedding_batch_size", DEFAULT_BATCH_SIZE),
+        concurrency=st.session_state.get("embedding_concurrency", DEFAULT_CONCURRENCY),
+    )
+    use_chroma = st.session_state.get("vector_store_backend", VECTOR_STORE_OPTIONS[0]) == "Chroma"
+
+    # The hybrid index is built once per corpus version; later queries only load it
+    store_name = re.sub(r"[^A-Za-z0-9_.-]", "_", corpus_file)
+    index_directory = os.path.join(VECTOR_STORE_FOLDER, f"{store_name}_{corpus_fingerprint(corpus_text, pipeline.model)}")
+    corpus_index = None if use_chroma else load_corpus_index(index_directory)
 
-    text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
     texts = []
-    for chunk in text_splitter.split_text(corpus_text):
-        texts.append(chunk)
-        chars_processed += len(chunk)
-        progress = chars_processed / total_chars
-        progress_bar.progress(progress)
+    if use_chroma or not len(corpus_index):  # Checked again under the index's build lock, see CorpusIndex.build_once
+        st.info(f"Reading corpus file: {corpus_file}")
+        chunks = chunk_text(corpus_text)
+        texts = [chunk["text"] for chunk in chunks]
+
+        # Embed the chunks in batches across the configured hosts, resuming from any checkpoint
+        st.info("Creating vector database...")
+        embedding_progress = st.progress(0)
+        embedding_status = st.empty()
+
+        def update_embedding_progress(chunks_done, total_chunks, stats):
+            embedding_progress.progress(chunks_done / total_chunks if total_chunks else 1.0)
+            embedding_status.text(
+                f"Embedded {chunks_done}/{total_chunks} chunks ({stats['resumed_chunks']} from checkpoint) - "
+                f"{stats['chunks_per_second']:.1f} chunks/s, {stats['tokens_per_second']:.1f} tokens/s"
+            )
+
+        pipeline.checkpoint_path = checkpoint_path_for(texts, pipeline.model)
+        if corpus_index is not None:
+            corpus_index.build_once(chunks, progress_callback=update_embedding_progress, pipeline=pipeline)
+
+    st.info("Performing similarity search...")
+    if use_chroma:
+        results = chroma_similarity_search(texts, query, pipeline, update_embedding_progress)
+    else:
+        results = [result["text"] for result in corpus_index.search(query, k=3, pipeline=pipeline)]
+    st.info("Done!")
+    return "\n".join(results)
+
+def chroma_similarity_search(texts, query, pipeline, progress_callback, k=3):
+    from langchain_community.vectorstores import Chroma # Updated import
+    from langchain.docstore.document import Document
 
     # Create Langchain documents
     docs = [Document(page_content=t) for t in texts]
 
     # Create and load the vector database
-    st.info("Creating vector database...")
-    embeddings = OllamaEmbeddings()
+    embeddings = PipelineEmbeddings(pipeline, progress_callback=progress_callback)
     db = Chroma.from_documents(docs, embeddings, persist_directory="./chroma_db")
     db.persist()
 
     # Perform similarity search
-    st.info("Performing similarity search...")
-    results = db.similarity_search(query, k=3)
-    st.info("Done!")
-    return "\n".join([doc.page_content for doc in results])
\ No newline at end of file
+    return [doc.page_content for doc in db.similarity_search(query, k=k)]
\ No newline at end of file
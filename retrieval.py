@@ -0,0 +1,315 @@
+# TeamForgeAI/retrieval.py
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+
+from vector_store import NumpyVectorStore
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHUNK_OVERLAP = 200
+BM25_K1 = 1.5
+BM25_B = 0.75
+CANDIDATE_POOL = 20  # Candidates taken from each retriever before fusion and reranking
+RERANK_WEIGHT = 0.3
+BM25_FILE = "bm25.json"
+BM25_JOURNAL_FILE = "bm25.journal.jsonl"  # Documents added since bm25.json was last written, one per line
+BM25_COMPACT_EVERY = 500  # Journaled documents after which bm25.json is rewritten
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+HEADING_PATTERN = re.compile(r"^(#{1,6}\s+.+|[^\n]{1,80}\n[=-]{3,})$")  # Markdown ATX and underlined (setext) headings
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+LEXICAL_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its of on or she that the their them they this to was were will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lowercases and splits text into alphanumeric terms, dropping very common words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in LEXICAL_STOPWORDS]
+
+
+def chunk_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_CHUNK_OVERLAP) -> list:
+    """
+    Splits text into overlapping chunks that follow the document structure.
+
+    Paragraphs are kept whole where possible, long paragraphs are split on sentence
+    boundaries, and every chunk remembers the most recent heading above it.
+
+    :param text: The text to split.
+    :param chunk_size: The target maximum chunk length in characters.
+    :param overlap: How many trailing characters of a chunk are repeated at the start of the next one.
+    :return: A list of {"text": ..., "heading": ...} dictionaries.
+    """
+    units = []  # (heading, piece) pairs, each piece no longer than chunk_size
+    heading = ""
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if HEADING_PATTERN.match(block):
+            heading = block.splitlines()[0].lstrip("#").strip()
+            continue
+        if len(block) <= chunk_size:
+            units.append((heading, block))
+            continue
+        for sentence in SENTENCE_PATTERN.split(block):
+            while len(sentence) > chunk_size:  # A run-on "sentence" with no punctuation
+                units.append((heading, sentence[:chunk_size]))
+                sentence = sentence[chunk_size:]
+            if sentence:
+                units.append((heading, sentence))
+
+    chunks = []
+    current, current_heading = [], ""
+    for unit_heading, piece in units:
+        length = sum(len(part) + 1 for part in current)
+        if current and (length + len(piece) > chunk_size or unit_heading != current_heading):
+            chunks.append({"text": "\n".join(current), "heading": current_heading})
+            # Carry the tail of the previous chunk forward, unless a new section starts
+            carried = []
+            if unit_heading == current_heading:
+                for part in reversed(current):
+                    if sum(len(p) + 1 for p in carried) + len(part) > overlap:
+                        break
+                    carried.insert(0, part)
+            current = carried
+        current.append(piece)
+        current_heading = unit_heading
+    if current:
+        chunks.append({"text": "\n".join(current), "heading": current_heading})
+    return chunks
+
+
+class BM25Index:
+    """An inverted index with BM25 scoring that only touches the postings of the query terms."""
+
+    def __init__(self, postings: dict = None, doc_lengths: list = None):
+        self.postings = postings or {}  # term -> [[doc_id, term_frequency], ...]
+        self.doc_lengths = doc_lengths or []
+        self.total_length = sum(self.doc_lengths)
+
+    def add(self, tokens: list) -> int:
+        """Indexes one document and returns its id."""
+        doc_id = len(self.doc_lengths)
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, []).append([doc_id, frequency])
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        return doc_id
+
+    def search(self, query_tokens: list, k: int = CANDIDATE_POOL) -> list:
+        """Returns up to k (score, doc_id) pairs, best first."""
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return []
+        average_length = self.total_length / doc_count or 1.0
+        scores = {}
+        for term in set(query_tokens):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings:
+                norm = frequency + BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (BM25_K1 + 1) / norm
+        return sorted(((score, doc_id) for doc_id, score in scores.items()), reverse=True)[:k]
+
+    def save(self, path: str) -> None:
+        """Writes the index to a JSON file."""
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump({"postings": self.postings, "doc_lengths": self.doc_lengths}, file)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Reads an index written by save(), or returns an empty index if the file is missing."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        return cls(data["postings"], data["doc_lengths"])
+
+
+def rerank_score(query_tokens: list, text: str) -> float:
+    """
+    A cheap local relevance score in [0, 1] based on query-term coverage and proximity.
+
+    :param query_tokens: The tokenized query.
+    :param text: The candidate passage.
+    :return: Coverage of the distinct query terms, boosted when they occur close together.
+    """
+    query_terms = set(query_tokens)
+    if not query_terms:
+        return 0.0
+    tokens = tokenize(text)
+    positions = [(position, token) for position, token in enumerate(tokens) if token in query_terms]
+    found = {token for _, token in positions}
+    coverage = len(found) / len(query_terms)
+    if len(found) < 2:
+        return coverage * 0.5
+
+    # Smallest window of passage tokens that contains every matched query term
+    best_window = len(tokens)
+    counts = {}
+    left = 0
+    for right in range(len(positions)):
+        counts[positions[right][1]] = counts.get(positions[right][1], 0) + 1
+        while len(counts) == len(found):
+            best_window = min(best_window, positions[right][0] - positions[left][0] + 1)
+            left_token = positions[left][1]
+            counts[left_token] -= 1
+            if not counts[left_token]:
+                del counts[left_token]
+            left += 1
+    proximity = len(found) / best_window
+    return coverage * (0.5 + 0.5 * proximity)
+
+
+def min_max(scores: dict) -> dict:
+    """Scales a {key: score} mapping into [0, 1]."""
+    if not scores:
+        return {}
+    low, high = min(scores.values()), max(scores.values())
+    if high == low:
+        return {key: 1.0 for key in scores}
+    return {key: (score - low) / (high - low) for key, score in scores.items()}
+
+
+class CorpusIndex:
+    """A persisted hybrid index: BM25 postings plus a NumpyVectorStore holding the same chunks in the same order."""
+
+    def __init__(self, directory: str, pipeline=None):
+        self.directory = directory
+        self.pipeline = pipeline
+        self.store = NumpyVectorStore(os.path.join(directory, "vectors"))
+        self.bm25 = BM25Index.load(os.path.join(directory, BM25_FILE))
+        self._journaled = self._replay_journal()
+        self._lock = threading.Lock()  # Guards the BM25 postings and the vector store
+        self._build_lock = threading.Lock()  # Held for a whole build_once(), embedding included
+
+    def __len__(self) -> int:
+        return min(len(self.store), len(self.bm25.doc_lengths))
+
+    def add(self, chunks: list, progress_callback=None, pipeline=None) -> None:
+        """
+        Embeds and indexes chunks on both the lexical and the vector side.
+
+        :param chunks: Dictionaries with at least a "text" key; every key is kept as metadata.
+        :param progress_callback: Optional embedding progress callable, see EmbeddingPipeline.embed.
+        :param pipeline: The EmbeddingPipeline to use instead of the index's own, e.g. one per session
+            when the index is shared.
+        """
+        chunks = [chunk for chunk in chunks if chunk.get("text", "").strip()]
+        if not chunks:
+            return
+        vectors = (pipeline or self.pipeline).embed([self._indexed_text(chunk) for chunk in chunks], progress_callback=progress_callback)
+        with self._lock:
+            self.store.add(vectors, chunks)
+            lines = []
+            for chunk in chunks:
+                tokens = tokenize(self._indexed_text(chunk))
+                lines.append(json.dumps({"doc": self.bm25.add(tokens), "tokens": tokens}) + "\n")
+            self._journaled += len(lines)
+            if self._journaled >= BM25_COMPACT_EVERY:
+                self._compact()
+            else:
+                with open(os.path.join(self.directory, BM25_JOURNAL_FILE), "a", encoding="utf-8") as file:
+                    file.writelines(lines)
+
+    def build_once(self, chunks: list, progress_callback=None, pipeline=None) -> bool:
+        """
+        Builds the index from chunks unless it already holds documents; concurrent callers build it once.
+
+        :return: Whether this call built the index.
+        """
+        with self._build_lock:
+            if len(self):  # Checked again under the lock: another session may have built it meanwhile
+                return False
+            self.reset()
+            self.add(chunks, progress_callback=progress_callback, pipeline=pipeline)
+            return True
+
+    def reset(self) -> None:
+        """Empties both sides of the index."""
+        with self._lock:
+            self.store.reset()
+            self.bm25 = BM25Index()
+            self._compact()
+
+    def _compact(self) -> None:
+        """Writes the whole BM25 index to bm25.json and starts an empty journal."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.bm25.save(os.path.join(self.directory, BM25_FILE))
+        journal = os.path.join(self.directory, BM25_JOURNAL_FILE)
+        if os.path.exists(journal):
+            os.remove(journal)
+        self._journaled = 0
+
+    def _replay_journal(self) -> int:
+        """Adds the journaled documents that bm25.json does not hold yet; returns how many the journal has."""
+        journal = os.path.join(self.directory, BM25_JOURNAL_FILE)
+        if not os.path.exists(journal):
+            return 0
+        count = 0
+        with open(journal, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # A line cut short by a crash
+                count += 1
+                if record["doc"] == len(self.bm25.doc_lengths):  # Skips documents a compaction already saved
+                    self.bm25.add(record["tokens"])
+        return count
+
+    def search(self, query: str, k: int = 3, vector_weight: float = 0.5, pipeline=None) -> list:
+        """
+        Retrieves chunks with fused BM25 and vector scores, then reranks the fused pool locally.
+
+        :param query: The user's query.
+        :param k: The number of chunks to return.
+        :param vector_weight: The weight of the vector score in the fusion (BM25 gets the rest).
+        :param pipeline: The EmbeddingPipeline that embeds the query instead of the index's own.
+        :return: A list of chunk metadata dictionaries with an added "score", best first.
+        """
+        if not len(self):
+            return []
+        query_tokens = tokenize(query)
+        query_vector = (pipeline or self.pipeline).embed_query(query)  # Outside the lock: an HTTP call
+        with self._lock:
+            lexical = {doc_id: score for score, doc_id in self.bm25.search(query_tokens, CANDIDATE_POOL)}
+            semantic = {row: score for score, row in self.store.search_rows(query_vector, CANDIDATE_POOL)}
+            records = {doc_id: self.store.metadata[doc_id] for doc_id in set(lexical) | set(semantic)}
+        lexical, semantic = min_max(lexical), min_max(semantic)
+
+        fused = {}
+        for doc_id in set(lexical) | set(semantic):
+            fused[doc_id] = (1 - vector_weight) * lexical.get(doc_id, 0.0) + vector_weight * semantic.get(doc_id, 0.0)
+        pool = sorted(fused, key=fused.get, reverse=True)[:CANDIDATE_POOL]
+
+        results = []
+        for doc_id in pool:
+            record = records[doc_id]
+            score = (1 - RERANK_WEIGHT) * fused[doc_id] + RERANK_WEIGHT * rerank_score(query_tokens, self._indexed_text(record))
+            results.append(dict(record, score=score))
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:k]
+
+    @staticmethod
+    def _indexed_text(chunk: dict) -> str:
+        """The text that is embedded and indexed: the chunk prefixed with its section heading."""
+        heading = chunk.get("heading")
+        return f"{heading}\n{chunk['text']}" if heading else chunk["text"]
+
+
+def corpus_fingerprint(corpus_text: str, model: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_CHUNK_OVERLAP) -> str:
+    """Identifies one version of a corpus together with the settings its index was built with."""
+    digest = hashlib.sha256(f"{model}\0{chunk_size}\0{overlap}\0".encode("utf-8"))
+    digest.update(corpus_text.encode("utf-8"))
+    return digest.hexdigest()[:16]
@@ -1,10 +1,14 @@
 # TeamForgeAI/skills/fetch_web_content.py
 import requests
-from bs4 import BeautifulSoup
 from typing import Optional, List
 import re
 import streamlit as st
 
+from team_memory import remember_document
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+
 def fetch_web_content(query: str = "", discussion_history: str = "") -> Optional[str]:
     """
     Fetch the content of a webpage and return it as a string.
@@ -29,6 +33,8 @@ def fetch_web_content(query: str = "", discussion_history: str = "") -> Optional
     if not urls_to_fetch:
         return "Error: No URLs found to fetch content from."
 
+    from bs4 import BeautifulSoup  # Imported on first fetch rather than with every skill
+
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
@@ -44,15 +50,16 @@ def fetch_web_content(query: str = "", discussion_history: str = "") -> Optional
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
             content = soup.get_text()
+            remember_document(url, content, kind="web_page")  # Index the page once for the whole team
             all_contents.append(f"Content from {url}:\n\n{content}\n\n---\n\n")
         except requests.exceptions.Timeout:
-            print(f"Error: The request timed out for URL: {url}")
+            logger.warning("The request timed out for URL: %s", url)
             all_contents.append(f"Error: Could not fetch content from {url} due to timeout.\n\n")
         except requests.exceptions.TooManyRedirects:
-            print(f"Error: Too many redirects for URL: {url}")
+            logger.warning("Too many redirects for URL: %s", url)
             all_contents.append(f"Error: Could not fetch content from {url} due to too many redirects.\n\n")
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching the webpage content for URL {url}: {e}")
+            logger.warning("Error fetching the webpage content for URL %s: %s", url, e)
             all_contents.append(f"Error: Could not fetch content from {url} due to an error: {e}\n\n")
 
     return "".join(all_contents)
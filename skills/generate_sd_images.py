@@ -4,13 +4,16 @@ import json
 import requests
 import io
 import base64
-from PIL import Image
 from pathlib import Path
 import uuid
 import os
 import re
 import streamlit as st
 
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
+
 # Format: protocol://server:port
 base_url = "http://0.0.0.0:7860"
 
@@ -25,6 +28,8 @@ def generate_sd_images(discussion_history: str, image_size: str = "512x512", tea
     :param team_name: The name of the team to associate the image with.
     :return: A list of paths to the generated images.
     """
+    from PIL import Image  # Imported once images are actually generated
+
     parts = image_size.split("x")
     image_width = int(parts[0])
     image_height = int(parts[1])
@@ -68,18 +73,18 @@ def generate_sd_images(discussion_history: str, image_size: str = "512x512", tea
                         file_path = Path(file_name)
                         os.makedirs(os.path.dirname(file_path), exist_ok=True)
                         image.save(file_path)
-                        print(f"Image saved to {file_path}")
+                        logger.info("Image saved to %s", file_path)
                         generated_image_paths.append(file_name) # Add the image path to the list
 
                     used_prompts.append(scene)
                     st.session_state["used_image_prompts"] = used_prompts
                 else:
-                    print(f"Failed to download the image from {api_url}")
+                    logger.error("Failed to download the image from %s", api_url)
             else:
-                print(f"Skipping already generated image for prompt: {scene}")
+                logger.debug("Skipping already generated image for prompt: %s", preview(scene))
         return generated_image_paths # Return the list of image paths
     else:
-        print("I'm ready to create images! Please provide a list of image descriptions using the format: ![Image Request](description of image) or Images: description")
+        logger.info("No image requests found; expected ![Image Request](description of image) or Images: description")
         return [] # Return an empty list if no scenes are found
 
 def find_all_scenes(discussion_history: str) -> List[str]:
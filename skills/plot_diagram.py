@@ -1,6 +1,5 @@
 # TeamForgeAI/skills/plot_diagram.py
 import streamlit as st
-import pandas as pd
 import re
 from typing import Optional, List, Dict
 import json
@@ -1,23 +1,25 @@
 # TeamForgeAI/skills/web_search.py
 import re
 import time
-import logging
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from typing import List, Tuple
+from typing import List, Tuple, TYPE_CHECKING
 import streamlit as st
 import requests
-from bs4 import BeautifulSoup
 from ollama_llm import OllamaLLM
-from autogen.agentchat.contrib.capabilities.teachability import Teachability
+from llm_scheduler import BACKGROUND
+from team_memory import remember_document
+from keywords import build_query
+from log_utils import get_logger, preview
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+if TYPE_CHECKING:
+    from autogen.agentchat.contrib.capabilities.teachability import Teachability
+
+logger = get_logger(__name__)
 
 MAX_AGENTS = 3  # Limit the number of agents performing searches
 MAX_SEARCH_RESULTS = 3  # Limit the number of search results per agent
 MAX_RETRIES = 3  # Maximum number of retries for server errors
 REQUEST_TIMEOUT = 10  # Timeout for web requests
+MAX_QUERY_TERMS = 16  # Words of a refined query; the search query itself comes first, then the agent and its memories
 
 def web_search(query: str, discussion_history: str = "", agents_data: list = None, teachability=None) -> str:
     """
@@ -33,77 +35,81 @@ def web_search(query: str, discussion_history: str = "", agents_data: list = Non
         str: A synthesized summary of the search results, or an error message if an error occurs.
     """
     try:
-        logging.info(f"Starting web search for query: {query}")
+        logger.info("Starting web search for query: %s", preview(query))
 
         # 1. Query Understanding (already handled by the input)
 
         # 2. Web Crawling and Information Gathering
-        logging.info("Gathering search results...")
+        logger.debug("Gathering search results...")
         search_results = gather_search_results(query, discussion_history, agents_data, teachability)
-        logging.info(f"Gathered {len(search_results)} search results.")
+        logger.info("Gathered %d search results.", len(search_results))
 
         # 3. Information Processing and Synthesis
-        logging.info("Synthesizing search results...")
+        logger.debug("Synthesizing search results...")
         synthesized_summary = synthesize_search_results(search_results, discussion_history, teachability)
-        logging.info("Search results synthesized.")
+        logger.debug("Search results synthesized.")
 
         # 4. Result Generation
-        logging.info("Web search completed.")
+        logger.info("Web search completed.")
         return synthesized_summary
     except Exception as e:
-        logging.error(f"Error during web search: {e}")
+        logger.exception("Error during web search: %s", e)
         return f"Error during web search: {e}"
 
-def gather_search_results(query: str, discussion_history: str, agents_data: list, teachability: Teachability) -> List[Tuple[str, str, str, str, str]]:
+def gather_search_results(query: str, discussion_history: str, agents_data: list, teachability: "Teachability") -> List[Tuple[str, str, str, str, str]]:
     """Gathers search results from the Google Custom Search API for each agent."""
+    # The Google API client is slow to import and only needed once a search runs
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
     search_results = []
     for i, agent in enumerate(agents_data[:MAX_AGENTS]):  # Limit the number of agents performing searches
-        logging.info(f"Gathering search results for agent {i+1}: {agent['config']['name']}")
+        logger.debug("Gathering search results for agent %d: %s", i + 1, agent["config"]["name"])
         # Refine query using context from Teachability
         refined_query = refine_query_with_teachability(query, teachability, agent)
-        logging.info(f"Refined query: {refined_query}")
+        logger.debug("Refined query: %s", preview(refined_query))
         service = build("customsearch", "v1", developerKey=st.session_state.google_api_key)
         for attempt in range(MAX_RETRIES):
             try:
                 res = service.cse().list(q=refined_query, cx=st.session_state.search_engine_id, num=MAX_SEARCH_RESULTS).execute()  # Limit the number of search results per agent
-                logging.info(f"Google Search API response: {res}")
+                logger.debug("Google Search API response: %s", preview(res))
                 for item in res.get('items', []):
                     title = item.get('title')
                     link = item.get('link')
                     snippet = item.get('snippet')
-                    logging.info(f"Fetching content from: {link}")
                     content = fetch_and_clean_content(link)
+                    if content:
+                        remember_document(link, content, kind="web_page")  # Index the page once for the whole team
                     if title and link and snippet and content:
                         search_results.append((agent['config']['name'], title, link, snippet, content))
                 break  # Exit the retry loop if successful
             except HttpError as e:
                 if e.resp.status in [500, 503] and attempt < MAX_RETRIES - 1:
-                    logging.warning(f"Retrying due to server error ({e.resp.status}): {e.content}")
+                    logger.warning("Retrying due to server error (%s): %s", e.resp.status, preview(e.content))
                     time.sleep(2 ** attempt)  # Exponential backoff
                     continue
                 else:
-                    logging.error(f"Error during Google Search: {e}")
+                    logger.error("Error during Google Search: %s", e)
                     break # Break on any other error or after max retries
             except Exception as e:
-                logging.error(f"Unexpected error: {e}")
+                logger.exception("Unexpected error: %s", e)
                 break
     return search_results
 
-def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str]], discussion_history: str, teachability: Teachability) -> str:
+def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str]], discussion_history: str, teachability: "Teachability") -> str:
     """Synthesizes the search results using an MoA approach."""
     # Proposer Layer: Each agent summarizes its own search results
     proposer_outputs = []
     for i, (agent_name, title, link, snippet, content) in enumerate(search_results):
-        logging.info(f"Synthesizing result {i+1} for agent: {agent_name}")
+        logger.debug("Synthesizing result %d for agent: %s", i + 1, agent_name)
         proposer_prompt = f"""You are {agent_name}. You have been asked to research the following query: '{title}'. Here is a summary of a web search result: {snippet}\n\n{content}\n\nBased on this information, provide a concise summary of your findings."""
-        logging.info(f"Proposer prompt: {proposer_prompt}")
-        ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4)
+        logger.debug("Proposer prompt: %s", preview(proposer_prompt))
+        ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4, priority=BACKGROUND)
         summary = ollama_llm.generate_text(proposer_prompt)
-        logging.info(f"Proposer summary: {summary}")
+        logger.debug("Proposer summary: %s", preview(summary))
         proposer_outputs.append((agent_name, summary, link)) # Include link for sources
 
     # Aggregator Layer: Combine the summaries from the proposers
-    memories = teachability.get_memories(k=5) if isinstance(teachability, Teachability) else []
+    memories = teachability.get_memories(k=5) if hasattr(teachability, "get_memories") else []
     memory_content = " ".join([m['content'] for m in memories])
     aggregator_prompt = f"""You are the Editor. You have been provided with summaries from different agents on a research topic. Your task is to synthesize these summaries into a single, coherent report, considering the conversation history.
 
@@ -116,10 +122,10 @@ def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str
     Agent Summaries:
     {chr(10).join([f'- {agent_name}: {summary}' for agent_name, summary, _ in proposer_outputs])}
     """
-    logging.info(f"Aggregator prompt: {aggregator_prompt}")
-    ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4)
+    logger.debug("Aggregator prompt: %s", preview(aggregator_prompt))
+    ollama_llm = OllamaLLM(model="mistral:instruct", temperature=0.4, priority=BACKGROUND)
     synthesized_summary = ollama_llm.generate_text(aggregator_prompt)
-    logging.info(f"Synthesized summary: {synthesized_summary}")
+    logger.debug("Synthesized summary: %s", preview(synthesized_summary))
 
     # Add Sources section
     sources = "\n\n## Sources:\n" + chr(10).join([f"- [{title}]({link})" for _, title, link, _, _ in search_results])
@@ -127,11 +133,11 @@ def synthesize_search_results(search_results: List[Tuple[str, str, str, str, str
 
     return synthesized_summary
 
-def refine_query_with_teachability(query: str, teachability: Teachability, agent: dict) -> str:
+def refine_query_with_teachability(query: str, teachability: "Teachability", agent: dict) -> str:
     """Refines the search query using context from the agent's memory."""
-    memories = teachability.get_memories(k=5) if isinstance(teachability, Teachability) else []
-    relevant_info = " ".join([m['content'] for m in memories])
-    refined_query = f"{query} {agent['description']} {relevant_info}"
+    memories = teachability.get_memories(k=5, query=query) if hasattr(teachability, "get_memories") else []
+    relevant_info = "\n".join([m['content'] for m in memories])
+    refined_query = build_query(query, agent['description'], relevant_info, max_terms=MAX_QUERY_TERMS)
     return refined_query
 
 def search_result_already_returned(title: str, link: str, snippet: str, discussion_history: str) -> bool:
@@ -141,14 +147,15 @@ def search_result_already_returned(title: str, link: str, snippet: str, discussi
 
 def fetch_and_clean_content(url: str) -> str:
     """Fetches content from a given URL and cleans it using BeautifulSoup."""
+    from bs4 import BeautifulSoup
     try:
-        logging.info(f"Fetching content from: {url}")
+        logger.debug("Fetching content from: %s", url)
         response = requests.get(url, timeout=REQUEST_TIMEOUT) # Add timeout to requests.get
         response.raise_for_status()
 
         # Check if the response is a text file
         if 'text/plain' in response.headers.get('Content-Type', ''):
-            logging.info(f"Content is plain text.")
+            logger.debug("Content is plain text.")
             return response.text.strip() # Return raw text content
 
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -160,8 +167,8 @@ def fetch_and_clean_content(url: str) -> str:
         # Get text content and clean it
         text = soup.get_text()
         text = re.sub(r'\s+', ' ', text).strip()
-        logging.info(f"Content fetched and cleaned.")
+        logger.debug("Content fetched and cleaned.")
         return text
     except Exception as e:
-        logging.error(f"Error fetching or cleaning content from {url}: {e}")
+        logger.warning("Error fetching or cleaning content from %s: %s", url, e)
         return ""
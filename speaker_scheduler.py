@@ -0,0 +1,76 @@
+# TeamForgeAI/speaker_scheduler.py
+STAGE_ORDER = {"proposer": 0, "aggregator": 1}  # Proposers speak before the aggregators that build on them
+
+
+def agent_model(agent) -> str:
+    return agent.ollama_llm.model
+
+
+def agent_stage(agent) -> int:
+    return STAGE_ORDER.get(getattr(agent, "moa_role", None), 0)
+
+
+def count_model_swaps(models: list, loaded_model: str = None) -> int:
+    """The number of model loads a sequence of turns causes, starting with loaded_model in memory."""
+    swaps = 0
+    for model in models:
+        if model != loaded_model:
+            swaps += 1
+            loaded_model = model
+    return swaps
+
+
+def schedule_round(agents: list, loaded_model: str = None) -> list:
+    """
+    Orders one round of speakers so that agents sharing a model speak back to back.
+
+    Every agent still speaks exactly once, proposers still speak before aggregators and agents
+    that share a model keep their relative order. Within a stage the group of the model that
+    is already loaded goes first and a model the next stage also uses goes last.
+    """
+    stages = sorted({agent_stage(agent) for agent in agents})
+    ordered = []
+    for position, stage in enumerate(stages):
+        groups = {}
+        for agent in agents:
+            if agent_stage(agent) == stage:
+                groups.setdefault(agent_model(agent), []).append(agent)
+        next_models = {agent_model(agent) for agent in agents if position + 1 < len(stages) and agent_stage(agent) == stages[position + 1]}
+        models = sorted(groups, key=lambda model: (model != loaded_model, model in next_models and model != loaded_model))
+        for model in models:
+            ordered.extend(groups[model])
+        if ordered:
+            loaded_model = agent_model(ordered[-1])
+    return ordered
+
+
+class SpeakerScheduler:
+    """
+    Schedules group chat rounds by model and counts the model reloads that saves.
+
+    The savings are measured against the order the chat uses without the scheduler: a rotation
+    that starts after the agent at round_robin_index (so at agents[1] for the default 0) and
+    continues across rounds. Only one model is assumed to fit in memory at a time (the case
+    where the order matters).
+    """
+
+    def __init__(self, round_robin_index: int = 0):
+        self.loaded_model = None
+        self.round_robin_model = None
+        self.round_robin_index = round_robin_index
+        self.scheduled_swaps = 0
+        self.round_robin_swaps = 0
+
+    def next_round(self, agents: list) -> list:
+        ordered = schedule_round(agents, self.loaded_model)
+        self.scheduled_swaps += count_model_swaps([agent_model(agent) for agent in ordered], self.loaded_model)
+        round_robin = [agents[(self.round_robin_index + turn) % len(agents)] for turn in range(1, len(agents) + 1)]
+        self.round_robin_swaps += count_model_swaps([agent_model(agent) for agent in round_robin], self.round_robin_model)
+        if ordered:
+            self.loaded_model = agent_model(ordered[-1])
+            self.round_robin_model = agent_model(round_robin[-1])
+        return ordered
+
+    @property
+    def reloads_saved(self) -> int:
+        return self.round_robin_swaps - self.scheduled_swaps
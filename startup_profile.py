@@ -0,0 +1,98 @@
+# TeamForgeAI/startup_profile.py
+"""
+Measures what importing the app's modules costs and checks it against budgets.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, after Streamlit
+(which every page needs anyway), so a measurement is what the module itself adds to a cold
+start. Besides time, a module fails its budget when it pulls in a dependency that must stay
+lazy, which is stable across machines where milliseconds are not.
+
+    python startup_profile.py            # table of all modules, exit status 1 if any is over budget
+    python startup_profile.py ui.utils   # just some modules
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+# Imported only inside the skills and tabs that use them; none may load when a page module is imported
+LAZY_DEPENDENCIES = (
+    "nltk", "bs4", "googleapiclient", "PIL", "matplotlib", "chromadb", "langchain", "langchain_community",
+    "selenium", "webdriver_manager", "pdfkit", "PyPDF2", "fpdf",
+)
+DEFAULT_BUDGET_MS = 250
+# Modules that legitimately pay for a heavy import on every page: AutoGen for the agents
+IMPORT_BUDGETS_MS = {
+    "agent_creation": 2500,
+    "agent_utils": 2500,
+    "agent_interactions": 3000,
+    "agent_display": 3000,
+    "agent_edit": 3000,
+    "file_utils": 2500,
+    "ui.discussion": 3000,
+    "ui.utils": 2500,
+    "ui.inputs": 2500,
+}
+APP_MODULES = (
+    "log_utils", "llm_scheduler", "llm_client", "endpoint_pool", "model_residency", "tracing", "ollama_llm",
+    "api_utils", "group_chat_prompt", "speaker_scheduler", "auto_mode", "team_memory", "nltk_resources", "keywords",
+    "agent_utils", "agent_creation", "file_utils", "agent_interactions", "agent_display", "agent_edit",
+    "ui.discussion", "ui.utils", "ui.inputs", "skills.web_search", "skills.fetch_web_content",
+    "skills.generate_sd_images", "skills.plot_diagram",
+)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def measure_import(module: str, python: str = sys.executable) -> dict:
+    """Imports module in a fresh interpreter; returns its cumulative import time and the lazy dependencies it loaded."""
+    code = (
+        "import json, sys; import streamlit; import " + module + "; "
+        "print(json.dumps(sorted(name for name in " + repr(LAZY_DEPENDENCIES) + " if name in sys.modules)))"
+    )
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, timeout=300,
+    )
+    if result.returncode != 0:
+        return {"module": module, "ms": None, "eager": [], "error": result.stderr.strip().splitlines()[-1:] or ["failed"]}
+    # A module can show up more than once (e.g. a package and its submodule); its largest cumulative time counts
+    cumulative_us = max((int(match.group(2)) for match in map(IMPORTTIME_LINE.match, result.stderr.splitlines())
+                         if match and match.group(3) == module), default=0)
+    return {"module": module, "ms": cumulative_us / 1000, "eager": json.loads(result.stdout.strip().splitlines()[-1]), "error": None}
+
+
+def check_budget(measurement: dict) -> list:
+    """The reasons a measurement is over budget; empty when it is within."""
+    if measurement["error"]:
+        return [f"import failed: {measurement['error'][0]}"]
+    problems = []
+    budget = IMPORT_BUDGETS_MS.get(measurement["module"], DEFAULT_BUDGET_MS)
+    if measurement["ms"] > budget:
+        problems.append(f"{measurement['ms']:.0f} ms > {budget} ms")
+    if measurement["eager"]:
+        problems.append("imports " + ", ".join(measurement["eager"]) + " eagerly")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of the TeamForgeAI modules")
+    parser.add_argument("modules", nargs="*", default=APP_MODULES)
+    parser.add_argument("--json", action="store_true", help="Print the measurements as JSON")
+    args = parser.parse_args(argv)
+    measurements = [measure_import(module) for module in args.modules]
+    over = 0
+    if args.json:
+        print(json.dumps(measurements, indent=2))
+    for measurement in measurements:
+        problems = check_budget(measurement)
+        over += bool(problems)
+        if not args.json:
+            took = "—" if measurement["ms"] is None else f"{measurement['ms']:8.1f} ms"
+            print(f"{measurement['module']:<28} {took:>12}  {'OVER: ' + '; '.join(problems) if problems else 'ok'}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# TeamForgeAI/team_memory.py
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from embedding_pipeline import EmbeddingPipeline, DEFAULT_EMBEDDING_MODEL
+from retrieval import CorpusIndex, chunk_text
+from log_utils import get_logger
+
+logger = get_logger(__name__)
+TEAM_MEMORY_DIR = "./db/teams"
+DEFAULT_TEAM = "agents"  # Matches the default team selected in agent_display
+TEAM_MEMORY_TOP_K = 5
+RECENT_TURNS = 2  # The latest turns always go into the prompt verbatim
+TURN_SEPARATOR = "\n\n===\n\n"  # Written after every turn by update_discussion_and_whiteboard
+FALLBACK_HISTORY_CHARS = 50000  # Used when the memory cannot be reached
+
+_indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="team-memory")  # Indexes fetched pages and uploads in order
+
+
+def chunk_hash(text: str) -> str:
+    """Identifies a chunk by its content, so the same text is only ever indexed once per team."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()[:32]
+
+
+def split_turns(discussion_history: str) -> list:
+    """Splits the discussion history into its individual turns."""
+    return [turn.strip() for turn in discussion_history.split(TURN_SEPARATOR) if turn.strip()]
+
+
+class TeamMemory:
+    """
+    A retrieval memory shared by every agent of a team.
+
+    Discussion turns, fetched web pages and uploaded files are chunked and indexed once in a
+    single hybrid CorpusIndex; agents retrieve the top-k relevant snippets from it. There is one
+    TeamMemory per directory, shared by every session; each call takes the caller's embedding
+    pipeline, which must use the model the directory belongs to (see team_memory_directory).
+    """
+
+    def __init__(self, directory: str):
+        self.index = CorpusIndex(directory)
+        self._indexed = {record.get("hash") for record in self.index.store.metadata}
+        self._synced_turns = set()  # Hashes of the discussion turns already indexed
+        self._lock = threading.Lock()
+
+    def add_document(self, source: str, text: str, kind: str = "document", pipeline: EmbeddingPipeline = None) -> int:
+        """
+        Chunks and indexes a document, skipping chunks the team has already indexed.
+
+        :param source: Where the text came from (a URL, file name or speaker).
+        :param text: The text to index.
+        :param kind: The kind of source, e.g. "discussion", "web_page" or "upload".
+        :param pipeline: The session's embedding pipeline.
+        :return: The number of new chunks indexed.
+        """
+        chunks = []
+        with self._lock:  # Only claims the chunks; embedding them must not serialize the other sessions
+            for chunk in chunk_text(text or ""):
+                digest = chunk_hash(chunk["text"])
+                if digest in self._indexed:
+                    continue
+                self._indexed.add(digest)
+                chunks.append(dict(chunk, source=source, kind=kind, hash=digest))
+        try:
+            self.index.add(chunks, pipeline=pipeline)
+        except Exception:
+            with self._lock:
+                self._indexed.difference_update(chunk["hash"] for chunk in chunks)  # Allow a retry later
+            raise
+        return len(chunks)
+
+    def sync_discussion(self, discussion_history: str, pipeline: EmbeddingPipeline = None) -> int:
+        """Indexes the turns of the discussion history that have not been indexed yet."""
+        indexed = 0
+        for turn in split_turns(discussion_history):
+            turn_hash = chunk_hash(turn)
+            if turn_hash in self._synced_turns:
+                continue
+            speaker = turn.split(":", 1)[0].strip() if ":" in turn[:100] else "User"
+            indexed += self.add_document(speaker, turn, kind="discussion", pipeline=pipeline)
+            self._synced_turns.add(turn_hash)
+        return indexed
+
+    def retrieve(self, query: str, k: int = TEAM_MEMORY_TOP_K, pipeline: EmbeddingPipeline = None) -> list:
+        """Returns the k chunks most relevant to the query, best first."""
+        if not query or not query.strip():
+            return []
+        return self.index.search(query, k=k, pipeline=pipeline)
+
+
+class SessionTeamMemory:
+    """A team's shared memory as one session uses it: every call goes through the session's embedding pipeline."""
+
+    def __init__(self, memory: TeamMemory, pipeline: EmbeddingPipeline):
+        self.memory = memory
+        self.pipeline = pipeline
+
+    def add_document(self, source: str, text: str, kind: str = "document") -> int:
+        return self.memory.add_document(source, text, kind=kind, pipeline=self.pipeline)
+
+    def add(self, content: str, role: str = "User") -> None:
+        """Indexes a single message; mirrors VectorMemory.add so agents can use the team memory directly."""
+        self.add_document(role, content, kind="discussion")
+
+    def sync_discussion(self, discussion_history: str) -> int:
+        return self.memory.sync_discussion(discussion_history, pipeline=self.pipeline)
+
+    def retrieve(self, query: str, k: int = TEAM_MEMORY_TOP_K) -> list:
+        return self.memory.retrieve(query, k=k, pipeline=self.pipeline)
+
+    def get_memories(self, k: int = TEAM_MEMORY_TOP_K, query: str = None) -> list:
+        """Returns {"role", "content", "score"} records; mirrors VectorMemory.get_memories."""
+        if not query:
+            records = self.memory.index.store.metadata[-k:]
+        else:
+            records = self.retrieve(query, k=k)
+        return [{"role": record.get("source", ""), "content": record["text"], "score": record.get("score")} for record in records]
+
+
+def format_snippets(results: list) -> str:
+    """Formats retrieved chunks as a bulleted list that names their sources."""
+    lines = []
+    for result in results:
+        source = f"{result.get('kind', 'note')}: {result.get('source', '')}".rstrip(": ")
+        lines.append(f"- [{source}] {result['text']}")
+    return "\n".join(lines)
+
+
+def team_memory_directory(team_name: str, embedding_model: str) -> str:
+    """Where a team's memory for one embedding model lives; vectors of different models never share an index."""
+    return os.path.join(TEAM_MEMORY_DIR, team_name, re.sub(r"[^A-Za-z0-9_.-]", "_", embedding_model))
+
+
+@st.cache_resource(show_spinner=False)
+def load_team_memory(directory: str) -> TeamMemory:
+    """Opens one shared memory per directory, cached across reruns and sessions."""
+    return TeamMemory(directory)
+
+
+def get_team_memory() -> SessionTeamMemory:
+    """Returns the memory of the team that is currently selected in the session, with the session's embedding settings."""
+    embedding_model = st.session_state.get("embedding_model") or DEFAULT_EMBEDDING_MODEL
+    pipeline = EmbeddingPipeline(hosts=st.session_state.get("ollama_url", "http://localhost:11434"), model=embedding_model)
+    directory = team_memory_directory(st.session_state.get("current_team") or DEFAULT_TEAM, embedding_model)
+    return SessionTeamMemory(load_team_memory(directory), pipeline)
+
+
+def remember_document(source: str, text: str, kind: str = "document") -> None:
+    """
+    Indexes a document in the current team's memory in the background, so fetching a page or
+    uploading a file never waits for its embeddings and never fails because of them.
+    """
+    try:
+        team_memory = get_team_memory()  # Resolved here: the worker thread has no session
+    except Exception as error:
+        logger.warning("Could not add %s to the team memory: %s", source, error)
+        return
+    _indexer.submit(_index_document, team_memory, source, text, kind)
+
+
+def _index_document(team_memory: SessionTeamMemory, source: str, text: str, kind: str) -> None:
+    try:
+        team_memory.add_document(source, text, kind=kind)
+    except Exception as error:
+        logger.warning("Could not add %s to the team memory: %s", source, error)
+
+
+def discussion_context(discussion_history: str, query: str, k: int = TEAM_MEMORY_TOP_K) -> str:
+    """
+    Builds the discussion context for an agent prompt: the most relevant earlier snippets
+    followed by the latest turns verbatim.
+
+    :param discussion_history: The full discussion history.
+    :param query: What the agent is working on, used to rank the snippets.
+    :param k: The number of snippets to retrieve.
+    :return: The context string, or the tail of the history if the memory is unavailable.
+    """
+    turns = split_turns(discussion_history)
+    if len(turns) <= RECENT_TURNS:
+        return discussion_history
+    recent = TURN_SEPARATOR.join(turns[-RECENT_TURNS:])
+    try:
+        team_memory = get_team_memory()
+        team_memory.sync_discussion(discussion_history)
+        recent_hashes = {chunk_hash(chunk["text"]) for turn in turns[-RECENT_TURNS:] for chunk in chunk_text(turn)}
+        results = [result for result in team_memory.retrieve(query, k=k + len(recent_hashes)) if result.get("hash") not in recent_hashes][:k]
+    except Exception as error:
+        logger.warning("Team memory unavailable, falling back to the raw discussion history: %s", error)
+        return discussion_history[-FALLBACK_HISTORY_CHARS:]
+    if not results:
+        return recent
+    return f"Relevant earlier context:\n{format_snippets(results)}\n\nMost recent turns:\n{recent}"
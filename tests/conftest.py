@@ -0,0 +1,9 @@
+# TeamForgeAI/tests/conftest.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBENCH = os.path.join(ROOT, "plugins", "Ollama_Workbench")
+for path in (ROOT, WORKBENCH):
+    if path not in sys.path:
+        sys.path.insert(0, path)
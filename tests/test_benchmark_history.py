@@ -0,0 +1,21 @@
+# TeamForgeAI/tests/test_benchmark_history.py
+import pytest
+
+from benchmark_history import permutation_p_value
+
+
+def test_identical_samples_are_not_significant():
+    assert permutation_p_value([1.0, 1.1, 0.9, 1.0], [1.0, 0.9, 1.1, 1.0]) == pytest.approx(1.0)
+
+
+def test_separated_samples_reach_the_smallest_exact_p_value():
+    # 8 choose 4 = 70 relabelings; only the observed split and its mirror are as extreme
+    assert permutation_p_value([1.0, 1.1, 1.2, 1.3], [2.0, 2.1, 2.2, 2.3]) == pytest.approx(2 / 70)
+
+
+def test_large_samples_are_sampled_deterministically():
+    baseline = [1.0 + i / 100 for i in range(30)]
+    candidate = [1.5 + i / 100 for i in range(30)]
+    p_value = permutation_p_value(baseline, candidate)
+    assert p_value == permutation_p_value(baseline, candidate)
+    assert p_value < 0.01
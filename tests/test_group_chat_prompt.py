@@ -0,0 +1,41 @@
+# TeamForgeAI/tests/test_group_chat_prompt.py
+from group_chat_prompt import GroupChatPrompt, estimate_tokens, summary_line
+
+
+def chat(turns, length=400):
+    messages = [{"sender": "User", "content": "Design a web scraper."}]
+    for turn in range(turns):
+        messages.append({"sender": f"Agent{turn % 3}", "content": f"Turn {turn} says something. " + "x" * length})
+    return messages
+
+
+def test_short_chat_is_kept_verbatim():
+    prompt = GroupChatPrompt().build(chat(2, length=10), "Agent2")
+    assert prompt.startswith("Task: Design a web scraper.")
+    assert "Summary of earlier turns" not in prompt
+    assert "Agent0: Turn 0 says something." in prompt
+    assert prompt.endswith("Agent2:")
+
+
+def test_long_chat_stays_within_budget_and_summarizes_old_turns():
+    builder = GroupChatPrompt(budget_tokens=500)
+    prompt = builder.build(chat(20), "Agent1")
+    assert estimate_tokens(prompt) <= 500
+    summary, discussion = prompt.split("Discussion:")
+    assert "Summary of earlier turns:\n- Agent" in summary
+    assert "Turn 19 says something." in discussion
+    assert "Turn 0 says something." not in discussion
+
+
+def test_window_start_is_stable_between_turns():
+    builder = GroupChatPrompt(budget_tokens=500)
+    messages = chat(20)
+    builder.build(messages, "Agent1")
+    start = builder.window_start
+    messages.append({"sender": "Agent2", "content": "Short."})
+    builder.build(messages, "Agent0")
+    assert builder.window_start == start  # The prompt prefix is reused by Ollama's cache
+
+
+def test_summary_line_keeps_the_first_sentence():
+    assert summary_line({"sender": "Coder", "content": "Done.  Next I will test."}) == "- Coder: Done."
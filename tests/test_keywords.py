@@ -0,0 +1,46 @@
+# TeamForgeAI/tests/test_keywords.py
+import pytest
+
+from keywords import build_query, extract_keyphrases, extract_keywords, tokenize
+
+TEXT = (
+    "The team builds a fast vector search engine index for the retrieval layer. "
+    "Vector search needs an index. The service must support Python 3.12."
+)
+
+
+def test_tokenize_keeps_version_numbers():
+    assert tokenize("Upgrade to Python 3.12, then test.") == ["Upgrade", "to", "Python", "3.12", "then", "test"]
+
+
+def test_extract_keywords_drops_stop_words():
+    assert extract_keywords("The index of the corpus") == ["index", "corpus"]
+
+
+@pytest.mark.parametrize("method", ["rake", "yake"])
+def test_keyphrases_are_ranked_and_deduplicated(method):
+    phrases = extract_keyphrases(TEXT, method=method)
+    scores = [score for _, score in phrases]
+    assert scores == sorted(scores, reverse=True)
+    lowered = [phrase.lower() for phrase, _ in phrases]
+    assert len(lowered) == len(set(lowered))
+    assert any("3.12" in phrase for phrase in lowered)
+
+
+def test_rake_degree_uses_whole_runs():
+    # Every word of the six-word run has degree 6, not the 3 of a three-word window
+    phrases = extract_keyphrases("vector search engine index cache layer")
+    assert phrases[0][1] == pytest.approx(3 * 6)
+    assert all(len(phrase.split()) <= 3 for phrase, _ in phrases)
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        extract_keyphrases(TEXT, method="tfidf")
+
+
+def test_build_query_respects_the_term_limit():
+    query = build_query(TEXT, "Another text about caching", max_terms=4)
+    words = query.split()
+    assert len(words) == 4
+    assert len({word.lower() for word in words}) == 4
@@ -0,0 +1,77 @@
+# TeamForgeAI/tests/test_llm_scheduler.py
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import BACKGROUND, BATCH, CLASS_LIMITS_ENV, INTERACTIVE, LLMScheduler, class_limits
+
+
+def test_class_limits_follow_the_concurrency(monkeypatch):
+    monkeypatch.delenv(CLASS_LIMITS_ENV, raising=False)
+    assert class_limits(8) == {INTERACTIVE: 8, BACKGROUND: 4, BATCH: 4}
+    assert class_limits(1) == {INTERACTIVE: 1, BACKGROUND: 1, BATCH: 1}
+    monkeypatch.setenv(CLASS_LIMITS_ENV, "batch=16")
+    assert class_limits(8)[BATCH] == 16
+    assert LLMScheduler(concurrency=8).limit(BATCH) == 8  # Never above the total
+    monkeypatch.setenv(CLASS_LIMITS_ENV, "batch=many")
+    with pytest.raises(ValueError):
+        class_limits(8)
+
+
+def test_interactive_requests_overtake_queued_batch_work():
+    scheduler = LLMScheduler(concurrency=1, limits={BATCH: 1})
+    running = scheduler.acquire(BATCH)
+    batch = scheduler.enqueue(BATCH)
+    interactive = scheduler.enqueue(INTERACTIVE)
+    admitted = []
+
+    def wait(ticket):
+        scheduler.wait(ticket)
+        admitted.append(ticket.priority)
+        scheduler.release(ticket)
+
+    threads = [threading.Thread(target=wait, args=(ticket,)) for ticket in (batch, interactive)]
+    for thread in threads:
+        thread.start()
+    scheduler.release(running)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert admitted == [INTERACTIVE, BATCH]
+
+
+def test_class_limit_caps_a_class():
+    scheduler = LLMScheduler(concurrency=4, limits={BATCH: 1})
+    scheduler.acquire(BATCH)
+    ticket = scheduler.enqueue(BATCH)
+    assert scheduler._next_admitted() is None
+    scheduler.promote(ticket, INTERACTIVE)
+    assert scheduler._next_admitted() is ticket
+
+
+def test_interrupted_wait_leaves_the_queue():
+    scheduler = LLMScheduler(concurrency=1)
+    scheduler.acquire()
+    ticket = scheduler.enqueue()
+    with scheduler._condition:
+        original_wait = scheduler._condition.wait
+
+        def interrupted(timeout=None):
+            raise KeyboardInterrupt
+
+        scheduler._condition.wait = interrupted
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.wait(ticket)
+    scheduler._condition.wait = original_wait
+    assert scheduler.stats()[INTERACTIVE] == {"running": 1, "waiting": 0}
+
+
+def test_slot_releases_on_error():
+    scheduler = LLMScheduler(concurrency=1)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot(BACKGROUND):
+            raise RuntimeError("generation failed")
+    start = time.monotonic()
+    with scheduler.slot(BACKGROUND):
+        pass
+    assert time.monotonic() - start < 1
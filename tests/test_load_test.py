@@ -0,0 +1,26 @@
+# TeamForgeAI/tests/test_load_test.py
+import json
+import os
+import subprocess
+import sys
+
+from conftest import WORKBENCH
+
+
+def test_load_test_against_the_stub_server_has_no_errors():
+    # The headless entry point CI runs; it starts stub_ollama.py on a free port
+    result = subprocess.run(
+        [sys.executable, "load_test.py", "--stub", "--duration", "2", "--concurrency", "2", "--max-error-rate", "0"],
+        cwd=WORKBENCH, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    summary = json.loads(result.stdout)
+    assert summary["requests"] > 0
+    assert summary["error_rate"] == 0
+
+
+def test_benchmark_modules_import_without_streamlit():
+    code = "import sys; import load_test, benchmark_history; assert 'streamlit' not in sys.modules and 'ollama' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=WORKBENCH, capture_output=True, text=True, timeout=60,
+                            env=dict(os.environ, PYTHONPATH=""))
+    assert result.returncode == 0, result.stderr
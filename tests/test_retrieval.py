@@ -0,0 +1,74 @@
+# TeamForgeAI/tests/test_retrieval.py
+import hashlib
+import threading
+
+from retrieval import BM25Index, CorpusIndex, chunk_text, tokenize
+
+DIMENSION = 64
+
+
+class HashingPipeline:
+    """Embeds text as a bag of hashed words, so the tests need no Ollama server."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts, progress_callback=None):
+        self.calls += 1
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vector = [0.0] * DIMENSION
+        for token in tokenize(text):
+            vector[int(hashlib.md5(token.encode()).hexdigest(), 16) % DIMENSION] += 1.0
+        return vector
+
+
+CHUNKS = [
+    {"text": "The endpoint pool spreads requests over several Ollama servers."},
+    {"text": "BM25 ranks documents by term frequency and inverse document frequency."},
+    {"text": "Keep alive holds the team's models in memory between speakers."},
+]
+
+
+def test_chunk_text_keeps_headings_and_size():
+    text = "# Setup\n\nInstall the requirements.\n\n# Usage\n\n" + "Run the app. " * 40
+    chunks = chunk_text(text, chunk_size=120, overlap=20)
+    assert chunks[0] == {"text": "Install the requirements.", "heading": "Setup"}
+    assert all(chunk["heading"] == "Usage" for chunk in chunks[1:])
+    assert all(len(chunk["text"]) <= 120 for chunk in chunks)
+
+
+def test_bm25_ranks_the_matching_document_first():
+    index = BM25Index()
+    for chunk in CHUNKS:
+        index.add(tokenize(chunk["text"]))
+    assert index.search(tokenize("inverse document frequency"))[0][1] == 1
+    assert index.search(tokenize("nothing matches")) == []
+
+
+def test_hybrid_search_and_reload(tmp_path):
+    index = CorpusIndex(str(tmp_path), pipeline=HashingPipeline())
+    index.add(CHUNKS)
+    results = index.search("which models stay in memory", k=1)
+    assert results[0]["text"] == CHUNKS[2]["text"]
+    assert "score" in results[0]
+
+    # A new instance reads the BM25 index back from its journal
+    reopened = CorpusIndex(str(tmp_path), pipeline=HashingPipeline())
+    assert len(reopened) == len(CHUNKS)
+    assert reopened.search("endpoint pool servers", k=1)[0]["text"] == CHUNKS[0]["text"]
+
+
+def test_build_once_builds_a_single_time(tmp_path):
+    pipeline = HashingPipeline()
+    index = CorpusIndex(str(tmp_path), pipeline=pipeline)
+    built = []
+    threads = [threading.Thread(target=lambda: built.append(index.build_once(CHUNKS))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(built) == [False, False, False, True]
+    assert len(index) == len(CHUNKS)
+    assert pipeline.calls == 1
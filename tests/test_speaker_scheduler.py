@@ -0,0 +1,38 @@
+# TeamForgeAI/tests/test_speaker_scheduler.py
+from types import SimpleNamespace
+
+from speaker_scheduler import SpeakerScheduler, count_model_swaps, schedule_round
+
+
+def agent(name, model, role=None):
+    return SimpleNamespace(name=name, ollama_llm=SimpleNamespace(model=model), moa_role=role)
+
+
+def names(agents):
+    return [agent.name for agent in agents]
+
+
+def test_count_model_swaps():
+    assert count_model_swaps(["a", "a", "b", "a"]) == 3
+    assert count_model_swaps(["a", "b"], loaded_model="a") == 1
+
+
+def test_round_groups_models_and_starts_with_the_loaded_one():
+    agents = [agent("1", "a"), agent("2", "b"), agent("3", "a"), agent("4", "b")]
+    assert names(schedule_round(agents, loaded_model="b")) == ["2", "4", "1", "3"]
+
+
+def test_proposers_speak_before_aggregators():
+    agents = [agent("judge", "a", "aggregator"), agent("1", "b", "proposer"), agent("2", "a", "proposer")]
+    assert names(schedule_round(agents)) == ["1", "2", "judge"]
+
+
+def test_savings_are_measured_against_the_unscheduled_rotation():
+    agents = [agent("1", "a"), agent("2", "b"), agent("3", "a")]
+    scheduler = SpeakerScheduler()
+    rounds = [names(scheduler.next_round(agents)) for _ in range(2)]
+    assert rounds == [["1", "3", "2"], ["2", "1", "3"]]
+    # Without the scheduler the chat speaks 2, 3, 1, 2, 3, 1 (models b a a b a a)
+    assert scheduler.round_robin_swaps == 4
+    assert scheduler.scheduled_swaps == 3
+    assert scheduler.reloads_saved == 1
@@ -0,0 +1,51 @@
+# TeamForgeAI/tests/test_vector_store.py
+import numpy as np
+import pytest
+
+from vector_store import NumpyVectorStore
+
+
+def random_vectors(count, dimension=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+
+def test_search_returns_the_nearest_records_best_first(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    vectors = random_vectors(50)
+    store.add(vectors, [{"id": i} for i in range(50)])
+    results = store.search(vectors[7], k=3)
+    assert results[0][1] == {"id": 7}
+    assert results[0][0] == pytest.approx(1.0, abs=1e-5)
+    assert [score for score, _ in results] == sorted((score for score, _ in results), reverse=True)
+
+
+def test_store_persists_and_grows(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.add(random_vectors(3), [{"id": i} for i in range(3)])
+    reopened = NumpyVectorStore(str(tmp_path))
+    assert len(reopened) == 3
+    reopened.add(random_vectors(5, seed=1), [{"id": i} for i in range(3, 8)])
+    assert len(NumpyVectorStore(str(tmp_path))) == 8
+
+
+def test_dimension_mismatch_is_rejected(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.add(random_vectors(2, dimension=16), [{}, {}])
+    with pytest.raises(ValueError):
+        store.add(random_vectors(1, dimension=8), [{}])
+
+
+def test_ivf_search_finds_stored_vectors(tmp_path):
+    store = NumpyVectorStore(str(tmp_path), ivf_threshold=100, n_probe=4)
+    vectors = random_vectors(300)
+    store.add(vectors, [{"id": i} for i in range(300)])
+    assert store.centroids is not None
+    assert store.search(vectors[123], k=1)[0][1] == {"id": 123}
+
+
+def test_reset_empties_the_store(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    store.add(random_vectors(4), [{}] * 4)
+    store.reset()
+    assert len(store) == 0
+    assert store.search(random_vectors(1)[0]) == []
@@ -0,0 +1,218 @@
+# TeamForgeAI/tracing.py
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from log_utils import get_logger
+
+SERVICE_NAME = "teamforgeai"
+TRACE_FILE_ENV = "TEAMFORGE_TRACE_FILE"  # Where spans are written; set it to an empty string to turn tracing off
+DEFAULT_TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "files", "traces", "traces.jsonl")
+OLLAMA_TIMING_FIELDS = ("total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration")
+TTFT_ATTRIBUTE = "llm.ttft_ms"
+DASHBOARD_SPANS = 5000  # The dashboard reads at most this many of the latest spans
+TRACE_FILE_MAX_BYTES = 20 * 1024 * 1024  # The trace file is rotated to <file>.1 at this size, replacing the previous one
+
+logger = get_logger(__name__)
+_current_span = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+_read_cache = {}  # path -> ((mtime, size, limit), spans)
+
+
+def trace_file() -> str:
+    return os.environ.get(TRACE_FILE_ENV, DEFAULT_TRACE_FILE)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # OTLP JSON encodes 64-bit integers as strings
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _plain_value(value: dict):
+    if "intValue" in value:
+        return int(value["intValue"])
+    return next(iter(value.values()), None)
+
+
+class Span:
+    """One timed stage of a turn; spans started inside another span's block become its children."""
+
+    def __init__(self, name: str, parent: "Span" = None, attributes: dict = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else ""
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key: str, value) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def observe_chunk(self, chunk: dict) -> None:
+        """Records the time to the first token and, from the final chunk, Ollama's own timings."""
+        if TTFT_ATTRIBUTE not in self.attributes and (chunk.get("response") or (chunk.get("message") or {}).get("content")):
+            self.attributes[TTFT_ATTRIBUTE] = (time.time_ns() - self.start_ns) / 1e6
+        if chunk.get("done"):
+            for field in OLLAMA_TIMING_FIELDS:
+                self.set_attribute(f"ollama.{field}", chunk.get(field))
+
+    def end(self, error: BaseException = None) -> None:
+        """Ends the span and appends it to the trace file; only the first call counts."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict:
+        """The span in the OTLP/JSON encoding of OpenTelemetry."""
+        status = {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"}
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": status,
+        }
+
+
+def start_span(name: str, attributes: dict = None) -> Span:
+    """Starts a span under the current one without making it current; call end() on it, e.g. around a generator."""
+    return Span(name, _current_span.get(), attributes)
+
+
+@contextmanager
+def span(name: str, attributes: dict = None):
+    """Times the block as a span; spans opened inside it (in the same thread) become its children."""
+    current = start_span(name, attributes)
+    token = _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except BaseException as exception:
+        error = exception
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end(error)
+
+
+def export(finished: Span) -> None:
+    """
+    Appends a span to the trace file as one OTLP/JSON ExportTraceServiceRequest per line, the
+    format the OpenTelemetry Collector's otlpjsonfile receiver reads. Tracing never fails a turn.
+    """
+    path = trace_file()
+    if not path:
+        return
+    record = {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": [finished.to_otlp()]}],
+        }]
+    }
+    try:
+        with _write_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= TRACE_FILE_MAX_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+    except OSError as error:
+        logger.warning("Could not write trace span %s: %s", finished.name, error)
+
+
+def read_spans(path: str = None, limit: int = DASHBOARD_SPANS) -> list:
+    """
+    The latest spans of a trace file as flat dictionaries: name, duration_ms, error and attributes.
+
+    The file is only parsed again once it changed, so the dashboard costs nothing on reruns between turns.
+    """
+    path = path or trace_file()
+    if not path or not os.path.exists(path):
+        return []
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size, limit)
+    cached = _read_cache.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+    spans = _parse_spans(path, limit)
+    _read_cache[path] = (version, spans)
+    return spans
+
+
+def _parse_spans(path: str, limit: int) -> list:
+    lines = deque(maxlen=limit)
+    for part in (path + ".1", path):  # The rotated file first, so a fresh file still shows recent history
+        if os.path.exists(part):
+            with open(part, encoding="utf-8") as file:
+                lines.extend(file)
+    spans = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # A line cut short by a crash
+        for resource in record.get("resourceSpans", []):
+            for scope in resource.get("scopeSpans", []):
+                for otlp_span in scope.get("spans", []):
+                    spans.append({
+                        "name": otlp_span["name"],
+                        "trace_id": otlp_span["traceId"],
+                        "start_ns": int(otlp_span["startTimeUnixNano"]),
+                        "duration_ms": (int(otlp_span["endTimeUnixNano"]) - int(otlp_span["startTimeUnixNano"])) / 1e6,
+                        "error": otlp_span.get("status", {}).get("message"),
+                        "attributes": {item["key"]: _plain_value(item["value"]) for item in otlp_span.get("attributes", [])},
+                    })
+    return spans
+
+
+def percentile(values: list, q: float) -> float:
+    """The q-th percentile of values, linearly interpolated."""
+    values = sorted(values)
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def stage_latencies(spans: list) -> list:
+    """A row per stage with its count, p50 and p95 in milliseconds; LLM spans add a TTFT row."""
+    durations = {}
+    for item in spans:
+        durations.setdefault(item["name"], []).append(item["duration_ms"])
+        if TTFT_ATTRIBUTE in item["attributes"]:
+            durations.setdefault(f"{item['name']} (TTFT)", []).append(item["attributes"][TTFT_ATTRIBUTE])
+    return [
+        {
+            "Stage": name,
+            "Count": len(values),
+            "p50 (ms)": round(percentile(values, 50), 1),
+            "p95 (ms)": round(percentile(values, 95), 1),
+        }
+        for name, values in sorted(durations.items())
+    ]
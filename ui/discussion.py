@@ -7,8 +7,15 @@ import re
 
 from ui.utils import extract_code_from_response, display_download_button, list_discussions, load_discussion_history
 from api_utils import get_ollama_models
+from model_residency import get_residency_manager, loaded_models, residency_session_id
+from endpoint_pool import configure_endpoints, configured_endpoints, load_endpoint_pool
+from llm_scheduler import get_scheduler
+from tracing import read_spans, stage_latencies, trace_file
+from log_utils import get_logger, preview
 from skills.plot_diagram import plot_diagram
 
+logger = get_logger(__name__)
+
 # Define custom CSS
 CUSTOM_CSS = """
 <style>
@@ -63,8 +70,8 @@ def display_discussion_and_whiteboard() -> None:
     if "selected_model" not in st.session_state:
         st.session_state.selected_model = query_params.get("model", "")
 
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9 = st.tabs(
-        ["Most Recent Comment", "Whiteboard", "Gallery", "Charts", "Discussion History", "Objectives", "Deliverables", "Goal", "Chat Manager"]
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(
+        ["Most Recent Comment", "Whiteboard", "Gallery", "Charts", "Discussion History", "Objectives", "Deliverables", "Goal", "Chat Manager", "Latency"]
     )
     with tab1:  # Display the most recent comment in the first tab
         st.text_area(
@@ -181,6 +188,60 @@ def display_discussion_and_whiteboard() -> None:
         st.query_params.update({"model": st.session_state.selected_model})  # Correct syntax
         st.session_state.model = st.session_state.selected_model  # Update model in session state
 
+        endpoints = st.text_input(
+            "Endpoint pool",
+            value=configured_endpoints(),
+            key="ollama_endpoints",
+            help="Comma-separated Ollama URLs with optional weights, e.g. http://box1:11434=2, http://box2:11434. "
+                 "Agents whose URL is in the pool share it; requests go to the least busy healthy server. "
+                 "The pool is shared by every session on this server.",
+        )
+        if endpoints.strip() != configured_endpoints().strip() and st.button("Apply endpoint pool", help="Leave the box empty to turn pooling off."):
+            configure_endpoints(endpoints.strip())
+        if configured_endpoints():
+            st.dataframe(load_endpoint_pool(configured_endpoints()).status(), hide_index=True)
+
+        residency = get_residency_manager(st.session_state.ollama_url)
+        memory_warning = residency.memory_warning(residency.team_of(residency_session_id()))
+        if memory_warning:
+            st.warning(memory_warning)
+        loaded = loaded_models(st.session_state.ollama_url)
+        if loaded:
+            st.caption("Loaded models: " + ", ".join(
+                f"{name} ({info['size'] / 1024 ** 3:.1f} GB{', kept for a team' if name in residency.team else ''})" for name, info in loaded.items()
+            ))
+        st.caption("LLM requests: " + ", ".join(
+            f"{priority} {counts['running']} running / {counts['waiting']} waiting" for priority, counts in get_scheduler().stats().items()
+        ))
+
+    with tab10:  # Latency tab
+        display_latency_dashboard()
+
+def display_latency_dashboard() -> None:
+    """Shows p50/p95 latency per pipeline stage from the trace file."""
+    spans = read_spans()
+    if not spans:
+        st.info(f"No traces yet. Spans are written to {trace_file() or 'nowhere (tracing is off)'} as agents respond.")
+        return
+    st.dataframe(pd.DataFrame(stage_latencies(spans)), hide_index=True)
+    llm_spans = [item for item in spans if item["name"] == "llm.generate" and "ollama.eval_count" in item["attributes"]]
+    if llm_spans:
+        st.caption("Latest generations, with Ollama's timings")
+        st.dataframe(pd.DataFrame([
+            {
+                "Model": item["attributes"].get("llm.model"),
+                "Total (ms)": round(item["duration_ms"], 1),
+                "TTFT (ms)": round(item["attributes"].get("llm.ttft_ms") or 0, 1),
+                "Load (ms)": round((item["attributes"].get("ollama.load_duration") or 0) / 1e6, 1),
+                "Prompt tokens": item["attributes"].get("ollama.prompt_eval_count"),
+                "Output tokens": item["attributes"]["ollama.eval_count"],
+                "Tokens/s": round(item["attributes"]["ollama.eval_count"] / (item["attributes"]["ollama.eval_duration"] / 1e9), 1)
+                if item["attributes"].get("ollama.eval_duration") else None,
+            }
+            for item in reversed(llm_spans[-20:])
+        ]), hide_index=True)
+    st.caption(f"From the latest {len(spans)} spans in {trace_file()}")
+
 def display_discussion_modal() -> None:
     """Displays the discussion history in an expander."""
     with st.expander("Discussion History"):
@@ -188,10 +249,7 @@ def display_discussion_modal() -> None:
 
 def update_discussion_and_whiteboard(expert_name: str, response: str, user_input: str) -> None:
     """Updates the discussion history and whiteboard with new content."""
-    print("Updating discussion and whiteboard...")
-    print(f"Expert Name: {expert_name}")
-    print(f"Response: {response}")
-    print(f"User Input: {user_input}")
+    logger.debug("Updating discussion and whiteboard for %s: %s (user input: %s)", expert_name, preview(response), preview(user_input))
 
     if user_input:
         user_input_text = f"\n\n\n\n{user_input}\n\n"
@@ -207,8 +265,6 @@ def update_discussion_and_whiteboard(expert_name: str, response: str, user_input
 
     st.session_state.last_agent = expert_name
     st.session_state.last_comment = response_text
-    print(f"Last Agent: {st.session_state.last_agent}")
-    print(f"Last Comment: {st.session_state.last_comment}")
 
 def extract_latest_code(response: str) -> str:
     """Extracts the latest updated code block from the response."""
@@ -4,6 +4,9 @@ from ui.utils import handle_begin # Corrected import
 import streamlit as st
 
 from agent_utils import get_agents_from_text, get_workflow_from_agents, zip_files_in_memory
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
 
 def display_user_input() -> str:
     """Displays a text area for user input and extracts URLs."""
@@ -50,20 +53,19 @@ def display_user_request_input() -> None:
                 autogen_agents, crewai_agents, _ = get_agents_from_text(
                     st.session_state.rephrased_request
                 )
-                print(f"Debug: AutoGen Agents: {autogen_agents}")
-                print(f"Debug: CrewAI Agents: {crewai_agents}")
+                logger.debug("AutoGen agents: %s", preview(autogen_agents))
+                logger.debug("CrewAI agents: %s", preview(crewai_agents))
                 if not autogen_agents:
-                    print("Error: No agents created.")
+                    logger.error("No agents created.")
                     st.warning("Failed to create agents. Please try again.")
                     return
                 agents_data = {}
                 for agent in autogen_agents:
                     agent_name = agent["config"]["name"]
                     agents_data[agent_name] = agent
-                print(f"Debug: Agents data: {agents_data}")
+                logger.debug("Agents data: %s", preview(agents_data))
                 workflow_data, _ = get_workflow_from_agents(autogen_agents)
-                print(f"Debug: Workflow data: {workflow_data}")
-                print(f"Debug: CrewAI agents: {crewai_agents}")
+                logger.debug("Workflow data: %s", preview(workflow_data))
                 (
                     autogen_zip_buffer,
                     crewai_zip_buffer,
@@ -72,7 +74,7 @@ def display_user_request_input() -> None:
                 st.session_state.crewai_zip_buffer = crewai_zip_buffer
                 st.session_state.agents_data = autogen_agents # Update the session state variable
             except Exception as e:
-                print(f"Error in display_user_request_input: {e}")
+                logger.exception("Error in display_user_request_input: %s", e)
     
     # Trigger a re-run of the Streamlit app outside the conditional block
     if st.session_state.get("trigger_rerun"):
@@ -3,12 +3,13 @@
 import os
 import time
 import streamlit as st
-import pandas as pd
 import re
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from file_utils import create_agent_data, sanitize_text, load_skills, save_agent_to_json
 from agent_utils import rephrase_prompt, get_agents_from_text, get_workflow_from_agents, zip_files_in_memory
+from team_memory import remember_document
+from log_utils import get_logger, preview
+
+logger = get_logger(__name__)
 
 # Directory for saving discussion history
 PROJECT_DIR = 'TeamForgeAI/files/discussions'
@@ -40,13 +41,6 @@ def cleanup_old_files(directory: str, max_files: int) -> None:
     for old_file in files[max_files:]:
         os.remove(old_file)
 
-def extract_keywords(text: str) -> list:
-    """Extracts keywords from the provided text."""
-    stop_words = set(stopwords.words('english'))  # Define English stop words
-    words = word_tokenize(text) # Tokenize the text
-    keywords = [word for word in words if word.lower() not in stop_words and word.isalnum()] # Filter keywords
-    return keywords
-
 def get_api_key() -> str:
     """Returns a hardcoded API key."""
     return "ollama"
@@ -59,14 +53,14 @@ def handle_begin(session_state: dict) -> None:
     for retry in range(max_retries):
         try:
             rephrase_prompt_result = rephrase_prompt(user_request)
-            print(f"Debug: Rephrased text: {rephrase_prompt_result}")
+            logger.debug("Rephrased text: %s", preview(rephrase_prompt_result))
             if rephrase_prompt_result:
                 session_state.rephrased_request = rephrase_prompt_result
                 autogen_agents, crewai_agents, current_project = get_agents_from_text(rephrase_prompt_result) # Modified to return current_project
-                print(f"Debug: AutoGen Agents: {autogen_agents}")
-                print(f"Debug: CrewAI Agents: {crewai_agents}")
+                logger.debug("AutoGen agents: %s", preview(autogen_agents))
+                logger.debug("CrewAI agents: %s", preview(crewai_agents))
                 if not autogen_agents:
-                    print("Error: No agents created.")
+                    logger.error("No agents created.")
                     st.warning("Failed to create agents. Please try again.")
                     return
                 agents_data = {}
@@ -79,10 +73,9 @@ def handle_begin(session_state: dict) -> None:
                         agent,
                         os.path.join(agents_base_dir, st.session_state.current_team, f"{agent_name}.json"),
                     )
-                print(f"Debug: Agents data: {agents_data}")
+                logger.debug("Agents data: %s", preview(agents_data))
                 workflow_data, _ = get_workflow_from_agents(autogen_agents)
-                print(f"Debug: Workflow data: {workflow_data}")
-                print(f"Debug: CrewAI agents: {crewai_agents}")
+                logger.debug("Workflow data: %s", preview(workflow_data))
                 (
                     autogen_zip_buffer,
                     crewai_zip_buffer,
@@ -93,16 +86,16 @@ def handle_begin(session_state: dict) -> None:
                 session_state.current_project = current_project # Store the current project in session state
                 st.session_state["trigger_rerun"] = True # Trigger a rerun
                 break  # Exit the loop if successful
-            print("Error: Failed to rephrase the user request.")
+            logger.error("Failed to rephrase the user request.")
             st.warning("Failed to rephrase the user request. Please try again.")
             return  # Exit the function if rephrasing fails
         except Exception as error:
-            print(f"Error occurred in handle_begin: {str(error)}")
+            logger.error("Error occurred in handle_begin: %s", error)
             if retry < max_retries - 1:
-                print(f"Retrying in {retry_delay} second(s)...")
+                logger.info("Retrying in %d second(s)...", retry_delay)
                 time.sleep(retry_delay)
             else:
-                print("Max retries exceeded.")
+                logger.error("Max retries exceeded.")
                 st.warning("An error occurred. Please try again.")
                 return  # Exit the function if max retries are exceeded            
                 
@@ -185,19 +178,26 @@ def display_reset_and_upload_buttons() -> None:
                 if key in st.session_state:
                     del st.session_state[key]
             st.session_state.user_input = ""
-            st.experimental_rerun()
+            st.rerun()
     with column2:
         uploaded_file = st.file_uploader(
             "Upload a sample .csv of your data (optional)", type="csv"
         )
         if uploaded_file is not None:
-            try:
-                dataframe = pd.read_csv(uploaded_file).head(5)
+            # The file stays in the uploader across reruns; it is only read and indexed when it changes
+            upload_id = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+            if st.session_state.get("uploaded_file_id") != upload_id:
+                import pandas as pd  # Only needed once a file is uploaded
+                try:
+                    full_dataframe = pd.read_csv(uploaded_file)
+                    remember_document(uploaded_file.name, full_dataframe.to_csv(index=False), kind="upload")  # Make the upload retrievable by the team
+                    st.session_state.uploaded_data = full_dataframe.head(5)
+                    st.session_state.uploaded_file_id = upload_id
+                except Exception as error:
+                    st.error(f"Error reading the file: {error}")
+            if st.session_state.get("uploaded_file_id") == upload_id:
                 st.write("Data successfully uploaded and read as DataFrame:")
-                st.dataframe(dataframe)
-                st.session_state.uploaded_data = dataframe
-            except Exception as error:
-                st.error(f"Error reading the file: {error}")
+                st.dataframe(st.session_state.uploaded_data)
 
 def extract_code_from_response(response: str) -> str:
     """Extracts code blocks from the response."""
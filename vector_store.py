@@ -0,0 +1,240 @@
+# TeamForgeAI/vector_store.py
+import json
+import os
+import threading
+
+import numpy as np
+
+IVF_THRESHOLD = 50000  # Collections at least this large are searched through an IVF partition
+DEFAULT_N_PROBE = 8  # Number of IVF partitions scanned per query
+SEARCH_BLOCK_ROWS = 65536  # Rows scored per block so float16 stores never materialize a full float32 copy
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_SIZE = 20000
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scales each row to unit length so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyVectorStore:
+    """
+    An in-process vector store backed by a memory-mapped NumPy matrix and a JSONL metadata sidecar.
+
+    Layout of the store directory:
+        index.json      - dtype, dimension, row count and IVF state
+        vectors.npy     - unit-length vectors (float32 or float16), grown by doubling its capacity
+        metadata.jsonl  - one JSON record per vector, in row order
+        centroids.npy / assignments.npy - the IVF partition, once the store passes ivf_threshold
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32", ivf_threshold: int = IVF_THRESHOLD, n_probe: int = DEFAULT_N_PROBE):
+        self.directory = directory
+        self.ivf_threshold = ivf_threshold
+        self.n_probe = n_probe
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.info = self._read_json("index.json") or {"dtype": np.dtype(dtype).name, "dim": None, "count": 0, "ivf_trained_count": 0}
+        self.dtype = np.dtype(self.info["dtype"])
+        self.metadata = self._read_metadata()
+        self.vectors = self._open_matrix("vectors.npy")
+        self.centroids = self._load_array("centroids.npy")
+        self.assignments = self._open_matrix("assignments.npy")
+
+    def __len__(self) -> int:
+        return self.info["count"]
+
+    def add(self, vectors, metadatas: list) -> None:
+        """Appends vectors and their metadata records, then maintains the IVF partition if enabled."""
+        vectors = normalize(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(metadatas):
+            raise ValueError("add() expects one metadata record per vector.")
+        if not len(vectors):
+            return
+        with self._lock:
+            if self.info["dim"] is None:
+                self.info["dim"] = int(vectors.shape[1])
+            elif vectors.shape[1] != self.info["dim"]:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match store dimension {self.info['dim']}.")
+            start = self.info["count"]
+            end = start + len(vectors)
+            self.vectors = self._ensure_capacity("vectors.npy", self.vectors, end, (self.info["dim"],), self.dtype)
+            self.vectors[start:end] = vectors.astype(self.dtype)
+            self.vectors.flush()
+            with open(os.path.join(self.directory, "metadata.jsonl"), "a", encoding="utf-8") as file:
+                for record in metadatas:
+                    file.write(json.dumps(record) + "\n")
+            self.metadata.extend(metadatas)
+            self.info["count"] = end
+
+            if self.centroids is not None:
+                self.assignments = self._ensure_capacity("assignments.npy", self.assignments, end, (), np.int32)
+                self.assignments[start:end] = self._nearest_centroids(vectors)
+                self.assignments.flush()
+            if end >= self.ivf_threshold and end >= 2 * self.info["ivf_trained_count"]:
+                self._train_ivf()
+            self._write_json("index.json", self.info)
+
+    def search(self, query_vector, k: int = 3) -> list:
+        """
+        Returns the top-k most similar records.
+
+        :param query_vector: The query embedding.
+        :param k: The number of results to return.
+        :return: A list of (score, metadata) tuples, best first.
+        """
+        return [(score, self.metadata[row]) for score, row in self.search_rows(query_vector, k)]
+
+    def search_rows(self, query_vector, k: int = 3) -> list:
+        """Like search(), but returns (score, row_index) tuples."""
+        count = self.info["count"]
+        if not count or k <= 0:
+            return []
+        query = normalize(query_vector).reshape(-1)
+        if self.centroids is not None and count >= self.ivf_threshold:
+            probe_lists = np.argsort(self.centroids @ query)[::-1][:self.n_probe]
+            candidates = np.flatnonzero(np.isin(self.assignments[:count], probe_lists))
+            if len(candidates) >= k:
+                scores = self.vectors[candidates].astype(np.float32) @ query
+                top = self._top_k(scores, k)
+                return [(float(scores[i]), int(candidates[i])) for i in top]
+
+        best_scores = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            block = self.vectors[start:min(start + SEARCH_BLOCK_ROWS, count)].astype(np.float32)
+            scores = block @ query
+            top = self._top_k(scores, k)
+            best_scores = np.concatenate([best_scores, scores[top]])
+            best_rows = np.concatenate([best_rows, top + start])
+        order = self._top_k(best_scores, k)
+        return [(float(best_scores[i]), int(best_rows[i])) for i in order]
+
+    def reset(self) -> None:
+        """Removes every vector and metadata record from the store."""
+        with self._lock:
+            for filename in ("vectors.npy", "metadata.jsonl", "centroids.npy", "assignments.npy"):
+                path = os.path.join(self.directory, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+            self.info.update({"dim": None, "count": 0, "ivf_trained_count": 0})
+            self._write_json("index.json", self.info)
+            self.metadata = []
+            self.vectors = self.centroids = self.assignments = None
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Returns the indices of the k highest scores, best first."""
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top])]
+
+    def _train_ivf(self) -> None:
+        """Partitions the vectors with a few rounds of spherical k-means."""
+        count = self.info["count"]
+        n_lists = max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(count, size=min(count, max(KMEANS_SAMPLE_SIZE, n_lists * 4)), replace=False))
+        sample = self.vectors[sample_rows].astype(np.float32)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for index in range(n_lists):
+                members = sample[labels == index]
+                if len(members):
+                    centroids[index] = members.mean(axis=0)
+            centroids = normalize(centroids)
+        self.centroids = centroids
+        np.save(os.path.join(self.directory, "centroids.npy"), centroids)
+
+        self.assignments = self._ensure_capacity("assignments.npy", None, count, (), np.int32, fresh=True)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, count)
+            self.assignments[start:end] = self._nearest_centroids(self.vectors[start:end].astype(np.float32))
+        self.assignments.flush()
+        self.info["ivf_trained_count"] = count
+
+    def _nearest_centroids(self, vectors: np.ndarray) -> np.ndarray:
+        """Assigns each vector to its most similar IVF centroid."""
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _ensure_capacity(self, filename: str, matrix, rows: int, row_shape: tuple, dtype, fresh: bool = False):
+        """Returns a memory-mapped matrix with room for at least `rows` rows, doubling the file when it is full."""
+        if matrix is not None and not fresh and len(matrix) >= rows:
+            return matrix
+        capacity = max(rows, 2 * len(matrix) if matrix is not None and not fresh else rows, 1024)
+        path = os.path.join(self.directory, filename)
+        temp_path = path + ".tmp"
+        grown = np.lib.format.open_memmap(temp_path, mode="w+", dtype=dtype, shape=(capacity,) + row_shape)
+        if matrix is not None and not fresh:
+            grown[:len(matrix)] = matrix
+        grown.flush()
+        del grown
+        os.replace(temp_path, path)
+        return np.load(path, mmap_mode="r+")
+
+    def _open_matrix(self, filename: str):
+        """Memory-maps a matrix file if it exists."""
+        path = os.path.join(self.directory, filename)
+        return np.load(path, mmap_mode="r+") if os.path.exists(path) else None
+
+    def _load_array(self, filename: str):
+        """Loads a small array fully into memory if it exists."""
+        path = os.path.join(self.directory, filename)
+        return np.load(path) if os.path.exists(path) else None
+
+    def _read_metadata(self) -> list:
+        """Reads the metadata sidecar, ignoring records beyond the committed row count."""
+        path = os.path.join(self.directory, "metadata.jsonl")
+        records = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if len(records) >= self.info["count"]:
+                        break
+                    records.append(json.loads(line))
+        return records
+
+    def _read_json(self, filename: str):
+        """Reads a JSON file from the store directory, or returns None if it is missing."""
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def _write_json(self, filename: str, data: dict) -> None:
+        """Atomically writes a JSON file into the store directory."""
+        path = os.path.join(self.directory, filename)
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(path + ".tmp", path)
+
+
+class VectorMemory:
+    """A lightweight agent memory that stores messages in a NumpyVectorStore instead of an external DB."""
+
+    def __init__(self, db_path: str, ollama_url: str = "http://localhost:11434", embedding_model: str = None):
+        from embedding_pipeline import EmbeddingPipeline, DEFAULT_EMBEDDING_MODEL  # Imported here to keep this module NumPy-only
+        self.store = NumpyVectorStore(db_path)
+        self.pipeline = EmbeddingPipeline(hosts=ollama_url, model=embedding_model or DEFAULT_EMBEDDING_MODEL)
+
+    def add(self, content: str, role: str = "User") -> None:
+        """Embeds and stores a message."""
+        if content and content.strip():
+            vectors = self.pipeline.embed([content])
+            self.store.add(vectors, [{"role": role, "content": content}])
+
+    def get_memories(self, k: int = 5, query: str = None) -> list:
+        """Returns up to k stored messages, ranked by similarity to the query, or the most recent ones."""
+        if not len(self.store):
+            return []
+        if not query:
+            return self.store.metadata[-k:]
+        results = self.store.search(self.pipeline.embed_query(query), k=k)
+        return [dict(record, score=score) for score, record in results]